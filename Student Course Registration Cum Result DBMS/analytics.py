@@ -0,0 +1,300 @@
+import argparse
+import os
+import re
+import threading
+import time
+
+import student_courses as sc
+
+# Grades that fail in pass/fail rates. Every other grade with grade points
+# (see student_courses.GRADE_POINTS) passes; grades without points are left
+# out of GPAs and rates and counted together as 'Ungraded' in the histograms.
+FAILING_GRADES = {'F'}
+
+# Reports produced by term_report(), in export order
+REPORTS = ('class_rank', 'grade_histograms', 'department_averages', 'pass_fail_rates')
+
+# First and last month of each term, in the order of the terms within a
+# year (see student_courses._grade_term)
+TERM_MONTHS = {'Spring': (1, 5), 'Summer': (6, 7), 'Fall': (8, 12)}
+
+# Every grade of the term as (student_id, course_id, grade code), the code
+# being the grade's position in the known grades or their count for grades
+# without grade points. Codes keep the rows numeric, so they are read
+# straight into NumPy arrays.
+GRADE_ROWS_QUERY = '''
+    SELECT student_id, course_id, {codes}
+    FROM Grades
+    WHERE {term_condition}
+'''
+
+
+# Term reports already computed, keyed by database and term. Each entry
+# remembers the version (Grade_Changes counter, grade points and failing
+# grades) it was computed at and is recomputed once that changes.
+class TermReportCache:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+report_cache = TermReportCache()
+
+
+# Terms that have grades, oldest first, as (term, number of changes so far)
+def list_terms():
+    conn = sc.get_connection()
+    rows = conn.execute('SELECT term, changes FROM Grade_Changes ORDER BY term').fetchall()
+    conn.close()
+
+    def order(row):
+        year, _, season = row[0].partition('-')
+        return (not year.isdigit(), year, list(TERM_MONTHS).index(season) if season in TERM_MONTHS else 0)
+
+    return sorted(rows, key=order)
+
+
+# Changes counted so far for the term's grades (all grades when `term` is None)
+def _grade_version(conn, term):
+    if term is None:
+        row = conn.execute('SELECT COALESCE(SUM(changes), 0) FROM Grade_Changes').fetchone()
+    else:
+        row = conn.execute('SELECT changes FROM Grade_Changes WHERE term = ?', (term,)).fetchone()
+    return row[0] if row else 0
+
+
+# Grades with grade points, from best to worst
+def _known_grades():
+    return sorted(sc.GRADE_POINTS, key=lambda grade: -sc.GRADE_POINTS[grade])
+
+
+# WHERE condition selecting the term's grades, with its parameters. Dated
+# terms become a grade_date range, which is much cheaper per row than
+# working out the term of every grade.
+def _term_condition(term):
+    if term is None:
+        return '1', {}
+    year, _, season = term.partition('-')
+    if year.isdigit() and season in TERM_MONTHS:
+        first, last = TERM_MONTHS[season]
+        return 'grade_date >= :term_start AND grade_date < :term_end', {
+            'term_start': f'{year}-{first:02d}-01',
+            'term_end': f'{year}-{last + 1:02d}-01' if last < 12 else f'{int(year) + 1}-01-01',
+        }
+    return f"{sc._grade_term('grade_date')} = :term", {'term': term}
+
+
+# Read the term's grades `chunk_size` rows at a time into arrays of student
+# ids, course ids and grade codes
+def _read_grades(conn, term, grades, chunk_size=100000):
+    import itertools
+
+    import numpy as np
+
+    whens = ' '.join(f'WHEN :grade{i} THEN {i}' for i in range(len(grades)))
+    codes = f'CASE grade {whens} ELSE {len(grades)} END' if grades else str(len(grades))
+    params = {f'grade{i}': grade for i, grade in enumerate(grades)}
+    term_condition, term_params = _term_condition(term)
+    params.update(term_params)
+
+    cursor = conn.cursor()
+    cursor.execute(GRADE_ROWS_QUERY.format(codes=codes, term_condition=term_condition), params)
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunks.append(np.fromiter(itertools.chain.from_iterable(rows), np.int64, 3 * len(rows)))
+    cursor.close()
+
+    values = np.concatenate(chunks).reshape(-1, 3) if chunks else np.empty((0, 3), np.int64)
+    return values[:, 0], values[:, 1], values[:, 2]
+
+
+# All four reports from one scan of the term's grades. Per-student GPAs
+# (and from them class ranks and percentiles) and per-course grade counts
+# (and from them histograms, pass/fail rates and department averages) are
+# vectorized NumPy aggregations over the scanned arrays.
+def _compute_term_report(conn, term):
+    import numpy as np
+    import pandas as pd
+
+    grades = _known_grades()
+    student_ids, course_ids, codes = _read_grades(conn, term, grades)
+    courses = pd.DataFrame.from_records(
+        conn.execute('SELECT course_id, course_code, course_name, department, credits FROM Courses').fetchall(),
+        columns=['course_id', 'course_code', 'course_name', 'department', 'credits'])
+
+    # Grade points and credits of every row; NaN points for ungraded rows
+    points_by_code = np.array([sc.GRADE_POINTS[grade] for grade in grades] + [np.nan])
+    passing_by_code = np.array([grade not in FAILING_GRADES for grade in grades] + [False])
+    # Grades of courses that no longer exist are left out, as in the SQL
+    # reports that join Grades with Courses
+    course_positions = pd.Index(courses['course_id']).get_indexer(course_ids)
+    known = course_positions >= 0
+    student_ids, course_positions, codes = student_ids[known], course_positions[known], codes[known]
+    credits = courses['credits'].to_numpy(dtype=float)[course_positions]
+    points = points_by_code[codes]
+    graded = codes < len(grades)
+
+    # Class rank by credit-weighted GPA; percentile as in SQL's PERCENT_RANK()
+    per_student = pd.DataFrame({
+        'student_id': student_ids[graded],
+        'credits': credits[graded],
+        'weighted_points': (credits * points)[graded],
+    }).groupby('student_id').agg(graded_courses=('credits', 'size'), graded_credits=('credits', 'sum'),
+                                 weighted_points=('weighted_points', 'sum'))
+    per_student = per_student[per_student['graded_credits'] > 0]
+    gpa = per_student['weighted_points'] / per_student['graded_credits']
+    students = len(per_student)
+    class_rank = pd.DataFrame({
+        'student_id': per_student.index,
+        'graded_courses': per_student['graded_courses'].to_numpy(),
+        'graded_credits': per_student['graded_credits'].to_numpy(dtype=np.int64),
+        'gpa': gpa.to_numpy(),
+        'class_rank': gpa.rank(method='min', ascending=False).to_numpy(dtype=np.int64),
+        'percentile': ((gpa.rank(method='min') - 1) / max(students - 1, 1) * 100).to_numpy(),
+    }).sort_values(['class_rank', 'student_id'], ignore_index=True)
+
+    # Grade counts per course, one column per grade code
+    width = len(grades) + 1
+    counts = np.bincount(course_positions * width + codes, minlength=len(courses) * width).reshape(-1, width)
+    graded_counts = counts[:, :-1].sum(axis=1)
+    passed = counts[:, passing_by_code].sum(axis=1)
+    weighted_counts = (counts[:, :-1] * points_by_code[:-1]).sum(axis=1) * courses['credits'].to_numpy()
+    has_grades = counts.sum(axis=1) > 0
+    info = courses.loc[has_grades, ['course_id', 'course_code', 'course_name', 'department']].reset_index(drop=True)
+
+    grade_histograms = pd.concat([info, pd.DataFrame(counts[has_grades], columns=grades + ['Ungraded'])], axis=1)
+    grade_histograms['total'] = counts[has_grades].sum(axis=1)
+
+    pass_fail_rates = info.assign(graded=graded_counts[has_grades], passed=passed[has_grades],
+                                  failed=(graded_counts - passed)[has_grades])
+    pass_fail_rates['pass_rate'] = (pass_fail_rates['passed']
+                                    / pass_fail_rates['graded'].where(pass_fail_rates['graded'] > 0))
+
+    # Credit-weighted average GPA and pass rate of every department
+    per_department = pd.DataFrame({
+        'department': courses['department'], 'courses': has_grades.astype(int), 'grades': graded_counts,
+        'passed': passed, 'graded_credits': graded_counts * courses['credits'].to_numpy(),
+        'weighted_points': weighted_counts,
+    })[has_grades].groupby('department', dropna=False).sum()
+    per_department['average_gpa'] = (per_department['weighted_points']
+                                     / per_department['graded_credits'].where(per_department['graded_credits'] > 0))
+    per_department['pass_rate'] = per_department['passed'] / per_department['grades'].where(per_department['grades'] > 0)
+    department_averages = per_department[['courses', 'grades', 'average_gpa', 'pass_rate']].reset_index()
+
+    return {
+        'class_rank': class_rank,
+        'grade_histograms': grade_histograms,
+        'department_averages': department_averages,
+        'pass_fail_rates': pass_fail_rates,
+    }
+
+
+# Class rank, grade histograms, department averages and pass/fail rates for
+# one term ('2024-Fall', see list_terms()) or for all grades when `term` is
+# None, as a dict of DataFrames keyed by the names in REPORTS. Reports are
+# cached until the term's grades change; the version check and the report
+# queries read one snapshot of the database, so a cached report is never
+# newer or older than the version it is stored under.
+def term_report(term=None):
+    conn = sc.get_connection()
+    try:
+        conn.execute('BEGIN')
+        version = (_grade_version(conn, term), tuple(sc.GRADE_POINTS.items()), frozenset(FAILING_GRADES))
+        report = report_cache.get((os.path.abspath(sc.DB_PATH), term), version,
+                                  lambda: _compute_term_report(conn, term))
+        conn.rollback()
+    finally:
+        conn.close()
+    return report
+
+
+def class_rank(term=None):
+    return term_report(term)['class_rank']
+
+
+def grade_histograms(term=None):
+    return term_report(term)['grade_histograms']
+
+
+def department_averages(term=None):
+    return term_report(term)['department_averages']
+
+
+def pass_fail_rates(term=None):
+    return term_report(term)['pass_fail_rates']
+
+
+# Write the term's reports to `output_dir` as csv or parquet files named
+# '<term>_<report>.<format>'. Returns the paths written.
+def export_term_report(output_dir='analytics', term=None, file_format='csv'):
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported analytics format: {file_format}")
+    report = term_report(term)
+    os.makedirs(output_dir, exist_ok=True)
+
+    prefix = re.sub(r'[^\w-]', '_', term) if term is not None else 'all'
+    paths = []
+    for name in REPORTS:
+        path = os.path.join(output_dir, f"{prefix}_{name}.{file_format}")
+        if file_format == 'csv':
+            report[name].to_csv(path, index=False)
+        else:
+            report[name].to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Term-end rankings and grade distribution reports.")
+    parser.add_argument('--db', help=f"database file (default: {sc.DB_PATH})")
+    parser.add_argument('--term', help="term such as 2024-Fall (default: all grades)")
+    parser.add_argument('--list-terms', action='store_true', help="list the terms with grades and exit")
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    parser.add_argument('--output', default='analytics', help="directory for the exported files")
+    args = parser.parse_args()
+    if args.db:
+        sc.configure_pool(args.db)
+
+    try:
+        if args.list_terms:
+            for term, changes in list_terms():
+                print(term)
+            return
+
+        start = time.perf_counter()
+        paths = export_term_report(args.output, args.term, args.format)
+        print(f"Exported {args.term or 'all terms'} in {time.perf_counter() - start:.2f}s:")
+        for path in paths:
+            print(f"  {path}")
+    finally:
+        sc.close_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import concurrent.futures
+import copy
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import student_courses as sc
+
+
+# asyncio front end for the registration and grading functions. All SQLite
+# work runs on a bounded thread pool so the event loop never blocks, every
+# call returns structured data instead of printing, and concurrent calls
+# for the same read share one database round trip (each caller still gets
+# its own copy of the result).
+class RegistrationService:
+    def __init__(self, max_workers=8):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix='student-courses-async')
+        self._in_flight = {}
+        self.coalesced_reads = 0
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # Run a read, or join an identical one that is already running
+    async def _read(self, fn, *args):
+        key = (fn, args)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(fn, *args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced_reads += 1
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def request_course(self, student_id, course_id):
+        submitted, message = await self._run(sc.submit_course_request, student_id, course_id)
+        return {'submitted': submitted, 'message': message}
+
+    async def manage_course_request(self, request_id, professor_id, action):
+        changed, message = await self._run(sc.decide_course_request, request_id, professor_id, action)
+        return {'changed': changed, 'message': message}
+
+    async def add_grade(self, professor_id, course_id, student_id, grade):
+        saved, message = await self._run(sc.save_grade, professor_id, course_id, student_id, grade)
+        return {'saved': saved, 'message': message}
+
+    async def student_dashboard(self, student_id):
+        return await self._read(sc.get_student_dashboard, student_id)
+
+    async def student_results(self, student_id):
+        return await self._read(sc.get_student_results, student_id)
+
+    def close(self):
+        self._executor.shutdown()
+
+
+_service = None
+
+
+def get_service():
+    global _service
+    if _service is None:
+        _service = RegistrationService()
+    return _service
+
+
+async def request_course(student_id, course_id):
+    return await get_service().request_course(student_id, course_id)
+
+
+async def manage_course_request(request_id, professor_id, action):
+    return await get_service().manage_course_request(request_id, professor_id, action)
+
+
+async def add_grade(professor_id, course_id, student_id, grade):
+    return await get_service().add_grade(professor_id, course_id, student_id, grade)
+
+
+async def student_dashboard(student_id):
+    return await get_service().student_dashboard(student_id)
+
+
+async def student_results(student_id):
+    return await get_service().student_results(student_id)
+
+
+# Launch `coroutines` concurrent calls (a mix of requests and reads over
+# `students` students) and report latency percentiles
+async def load_test(coroutines, students, courses, workers):
+    service = RegistrationService(workers)
+    rng = random.Random(coroutines)
+    latencies = {'request_course': [], 'student_dashboard': [], 'student_results': []}
+
+    async def call(kind, student_id):
+        start = time.perf_counter()
+        if kind == 'request_course':
+            await service.request_course(student_id, rng.randint(1, courses))
+        else:
+            await getattr(service, kind)(student_id)
+        latencies[kind].append(time.perf_counter() - start)
+
+    calls = [call(rng.choice(list(latencies)), rng.randint(1, students)) for _ in range(coroutines)]
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+    service.close()
+
+    print(f"{coroutines:,} concurrent coroutines on {workers} workers in {elapsed:.2f}s "
+          f"({coroutines / elapsed:,.0f} calls/sec, {service.coalesced_reads:,} reads coalesced)")
+    for kind, timings in latencies.items():
+        timings.sort()
+        if timings:
+            print(f"  {kind:<18} p50 {timings[len(timings) // 2] * 1000:7.2f} ms   "
+                  f"p99 {timings[int(len(timings) * 0.99)] * 1000:7.2f} ms")
+
+
+def main():
+    import synthetic_data
+
+    parser = argparse.ArgumentParser(description="Load-test the asyncio API on a synthetic database.")
+    parser.add_argument('--coroutines', type=int, default=5000)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--courses', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--registration-mode', action='store_true',
+                        help="serialize writes through the single-writer queue")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='scrdbms_async_')
+    try:
+        synthetic_data.create_database(os.path.join(work_dir, 'async.db'), args.students, args.courses,
+                                       enrollments=3)
+        sc.configure_pool(os.path.join(work_dir, 'async.db'), pool_size=args.workers + 1)
+        if args.registration_mode:
+            sc.start_registration_mode()
+        asyncio.run(load_test(args.coroutines, args.students, args.courses, args.workers))
+    finally:
+        sc.stop_registration_mode()
+        sc.close_pool()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
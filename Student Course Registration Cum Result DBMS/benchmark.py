@@ -0,0 +1,688 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DB = os.path.join(HERE, 'university_results1.db')
+
+sys.path.insert(0, HERE)
+
+import analytics  # noqa: E402
+import student_courses as sc  # noqa: E402
+import synthetic_data  # noqa: E402
+
+# Scratch directory the benchmarks run in, set up by work_dir()
+WORK_DIR = None
+
+
+# Run the benchmarks in a scratch directory, with a copy of the sample
+# database, so they never touch the shipped database or drop files next to
+# the sources; the directory is removed afterwards
+@contextlib.contextmanager
+def work_dir():
+    global WORK_DIR
+    cwd = os.getcwd()
+    WORK_DIR = tempfile.mkdtemp(prefix='scrdbms_bench_')
+    shutil.copy(SAMPLE_DB, WORK_DIR)
+    os.chdir(WORK_DIR)
+    try:
+        yield WORK_DIR
+    finally:
+        sc.close_pool()
+        os.chdir(cwd)
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+        WORK_DIR = None
+
+
+# Copy the sample database into the scratch directory and point the module at it
+def fresh_database(name='bench.db'):
+    path = os.path.join(WORK_DIR, name)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    shutil.copy(SAMPLE_DB, path)
+    sc.configure_pool(path)
+    return path
+
+
+def synthetic_database(students, courses, enrollments=0, name='synthetic.db'):
+    return synthetic_data.create_database(os.path.join(WORK_DIR, name), students, courses, enrollments)
+
+
+# Run fn() n times and return the achieved operations per second
+def ops_per_sec(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)} | {value}")
+    print()
+
+
+# Per-call sqlite3.connect() (the old get_connection) vs the connection pool
+def bench_connections(n):
+    path = fresh_database()
+    query = '''
+    SELECT Courses.course_id, Courses.course_code, Courses.course_name, Courses.credits, Grades.grade
+    FROM Enrollments
+    JOIN Courses ON Enrollments.course_id = Courses.course_id
+    LEFT JOIN Grades ON Courses.course_id = Grades.course_id AND Enrollments.student_id = Grades.student_id
+    WHERE Enrollments.student_id = ?
+    '''
+
+    def per_call():
+        conn = sqlite3.connect(path)
+        conn.execute(query, (1,)).fetchall()
+        conn.close()
+
+    def pooled():
+        conn = sc.get_connection()
+        conn.execute(query, (1,)).fetchall()
+        conn.close()
+
+    def silent_student_results():
+        with contextlib.redirect_stdout(io.StringIO()):
+            sc.student_results(1)
+
+    before = ops_per_sec(per_call, n)
+    after = ops_per_sec(pooled, n)
+    report(f"Connection handling ({n} lookups)", [
+        ('per-call connect', f"{before:,.0f} ops/sec"),
+        ('pooled', f"{after:,.0f} ops/sec"),
+        ('student_results()', f"{ops_per_sec(silent_student_results, n):,.0f} ops/sec"),
+        ('speedup', f"{after / before:.1f}x"),
+    ])
+
+
+# request_course() one call at a time vs request_courses_bulk()
+def bench_bulk_requests(sizes, per_call):
+    rows = []
+    for size in sizes:
+        students = max(1, size // 5)
+        courses = 200
+        synthetic_database(students, courses)
+        rng = random.Random(size)
+        pairs = [(rng.randint(1, students), rng.randint(1, courses)) for _ in range(size)]
+
+        if per_call:
+            sample = pairs[:per_call]
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for student_id, course_id in sample:
+                    sc.request_course(student_id, course_id)
+            rate = len(sample) / (time.perf_counter() - start)
+            rows.append((f"{size:>9,} request_course()", f"{rate:,.0f} requests/sec"))
+            synthetic_database(students, courses)
+
+        start = time.perf_counter()
+        results = sc.request_courses_bulk(pairs)
+        elapsed = time.perf_counter() - start
+        accepted = sum(1 for result in results if result[2])
+        rows.append((f"{size:>9,} request_courses_bulk()",
+                     f"{size / elapsed:,.0f} requests/sec ({elapsed:.2f}s, {accepted:,} submitted)"))
+    report("Course request submission", rows)
+
+
+# manage_course_request() per request vs manage_course_requests_bulk() for
+# one professor's section of `seats` pending requests
+def bench_bulk_approval(seats):
+    def pending_section():
+        synthetic_database(seats, 10)
+        sc.request_courses_bulk((student_id, 1) for student_id in range(1, seats + 1))
+        conn = sc.get_connection()
+        professor_id, = conn.execute('SELECT professor_id FROM Courses WHERE course_id = 1').fetchone()
+        request_ids = [row[0] for row in conn.execute('SELECT request_id FROM Course_Requests')]
+        conn.close()
+        return professor_id, request_ids
+
+    professor_id, request_ids = pending_section()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for request_id in request_ids:
+            sc.manage_course_request(request_id, professor_id, 'accept')
+    one_by_one = time.perf_counter() - start
+
+    professor_id, request_ids = pending_section()
+    start = time.perf_counter()
+    sc.manage_course_requests_bulk(professor_id, 'accept')
+    batched = time.perf_counter() - start
+
+    report(f"Approving a {seats}-seat section", [
+        ('manage_course_request()', f"{one_by_one * 1000:.1f} ms"),
+        ('manage_course_requests_bulk()', f"{batched * 1000:.1f} ms"),
+        ('speedup', f"{one_by_one / batched:.1f}x"),
+    ])
+
+
+# The report card PDF as FPDF lays it out, the way render_report_card()
+# drew every card before the template renderer
+def render_report_card_fpdf(student_info, results, gpa):
+    from fpdf import FPDF
+
+    student_id, name, email, phone = student_info
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 10, f"Student Report Card - ID: {student_id}", ln=True, align="C")
+    pdf.cell(0, 10, f"Name: {name}", ln=True)
+    pdf.cell(0, 10, f"Email: {email}", ln=True)
+    pdf.cell(0, 10, f"Phone: {phone}", ln=True)
+    pdf.ln(10)
+    pdf.set_font("Arial", 'B', 12)
+    for heading, width in sc.REPORT_CARD_COLUMNS:
+        pdf.cell(width, 10, heading, 1)
+    pdf.ln()
+    pdf.set_font("Arial", size=12)
+    for result in results:
+        pdf.cell(40, 10, str(result[0]), 1)
+        pdf.cell(40, 10, result[1], 1)
+        pdf.cell(60, 10, result[2], 1)
+        pdf.cell(20, 10, str(result[3]), 1)
+        pdf.cell(30, 10, result[4] if result[4] else 'Not Graded', 1)
+        pdf.ln()
+    pdf.ln(5)
+    pdf.cell(0, 10, f"GPA: {sc.format_gpa(gpa)}", ln=True)
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# The report card PDF from the precomputed template
+def render_report_card_template(student_info, results, gpa):
+    document = io.BytesIO()
+    with sc.ReportCardWriter(document) as writer:
+        writer.add(student_info, results, gpa)
+    return document.getvalue()
+
+
+# Rendering report cards with FPDF vs the precomputed template, in memory,
+# to one file per student and to a single document; then
+# generate_report_card() in a loop, the generate_report_cards() pipeline
+# and generate_section_report_cards() end to end
+def bench_report_cards(students):
+    synthetic_database(students, 50, enrollments=5)
+    output_dir = os.path.join(WORK_DIR, 'report_cards')
+    os.makedirs(output_dir, exist_ok=True)
+    cards = list(sc._iter_report_card_data())
+    gpas = {student_info[0]: sc.results_gpa(results) for student_info, results in cards}
+
+    def render_all(render, to_files):
+        start = time.perf_counter()
+        for student_info, results in cards:
+            document = render(student_info, results, gpas.get(student_info[0]))
+            if to_files:
+                with open(os.path.join(output_dir, f"Student_{student_info[0]}_Report_Card.pdf"), 'wb') as handle:
+                    handle.write(document)
+        return len(cards) / (time.perf_counter() - start)
+
+    rows = []
+    for to_files, target in ((False, 'in memory'), (True, 'to files')):
+        fpdf_rate = render_all(render_report_card_fpdf, to_files)
+        template_rate = render_all(render_report_card_template, to_files)
+        rows += [(f"FPDF, {target}", f"{fpdf_rate:,.0f} PDFs/sec"),
+                 (f"template, {target}", f"{template_rate:,.0f} PDFs/sec ({template_rate / fpdf_rate:.1f}x)")]
+    start = time.perf_counter()
+    with sc.ReportCardWriter(os.path.join(output_dir, 'All_Report_Cards.pdf')) as writer:
+        for student_info, results in cards:
+            writer.add(student_info, results, gpas.get(student_info[0]))
+    document_rate = len(cards) / (time.perf_counter() - start)
+    shutil.rmtree(output_dir)
+
+    os.makedirs(output_dir)
+    os.chdir(output_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for student_id in range(1, students + 1):
+            sc.generate_report_card(student_id)
+    loop = time.perf_counter() - start
+    os.chdir(WORK_DIR)
+    shutil.rmtree(output_dir)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = sc.generate_report_cards(output_dir=output_dir)
+    shutil.rmtree(output_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sections = sc.generate_section_report_cards(output_dir=output_dir)
+    section_seconds = time.perf_counter() - start
+    shutil.rmtree(output_dir)
+
+    report(f"Report cards for {students:,} students", rows + [
+        ('ReportCardWriter, one document', f"{document_rate:,.0f} cards/sec"),
+        ('generate_report_card() loop', f"{students / loop:,.0f} PDFs/sec"),
+        ('generate_report_cards()', f"{stats['report_cards_per_second']:,.0f} PDFs/sec"),
+        ('  fetch', f"{stats['fetch_seconds']:.2f}s"),
+        ('  render (all workers)', f"{stats['render_seconds']:.2f}s"),
+        ('generate_section_report_cards()', f"{sum(sections.values()) / section_seconds:,.0f} cards/sec "
+                                            f"({len(sections)} sections)"),
+    ])
+
+
+# compute_gpa() at every level over `grades` grade rows
+def bench_gpa(grades):
+    synthetic_database(grades // 5, 500, enrollments=5)
+    rows = []
+    for level in ('student', 'course', 'department', 'university'):
+        start = time.perf_counter()
+        sc.compute_gpa(level)
+        rows.append((f"compute_gpa('{level}')", f"{time.perf_counter() - start:.2f}s"))
+    report(f"GPA over {grades:,} grade rows", rows)
+
+
+# Time `import student_courses` in fresh interpreters, net of interpreter
+# startup, and check that importing has no side effects on the directory
+def bench_import_time(runs=20):
+    # Let the interpreters cache bytecode (outside the source tree), as an
+    # installed deployment would, so compiling the module is not timed
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=os.path.join(WORK_DIR, 'pycache'))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    def best_of(code):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=empty_dir, env=env, check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    empty_dir = tempfile.mkdtemp(dir=WORK_DIR)
+    code = f"import sys; sys.path.insert(0, {HERE!r}); import student_courses"
+    startup = best_of('pass')
+    with_module = best_of(code)
+    created = os.listdir(empty_dir)
+
+    report("Importing student_courses", [
+        ('interpreter startup', f"{startup * 1000:.1f} ms"),
+        ('import student_courses', f"{(with_module - startup) * 1000:.1f} ms"),
+        ('files created on import', ', '.join(created) if created else 'none'),
+    ])
+
+
+# export_rosters() throughput for every format over all courses, with the
+# peak memory allocated while exporting
+def bench_rosters(students):
+    import tracemalloc
+
+    synthetic_database(students, 200, enrollments=5)
+    rows = []
+    for file_format in ('csv', 'xlsx', 'parquet'):
+        output_dir = os.path.join(WORK_DIR, f"rosters_{file_format}")
+        tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exported = sc.export_rosters(output_dir=output_dir, file_format=file_format)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        shutil.rmtree(output_dir)
+        rows.append((file_format, f"{sum(exported.values()) / elapsed:,.0f} rows/sec, "
+                                  f"peak {peak / 2**20:.1f} MiB"))
+    report(f"Roster export ({students * 5:,} enrollments, 200 courses)", rows)
+
+
+# add_student() in a loop vs import_records() from a CSV of `students` rows
+def bench_import(students, per_call):
+    import csv
+
+    path = os.path.join(WORK_DIR, 'students.csv')
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['name', 'email', 'phone', 'date_of_birth'])
+        writer.writerows((f"Student {i}", f"import{i}@example.edu", f"555-{i:07d}", '2000-01-01')
+                         for i in range(students))
+
+    synthetic_database(0, 0)
+    sample = range(students, students + per_call)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in sample:
+            sc.add_student(f"Student {i}", f"import{i}@example.edu", f"555-{i:07d}", '2000-01-01')
+    loop = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = sc.import_records('Students', path)
+
+    report(f"Importing {students:,} students", [
+        ('add_student() loop', f"{per_call / loop:,.0f} rows/sec"),
+        ('import_records()', f"{stats['rows_per_second']:,.0f} rows/sec ({stats['seconds']:.2f}s)"),
+        ('speedup', f"{stats['rows_per_second'] * loop / per_call:.1f}x"),
+    ])
+
+
+# add_grade() per student vs upload_grades() for a `students`-seat section
+def bench_upload_grades(students, per_call):
+    synthetic_database(students, 1, enrollments=1)
+    rng = random.Random(students)
+    rows = [(student_id, rng.choice('ABCDF')) for student_id in range(1, students + 1)]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for student_id, grade in rows[:per_call]:
+            sc.add_grade(1, 1, student_id, grade)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = sc.upload_grades(1, 1, rows)
+    batched = time.perf_counter() - start
+
+    report(f"Grading a {students:,}-student section", [
+        ('add_grade() loop', f"{per_call / loop:,.0f} grades/sec"),
+        ('upload_grades()', f"{students / batched:,.0f} grades/sec ({batched * 1000:.0f} ms, "
+                            f"{result['saved']:,} saved)"),
+    ])
+
+
+# Cost of query instrumentation on the hot read and write paths
+def bench_instrumentation(n):
+    fresh_database()
+
+    def calls():
+        with contextlib.redirect_stdout(io.StringIO()):
+            sc.student_results(1)
+            sc.student_dashboard(1)
+            sc.show_all_requests_for_professor(1)
+
+    sc.disable_query_stats()
+    before = ops_per_sec(calls, n)
+    sc.enable_query_stats()
+    after = ops_per_sec(calls, n)
+    queries = sum(query['calls'] for query in sc.query_stats.snapshot())
+    sc.disable_query_stats()
+
+    report(f"Query instrumentation ({n:,} rounds, {queries:,} queries recorded)", [
+        ('disabled', f"{before:,.0f} rounds/sec"),
+        ('enabled', f"{after:,.0f} rounds/sec"),
+        ('overhead', f"{(before / after - 1) * 100:.1f}%"),
+    ])
+
+
+# Latency of drop_course() promoting the head of a waitlist, for
+# waitlists of every length in `sizes`
+def bench_waitlist(sizes, promotions=200):
+    rows = []
+    for size in sizes:
+        synthetic_database(size + 1, 1)
+        sc.update_course(1, capacity=1)
+        rng = random.Random(size)
+        conn = sc.get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('INSERT INTO Enrollments (student_id, course_id) VALUES (1, 1)')
+        conn.executemany('''
+        INSERT INTO Course_Requests (student_id, course_id, request_date, status, priority)
+        VALUES (?, 1, DATE('now'), 'waitlisted', ?)
+        ''', ((student_id, rng.randint(0, 3)) for student_id in range(2, size + 2)))
+        conn.commit()
+
+        # Each drop promotes the next student, who then drops in turn
+        timings = []
+        for _ in range(min(promotions, size)):
+            student_id, = conn.execute('SELECT student_id FROM Enrollments WHERE course_id = 1').fetchone()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                sc.drop_course(student_id, 1)
+            timings.append(time.perf_counter() - start)
+        conn.close()
+
+        timings.sort()
+        rows.append((f"{size:>9,} waitlisted", f"p50 {timings[len(timings) // 2] * 1000:.3f} ms, "
+                                               f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms"))
+    report("Waitlist promotion on drop_course()", rows)
+
+
+# Cascading batch deletes and the orphan cleanup on a database of about
+# `students` * 8 rows, a tenth of whose students were deleted without
+# foreign key enforcement
+def bench_orphans(students):
+    path = os.path.join(WORK_DIR, 'orphans.db')
+    synthetic_data.create_database(path, students, 500, enrollments=4, requests=2)
+    conn = sc.get_connection()
+    rows = sum(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+               for table in ('Students', 'Enrollments', 'Grades', 'Course_Requests'))
+    conn.close()
+
+    ids = list(range(1, students + 1, max(1, students // 1000)))[:1000]
+    start = time.perf_counter()
+    sc.delete_students(ids)
+    cascade = time.perf_counter() - start
+
+    # Delete students the old way, leaving their rows behind
+    sc.close_pool()
+    raw = sqlite3.connect(path)
+    raw.execute('DELETE FROM Students WHERE student_id % 10 = 0')
+    raw.commit()
+    raw.close()
+    sc.configure_pool(path)
+
+    start = time.perf_counter()
+    orphans = sum(count for *_, count in sc.find_orphans())
+    scan = time.perf_counter() - start
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = sc.clean_orphans()
+
+    report(f"Deletes and orphan cleanup ({rows:,} rows)", [
+        ('delete_students() x 1,000', f"{cascade:.2f}s with cascades"),
+        ('find_orphans()', f"{scan:.2f}s ({orphans:,} orphaned rows)"),
+        ('clean_orphans()', f"{stats['clean_seconds']:.2f}s"),
+        ('ANALYZE', f"{stats['analyze_seconds']:.2f}s"),
+        ('VACUUM', f"{stats['vacuum_seconds']:.2f}s "
+                   f"({stats['bytes_before'] / 2**20:.0f} -> {stats['bytes_after'] / 2**20:.0f} MiB)"),
+    ])
+
+
+# Latency of the schedule conflict check for students with `sections`
+# enrolled sections, and validate_all_schedules() over every enrollment
+def bench_schedules(students, sections=10, n=2000):
+    courses = 2000
+    synthetic_data.create_database(os.path.join(WORK_DIR, 'schedules.db'), students, courses,
+                                   enrollments=sections, meetings=2)
+    rng = random.Random(students)
+    conn = sc.get_connection()
+    timings = []
+    conflicts = 0
+    for _ in range(n):
+        student_id, course_id = rng.randint(1, students), rng.randint(1, courses)
+        start = time.perf_counter()
+        conflicts += sc._schedule_conflict(conn, student_id, course_id) is not None
+        timings.append(time.perf_counter() - start)
+    conn.close()
+    timings.sort()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        found = sc.validate_all_schedules()
+    sweep = time.perf_counter() - start
+
+    report(f"Schedule conflicts ({students:,} students x {sections} sections, {courses:,} courses)", [
+        ('conflict check', f"p50 {timings[len(timings) // 2] * 1000:.3f} ms, "
+                           f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms ({conflicts:,}/{n:,} conflict)"),
+        ('validate_all_schedules()', f"{sweep:.2f}s ({students * sections:,} enrollments, "
+                                     f"{len(found):,} conflicts)"),
+    ])
+
+
+# A busy professor's inbox: the old course-list + IN join over every
+# request vs one page of the indexed inbox and an incremental poll
+def bench_inbox(students, n=200):
+    courses = 100
+    synthetic_data.create_database(os.path.join(WORK_DIR, 'inbox.db'), students, courses, requests=3,
+                                   professors=5)
+    conn = sc.get_connection()
+    professor_requests = conn.execute('SELECT COUNT(*) FROM Course_Requests WHERE professor_id = 1').fetchone()[0]
+    conn.close()
+
+    def course_list_and_in_join():
+        conn = sc.get_connection()
+        course_ids = [row[0] for row in conn.execute('SELECT course_id FROM Courses WHERE professor_id = 1')]
+        conn.execute('''
+        SELECT Course_Requests.request_id, Course_Requests.student_id, Course_Requests.course_id,
+            Students.name, Courses.course_name
+        FROM Course_Requests
+        JOIN Courses ON Course_Requests.course_id = Courses.course_id
+        JOIN Students ON Course_Requests.student_id = Students.student_id
+        WHERE Course_Requests.course_id IN ({})
+        '''.format(','.join('?' * len(course_ids))), course_ids).fetchall()
+        conn.close()
+
+    _, cursor = sc.get_professor_inbox_changes(1, limit=professor_requests)
+    rng = random.Random(students)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(10):
+            sc.request_course(rng.randint(1, students), rng.choice(range(5, courses + 1, 5)))
+
+    report(f"Professor inbox ({professor_requests:,} requests for the professor's courses)", [
+        ('course list + IN join', f"{ops_per_sec(course_list_and_in_join, max(1, n // 20)):,.1f} refreshes/sec"),
+        ('get_professor_inbox()', f"{ops_per_sec(lambda: sc.get_professor_inbox(1), n):,.0f} pages/sec (50 rows)"),
+        ('get_professor_inbox_changes()', f"{ops_per_sec(lambda: sc.get_professor_inbox_changes(1, cursor), n):,.0f} "
+                                          f"polls/sec ({len(sc.get_professor_inbox_changes(1, cursor)[0])} changes)"),
+    ])
+
+
+# Term analytics over `grades` grade rows spread over three terms: a full
+# computation, a cached call, recomputing after one grade changes, and the
+# CSV and parquet exports
+def bench_analytics(grades):
+    start = time.perf_counter()
+    synthetic_data.create_database(os.path.join(WORK_DIR, 'analytics.db'), grades // 10, 2000, enrollments=10,
+                                   grade_terms=3, departments=('Arts', 'Engineering', 'Science', 'Business'))
+    generated = time.perf_counter() - start
+    analytics.report_cache.clear()
+    term = analytics.list_terms()[-1][0]
+    rows = []
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        fn()
+        rows.append((label, f"{time.perf_counter() - start:.3f}s"))
+
+    timed('term_report() all terms', lambda: analytics.term_report())
+    timed(f"term_report('{term}')", lambda: analytics.term_report(term))
+    timed('term_report() cached', lambda: analytics.term_report())
+    conn = sc.get_connection()
+    student_id, course_id = conn.execute('SELECT student_id, course_id FROM Enrollments LIMIT 1').fetchone()
+    conn.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sc.add_grade(sc.get_course_info(course_id)[5], course_id, student_id, 'A')
+    timed('after add_grade(), all terms', lambda: analytics.term_report())
+    timed(f"after add_grade(), '{term}'", lambda: analytics.term_report(term))
+    for file_format in ('csv', 'parquet'):
+        timed(f"export {file_format}", lambda: analytics.export_term_report(
+            os.path.join(WORK_DIR, 'analytics'), file_format=file_format))
+
+    report(f"Term analytics over {grades:,} grade rows ({generated:.0f}s to generate)", rows)
+
+
+# A student portal page: the old request list (with catalog lookups) plus
+# get_student_results() on separate connections, vs get_student_dashboard()
+# from its single query and from the per-student cache
+def bench_dashboard(students, n=5000):
+    synthetic_data.create_database(os.path.join(WORK_DIR, 'dashboard.db'), students, 200, enrollments=6, requests=3)
+    rng = random.Random(students)
+
+    def requests_and_results():
+        student_id = rng.randint(1, students)
+        conn = sc.get_connection()
+        rows = conn.execute('''
+        SELECT request_id, course_id, status
+        FROM Course_Requests
+        WHERE student_id = ?
+        ''', (student_id,)).fetchall()
+        conn.close()
+        for request_id, course_id, status in rows:
+            course = sc.get_course_info(course_id)
+            if course:
+                sc.get_professor_name(course[5])
+        sc.get_student_results(student_id)
+
+    def uncached():
+        sc.dashboard_cache.clear()
+        sc.get_student_dashboard(rng.randint(1, students))
+
+    def cached():
+        sc.get_student_dashboard(rng.randint(1, 100))
+
+    for student_id in range(1, 101):
+        sc.get_student_dashboard(student_id)
+    rows = [
+        ('requests + get_student_results()', f"{ops_per_sec(requests_and_results, n):,.0f} pages/sec"),
+        ('get_student_dashboard() uncached', f"{ops_per_sec(uncached, n):,.0f} pages/sec"),
+    ]
+    for student_id in range(1, 101):
+        sc.get_student_dashboard(student_id)
+    rows.append(('get_student_dashboard() cached', f"{ops_per_sec(cached, n):,.0f} pages/sec"))
+
+    # A request followed by a page load, which has to miss the cache
+    conn = sc.get_connection()
+    pairs = conn.execute('''
+    SELECT Students.student_id, (
+        SELECT MIN(course_id) FROM Courses
+        WHERE course_id NOT IN (SELECT course_id FROM Enrollments WHERE student_id = Students.student_id)
+        AND course_id NOT IN (SELECT course_id FROM Course_Requests WHERE student_id = Students.student_id))
+    FROM Students
+    WHERE Students.student_id <= 100
+    ''').fetchall()
+    conn.close()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for student_id, course_id in pairs:
+            sc.request_course(student_id, course_id)
+            sc.get_student_dashboard(student_id)
+    rows.append(('request_course() + dashboard', f"{len(pairs) / (time.perf_counter() - start):,.0f} pairs/sec"))
+    rows.append(('cache', ', '.join(f"{key} {value:,}" for key, value in sc.dashboard_cache.stats().items())))
+
+    report(f"Student dashboard ({students:,} students, 6 enrollments and 3 requests each)", rows)
+
+
+BENCHMARKS = {
+    'connections': lambda args: bench_connections(args.n),
+    'bulk_requests': lambda args: bench_bulk_requests(args.sizes, per_call=min(args.n, 2000)),
+    'bulk_approval': lambda args: bench_bulk_approval(400),
+    'report_cards': lambda args: bench_report_cards(min(args.n, 5000)),
+    'gpa': lambda args: bench_gpa(max(args.sizes)),
+    'import_time': lambda args: bench_import_time(),
+    'rosters': lambda args: bench_rosters(min(max(args.sizes), 200000)),
+    'upload_grades': lambda args: bench_upload_grades(10000, per_call=min(args.n, 2000)),
+    'instrumentation': lambda args: bench_instrumentation(args.n),
+    'waitlist': lambda args: bench_waitlist([size for size in (100, 1000, 10000, 100000)
+                                              if size <= max(args.sizes)]),
+    'orphans': lambda args: bench_orphans(max(args.sizes) // 2),
+    'schedules': lambda args: bench_schedules(max(args.sizes) // 10),
+    'inbox': lambda args: bench_inbox(max(args.sizes) // 10),
+    'analytics': lambda args: [bench_analytics(grades) for grades in (1000000, 10000000)
+                               if grades <= 10 * max(args.sizes)],
+    'dashboard': lambda args: bench_dashboard(max(args.sizes) // 10, args.n),
+    'import': lambda args: bench_import(max(args.sizes), per_call=min(args.n, 2000)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for student_courses.py")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"benchmarks to run, any of {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('-n', type=int, default=5000, help="iterations per micro-benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help="row counts for the bulk benchmarks")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    with work_dir():
+        for name in args.benchmarks or BENCHMARKS:
+            BENCHMARKS[name](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import student_courses as sc
+import synthetic_data
+
+# Database sizes the suite runs at, as create_database() arguments
+SCALES = {
+    'small': dict(students=1000, courses=100, enrollments=4, requests=2),
+    'medium': dict(students=20000, courses=500, enrollments=4, requests=2),
+    'large': dict(students=200000, courses=2000, enrollments=5, requests=3),
+}
+
+REQUEST_STATUSES = {'pending': 6, 'accepted': 3, 'rejected': 1}
+GRADE_WEIGHTS = {'A': 3, 'B': 4, 'C': 2, 'D': 1, 'F': 1}
+
+
+# Time `calls` calls of fn(*args) for each args in `arguments`, with the
+# output discarded. Returns latency statistics in milliseconds.
+def time_calls(fn, arguments):
+    timings = []
+    for args in arguments:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(*args)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'calls': len(timings),
+        'mean_ms': sum(timings) / len(timings) * 1000,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        'ops_per_sec': len(timings) / sum(timings),
+    }
+
+
+# Arguments for `calls` calls of every public function, drawn from the
+# database at random. Writes get arguments that succeed (pending requests,
+# enrolled students) so each call does the full amount of work.
+def call_arguments(scale, calls, rng):
+    students, courses = scale['students'], scale['courses']
+    conn = sc.get_connection()
+    pending = conn.execute('''
+    SELECT Course_Requests.request_id, Courses.professor_id
+    FROM Course_Requests
+    JOIN Courses ON Course_Requests.course_id = Courses.course_id
+    WHERE Course_Requests.status = 'pending'
+    LIMIT ?
+    ''', (calls,)).fetchall()
+    enrolled = conn.execute('''
+    SELECT Courses.professor_id, Enrollments.course_id, Enrollments.student_id
+    FROM Enrollments
+    JOIN Courses ON Enrollments.course_id = Courses.course_id
+    WHERE Enrollments.student_id IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(rng.sample(range(1, students + 1), min(calls, students))),)).fetchall()
+    professors = conn.execute('SELECT COUNT(*) FROM Professors').fetchone()[0]
+    conn.close()
+
+    # Slow calls (files written, whole tables printed) are run fewer times
+    few = max(5, calls // 20)
+
+    def student_ids(n=calls):
+        return [(rng.randint(1, students),) for _ in range(n)]
+
+    return [
+        ('request_course', [(rng.randint(1, students), rng.randint(1, courses)) for _ in range(calls)]),
+        ('manage_course_request', [(request_id, professor_id, 'accept') for request_id, professor_id in pending]),
+        ('add_grade', [(professor_id, course_id, student_id, rng.choice('ABCDF'))
+                       for professor_id, course_id, student_id in enrolled[:calls]]),
+        ('student_results', student_ids()),
+        ('student_dashboard', student_ids()),
+        ('show_all_requests_for_professor', [(rng.randint(1, professors),) for _ in range(calls)]),
+        ('students_in_course', [(rng.randint(1, courses),) for _ in range(calls)]),
+        ('generate_report_card', student_ids(few)),
+        ('export_students_in_course', [(rng.randint(1, courses),) for _ in range(few)]),
+        ('display_all_students', [()] * few),
+        ('display_all_courses', [()] * few),
+        ('display_all_professors', [()] * few),
+        ('display_all_requests', [()] * few),
+        ('display_all_enrollments', [()] * few),
+        ('display_all_grades', [()] * few),
+    ]
+
+
+# Run every benchmark at `scale_name` in a scratch directory
+def run_scale(scale_name, calls, work_dir):
+    scale = SCALES[scale_name]
+    path = os.path.join(work_dir, f"{scale_name}.db")
+    start = time.perf_counter()
+    synthetic_data.create_database(path, seed=0, grade_weights=GRADE_WEIGHTS,
+                                   request_statuses=REQUEST_STATUSES, **scale)
+    print(f"{scale_name}: generated {scale['students']:,} students, {scale['courses']:,} courses "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    for name, arguments in call_arguments(scale, calls, random.Random(0)):
+        if not arguments:
+            continue
+        results[name] = time_calls(getattr(sc, name), arguments)
+        print(f"  {name:<32} {results[name]['p50_ms']:10.3f} ms p50 {results[name]['p95_ms']:10.3f} ms p95 "
+              f"({results[name]['calls']:,} calls)")
+    sc.close_pool()
+    return results
+
+
+# Compare `results` with a baseline run and return the benchmarks whose
+# median latency grew by more than `tolerance`
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\nCompared with the baseline from {baseline['meta']['timestamp']}:")
+    for scale_name, functions in results['results'].items():
+        for name, stats in functions.items():
+            before = baseline['results'].get(scale_name, {}).get(name)
+            if before is None:
+                continue
+            ratio = stats['p50_ms'] / before['p50_ms'] if before['p50_ms'] else 1.0
+            regressed = ratio > 1 + tolerance
+            if regressed:
+                regressions.append((scale_name, name, ratio))
+            print(f"  {'REGRESSED' if regressed else 'ok':<9} {scale_name:<7} {name:<32} "
+                  f"{before['p50_ms']:10.3f} -> {stats['p50_ms']:10.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every public function of student_courses.py on synthetic databases and "
+                    "store the results as JSON.")
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'],
+                        help=f"any of {', '.join(SCALES)} (default: small medium)")
+    parser.add_argument('--calls', type=int, default=200, help="calls per function")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help="results JSON of an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown of median latency before failing (default: 0.25)")
+    args = parser.parse_args()
+    unknown = set(args.scales) - set(SCALES)
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(sorted(unknown))}")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+
+    output = os.path.abspath(args.output)
+    work_dir = tempfile.mkdtemp(prefix='scrdbms_suite_')
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'calls': args.calls,
+            },
+            'results': {scale_name: run_scale(scale_name, args.calls, work_dir) for scale_name in args.scales},
+        }
+    finally:
+        sc.close_pool()
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(output, 'w') as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Results written to '{output}'.")
+
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DB = os.path.join(HERE, 'university_results1.db')
+
+# Calls whose queries run on every registration, grading or dashboard
+# request. A full table scan in any of them fails the check.
+HOT_CALLS = [
+    ('request_course', (1, 5)),
+    ('manage_course_request', (3, 2, 'accept')),
+    ('drop_course', (1, 1)),
+    ('show_all_requests_for_professor', (1,)),
+    ('get_professor_inbox', (2,)),
+    ('get_professor_inbox_changes', (1, (0, 0))),
+    ('student_dashboard', (1,)),
+    ('students_in_course', (1,)),
+    ('add_grade', (1, 1, 2, 'B')),
+    ('student_results', (1,)),
+    ('generate_report_card', (1,)),
+]
+
+# Calls that are allowed to scan (they read whole tables by design), but
+# whose plans are still reported
+OTHER_CALLS = [
+    ('display_all_students', ()),
+    ('display_all_courses', ()),
+    ('display_all_professors', ()),
+    ('display_all_requests', ()),
+    ('display_all_grades', ()),
+    ('display_all_enrollments', ()),
+    ('export_students_in_course', (1,)),
+    ('upload_grades', (1, 1, [(1, 'A'), (2, 'B')])),
+    ('update_student', (1, 'Emily Davis')),
+    ('update_course', (1, 'Introduction to Programming')),
+    ('update_professor', (1, 'Dr. John Smith')),
+]
+
+
+# Run each call against a scratch copy of the database, capture the SQL it
+# executes and return [(function, hot, sql, plan_lines, scans)]
+def collect_plans(db_path, calls):
+    work_dir = tempfile.mkdtemp(prefix='scrdbms_plans_')
+    shutil.copy(db_path, os.path.join(work_dir, 'university_results1.db'))
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    sys.path.insert(0, HERE)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import student_courses as sc
+        sc.configure_pool(os.path.join(work_dir, 'university_results1.db'))
+
+        # Hold a connection for the whole run so every nested
+        # get_connection() on this thread shares it and its trace callback
+        conn = sc.get_connection()
+        results = []
+        try:
+            for name, args, hot in calls:
+                statements = []
+                conn.set_trace_callback(statements.append)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    getattr(sc, name)(*args)
+                conn.set_trace_callback(None)
+
+                for sql in statements:
+                    if not sql.lstrip().upper().startswith(sc._PLANNED_STATEMENTS):
+                        continue
+                    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+                    scans = [line for line in plan
+                             if line.startswith('SCAN ') and line != 'SCAN CONSTANT ROW']
+                    results.append((name, hot, sql, plan, scans))
+        finally:
+            conn.close()
+            sc.close_pool()
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail if any hot query in student_courses.py scans a table.")
+    parser.add_argument('db', nargs='?', default=SAMPLE_DB,
+                        help="database to check (a scratch copy is used)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print every plan")
+    args = parser.parse_args()
+
+    calls = [(name, call_args, True) for name, call_args in HOT_CALLS]
+    calls += [(name, call_args, False) for name, call_args in OTHER_CALLS]
+
+    failures = 0
+    for name, hot, sql, plan, scans in collect_plans(args.db, calls):
+        failed = hot and scans
+        failures += bool(failed)
+        if failed or args.verbose:
+            print(f"{'FAIL' if failed else 'ok  '} {name}: {' '.join(sql.split())}")
+            for line in plan:
+                print(f"       {line}")
+
+    if failures:
+        print(f"{failures} hot queries scan a table.")
+        sys.exit(1)
+    print("No hot query scans a table.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import student_courses as sc
+
+
+# Print the orphaned rows per foreign key (see sc.find_orphans) and return them
+def report_orphans(conn=None):
+    start = time.perf_counter()
+    orphans = sc.find_orphans(conn)
+    print(f"Scanned for orphaned rows in {time.perf_counter() - start:.2f}s:")
+    for table, column, parent, count in orphans:
+        print(f"  {f'{table}.{column}':<36} -> {parent:<12} {count:>10,}")
+    return orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate a database to foreign keys with ON DELETE actions, remove the rows orphaned by "
+                    "earlier deletes, and compact it.")
+    parser.add_argument('db', help="database to clean (it is modified in place)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="only report the orphaned rows, opening the database read-only without migrating it")
+    parser.add_argument('--no-vacuum', dest='vacuum', action='store_false')
+    parser.add_argument('--no-analyze', dest='analyze', action='store_false')
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no such database: {args.db}")
+
+    if args.dry_run:
+        conn = sqlite3.connect(pathlib.Path(args.db).resolve().as_uri() + '?mode=ro', uri=True)
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            print(f"Schema version {version} (dry run: opened read-only, migrations to version "
+                  f"{sc.SCHEMA_VERSION} not applied)")
+            report_orphans(conn)
+        finally:
+            conn.close()
+        return
+
+    # Connecting applies pending migrations, including the foreign key rebuild
+    start = time.perf_counter()
+    sc.configure_pool(args.db)
+    conn = sc.get_connection()
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    print(f"Schema version {version} ({time.perf_counter() - start:.2f}s to open and migrate)")
+
+    try:
+        orphans = report_orphans()
+        if not any(count for *_, count in orphans):
+            return
+        stats = sc.clean_orphans(vacuum=args.vacuum, analyze=args.analyze)
+        for step in ('clean', 'analyze', 'vacuum'):
+            if f'{step}_seconds' in stats:
+                print(f"  {step:<8} {stats[f'{step}_seconds']:.2f}s")
+    finally:
+        sc.close_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import student_courses as sc
+import synthetic_data
+
+
+# Fire `requests` random course requests from each of `threads` threads
+# in this process. Returns (submitted, refused, errors, latencies).
+def run_clients(db_path, threads, requests, students, courses, registration, seed):
+    sc.configure_pool(db_path, pool_size=threads + 1)
+    totals = {'submitted': 0, 'refused': 0, 'errors': 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_seed):
+        rng = random.Random(client_seed)
+        counts = {'submitted': 0, 'refused': 0, 'errors': 0}
+        timings = []
+        for _ in range(requests):
+            # A few popular students make requests race on the same rows
+            student_id = rng.randint(1, students)
+            course_id = rng.randint(1, courses)
+            start = time.perf_counter()
+            try:
+                if sc.request_course(student_id, course_id):
+                    counts['submitted'] += 1
+                else:
+                    counts['refused'] += 1
+            except Exception:
+                counts['errors'] += 1
+            timings.append(time.perf_counter() - start)
+        with lock:
+            for key, value in counts.items():
+                totals[key] += value
+            latencies.extend(timings)
+
+    workers = [threading.Thread(target=client, args=(seed * 1000 + i,)) for i in range(threads)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if registration:
+            sc.start_registration_mode()
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            sc.stop_registration_mode()
+    sc.close_pool()
+    return totals['submitted'], totals['refused'], totals['errors'], latencies
+
+
+def _process_main(args):
+    return run_clients(*args)
+
+
+# Check the invariants concurrent registration must keep
+def verify(db_path):
+    sc.configure_pool(db_path)
+    conn = sc.get_connection()
+    duplicates = conn.execute('''
+    SELECT COUNT(*) FROM (
+        SELECT student_id, course_id FROM Course_Requests
+        WHERE status IN ('pending', 'accepted')
+        GROUP BY student_id, course_id
+        HAVING COUNT(*) > 1
+    )
+    ''').fetchone()[0]
+    over_cap = conn.execute(f'''
+    SELECT COUNT(*) FROM ({sc.CREDIT_LOAD_QUERY})
+    WHERE credits > 20
+    ''').fetchone()[0]
+    stored = conn.execute('SELECT COUNT(*) FROM Course_Requests').fetchone()[0]
+    conn.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        inconsistent = len(sc.check_credit_load())
+    return duplicates, over_cap, stored, inconsistent
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hammer request_course() from many threads/processes and check for "
+                    "duplicate requests and credit-cap violations.")
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16, help="threads per process")
+    parser.add_argument('--requests', type=int, default=500, help="requests per thread")
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--courses', type=int, default=40)
+    parser.add_argument('--no-registration-mode', dest='registration', action='store_false',
+                        help="write through per-call transactions instead of the single-writer queue")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='scrdbms_load_')
+    try:
+        db_path = os.path.join(work_dir, 'load.db')
+        synthetic_data.create_database(db_path, args.students, args.courses)
+        sc.close_pool()
+
+        jobs = [(db_path, args.threads, args.requests, args.students, args.courses, args.registration, seed)
+                for seed in range(args.processes)]
+        start = time.perf_counter()
+        if args.processes == 1:
+            outcomes = [run_clients(*jobs[0])]
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                outcomes = pool.map(_process_main, jobs)
+        elapsed = time.perf_counter() - start
+
+        submitted = sum(outcome[0] for outcome in outcomes)
+        refused = sum(outcome[1] for outcome in outcomes)
+        errors = sum(outcome[2] for outcome in outcomes)
+        latencies = sorted(latency for outcome in outcomes for latency in outcome[3])
+        duplicates, over_cap, stored, inconsistent = verify(db_path)
+        total = submitted + refused + errors
+
+        print(f"{total:,} requests from {args.processes} process(es) x {args.threads} threads "
+              f"in {elapsed:.2f}s: {total / elapsed:,.0f} requests/sec "
+              f"({'registration mode' if args.registration else 'per-call transactions'})")
+        print(f"  submitted {submitted:,}, refused {refused:,}, errors {errors:,}")
+        print(f"  latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+        print(f"  duplicate requests: {duplicates}, students over 20 credits: {over_cap}, "
+              f"lost requests: {submitted - stored}, credit load mismatches: {inconsistent}")
+
+        if errors or duplicates or over_cap or submitted != stored or inconsistent:
+            sys.exit(1)
+    finally:
+        sc.close_pool()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,20 @@
+import bisect
+import collections
+import contextlib
+import os
+import queue
+import random
 import sqlite3
-import pandas as pd
-from fpdf import FPDF
+import sys
+import threading
+import time
 
-# Connect to SQLite database (or create it if it doesn't exist)
-conn = sqlite3.connect('university_results2.db')
-cursor = conn.cursor()
+# pandas, fpdf and the other heavy imports are done inside the functions
+# that need them, so importing this module stays fast and has no side effects
 
-# Create tables with autoincrement IDs
-cursor.execute('''
+# Tables of the university database, created with autoincrement IDs
+SCHEMA = [
+    '''
 CREATE TABLE IF NOT EXISTS Students (
     student_id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
@@ -15,9 +22,8 @@ CREATE TABLE IF NOT EXISTS Students (
     phone TEXT,
     date_of_birth DATE
 )
-''')
-
-cursor.execute('''
+''',
+    '''
 CREATE TABLE IF NOT EXISTS Courses (
     course_id INTEGER PRIMARY KEY AUTOINCREMENT,
     course_name TEXT NOT NULL,
@@ -27,9 +33,8 @@ CREATE TABLE IF NOT EXISTS Courses (
     professor_id INTEGER,
     FOREIGN KEY (professor_id) REFERENCES Professors(professor_id)
 )
-''')
-
-cursor.execute('''
+''',
+    '''
 CREATE TABLE IF NOT EXISTS Professors (
     professor_id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
@@ -37,9 +42,8 @@ CREATE TABLE IF NOT EXISTS Professors (
     department TEXT,
     phone TEXT
 )
-''')
-
-cursor.execute('''
+''',
+    '''
 CREATE TABLE IF NOT EXISTS Enrollments (
     enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
     student_id INTEGER,
@@ -48,9 +52,8 @@ CREATE TABLE IF NOT EXISTS Enrollments (
     FOREIGN KEY (student_id) REFERENCES Students(student_id),
     FOREIGN KEY (course_id) REFERENCES Courses(course_id)
 )
-''')
-
-cursor.execute('''
+''',
+    '''
 CREATE TABLE IF NOT EXISTS Grades (
     grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
     course_id INTEGER,
@@ -60,12 +63,9 @@ CREATE TABLE IF NOT EXISTS Grades (
     FOREIGN KEY (course_id) REFERENCES Courses(course_id),
     FOREIGN KEY (student_id) REFERENCES Students(student_id),
     UNIQUE (course_id, student_id)
-)    
-''')
-
-
-
-cursor.execute('''
+)
+''',
+    '''
 CREATE TABLE IF NOT EXISTS Course_Requests (
     request_id INTEGER PRIMARY KEY AUTOINCREMENT,
     student_id INTEGER,
@@ -77,10 +77,11 @@ CREATE TABLE IF NOT EXISTS Course_Requests (
     FOREIGN KEY (course_id) REFERENCES Courses(course_id),
     FOREIGN KEY (professor_id) REFERENCES Professors(professor_id)
 )
-''')
+''',
+]
 
-# Insert sample data into Professors
-professors = [
+# Sample data inserted by seed_sample_data()
+SAMPLE_PROFESSORS = [
     ('Dr. John Smith', 'john.smith@university.edu', 'Computer Science', '555-1234'),
     ('Dr. Alice Johnson', 'alice.johnson@university.edu', 'Mathematics', '555-5678'),
     ('Dr. Robert Brown', 'robert.brown@university.edu', 'Physics', '555-9101'),
@@ -90,13 +91,8 @@ professors = [
     ('Dr. Sophia Anderson', 'sophia.anderson@university.edu', 'Economics', '555-7788'),
     ('Dr. James Thomas', 'james.thomas@university.edu', 'Political Science', '555-9900')
 ]
-cursor.executemany('''
-INSERT OR IGNORE INTO Professors (name, email, department, phone)
-VALUES (?, ?, ?, ?)
-''', professors)
 
-# Insert sample data into Courses
-courses = [
+SAMPLE_COURSES = [
     ('Introduction to Programming', 'CS101', 3, 'Computer Science', 1),
     ('Data Structures', 'CS102', 4, 'Computer Science', 1),
     ('Calculus I', 'MATH101', 3, 'Mathematics', 2),
@@ -108,13 +104,8 @@ courses = [
     ('Microeconomics', 'ECON101', 3, 'Economics', 7),
     ('Introduction to Political Science', 'POLI101', 3, 'Political Science', 8)
 ]
-cursor.executemany('''
-INSERT OR IGNORE INTO Courses (course_name, course_code, credits, department, professor_id)
-VALUES (?, ?, ?, ?, ?)
-''', courses)
 
-# Insert sample data into Students
-students = [
+SAMPLE_STUDENTS = [
     ('Emily Davis', 'emily.davis@student.edu', '555-8765', '2001-05-12'),
     ('Michael Brown', 'michael.brown@student.edu', '555-4321', '2000-11-30'),
     ('Sarah Johnson', 'sarah.johnson@student.edu', '555-1357', '2002-08-22'),
@@ -131,301 +122,1926 @@ students = [
     ('Sophia Walker', 'sophia.walker@student.edu', '555-2469', '2002-03-05'),
     ('Matthew Young', 'matthew.young@student.edu', '555-3570', '2001-08-20')
 ]
-cursor.executemany('''
-INSERT OR IGNORE INTO Students (name, email, phone, date_of_birth)
-VALUES (?, ?, ?, ?)
-''', students)
 
+# Path of the database used by all of the functions below
+DB_PATH = 'university_results1.db'
+
+# PRAGMAs applied once to every pooled connection when it is opened
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA foreign_keys = ON',
+)
+
+
+# Request statuses that count towards a student's credit load
+CREDIT_LOAD_STATUSES = "('pending', 'accepted', 'waitlisted')"
+
+# Triggers that keep Student_Credit_Load (the total credits of each
+# student's pending, accepted and waitlisted requests) up to date on every
+# change to Course_Requests or to course credits
+CREDIT_LOAD_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_credit_load_request_insert
+    AFTER INSERT ON Course_Requests
+    WHEN NEW.status IN {CREDIT_LOAD_STATUSES}
+    BEGIN
+        INSERT INTO Student_Credit_Load (student_id, credits)
+        SELECT NEW.student_id, credits FROM Courses WHERE course_id = NEW.course_id
+        ON CONFLICT(student_id) DO UPDATE SET credits = credits + excluded.credits;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_credit_load_request_update
+    AFTER UPDATE OF student_id, course_id, status ON Course_Requests
+    BEGIN
+        UPDATE Student_Credit_Load
+        SET credits = credits - COALESCE((SELECT credits FROM Courses WHERE course_id = OLD.course_id), 0)
+        WHERE student_id = OLD.student_id AND OLD.status IN {CREDIT_LOAD_STATUSES};
+
+        INSERT INTO Student_Credit_Load (student_id, credits)
+        SELECT NEW.student_id, credits FROM Courses
+        WHERE course_id = NEW.course_id AND NEW.status IN {CREDIT_LOAD_STATUSES}
+        ON CONFLICT(student_id) DO UPDATE SET credits = credits + excluded.credits;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_credit_load_request_delete
+    AFTER DELETE ON Course_Requests
+    WHEN OLD.status IN {CREDIT_LOAD_STATUSES}
+    BEGIN
+        UPDATE Student_Credit_Load
+        SET credits = credits - COALESCE((SELECT credits FROM Courses WHERE course_id = OLD.course_id), 0)
+        WHERE student_id = OLD.student_id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_credit_load_course_credits
+    AFTER UPDATE OF credits ON Courses
+    BEGIN
+        UPDATE Student_Credit_Load
+        SET credits = credits + (NEW.credits - OLD.credits) * (
+            SELECT COUNT(*) FROM Course_Requests
+            WHERE Course_Requests.student_id = Student_Credit_Load.student_id
+            AND Course_Requests.course_id = NEW.course_id
+            AND Course_Requests.status IN {CREDIT_LOAD_STATUSES}
+        )
+        WHERE student_id IN (
+            SELECT student_id FROM Course_Requests
+            WHERE course_id = NEW.course_id AND status IN {CREDIT_LOAD_STATUSES}
+        );
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_credit_load_course_delete
+    BEFORE DELETE ON Courses
+    BEGIN
+        UPDATE Student_Credit_Load
+        SET credits = credits - OLD.credits * (
+            SELECT COUNT(*) FROM Course_Requests
+            WHERE Course_Requests.student_id = Student_Credit_Load.student_id
+            AND Course_Requests.course_id = OLD.course_id
+            AND Course_Requests.status IN {CREDIT_LOAD_STATUSES}
+        )
+        WHERE student_id IN (
+            SELECT student_id FROM Course_Requests
+            WHERE course_id = OLD.course_id AND status IN {CREDIT_LOAD_STATUSES}
+        );
+    END
+    ''',
+]
+
+# Credit load of every student computed from scratch
+CREDIT_LOAD_QUERY = f'''
+    SELECT Course_Requests.student_id, SUM(Courses.credits) AS credits
+    FROM Course_Requests
+    JOIN Courses ON Course_Requests.course_id = Courses.course_id
+    WHERE Course_Requests.status IN {CREDIT_LOAD_STATUSES}
+    GROUP BY Course_Requests.student_id
+'''
+
+REBUILD_CREDIT_LOAD = [
+    'DELETE FROM Student_Credit_Load',
+    f'INSERT INTO Student_Credit_Load (student_id, credits) {CREDIT_LOAD_QUERY}',
+]
+
+# Triggers that keep Course_Enrollment_Counts (the number of students
+# enrolled in each course) up to date on every change to Enrollments
+ENROLLMENT_COUNT_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_enrollment_count_insert
+    AFTER INSERT ON Enrollments
+    BEGIN
+        INSERT INTO Course_Enrollment_Counts (course_id, enrolled)
+        VALUES (NEW.course_id, 1)
+        ON CONFLICT(course_id) DO UPDATE SET enrolled = enrolled + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_enrollment_count_update
+    AFTER UPDATE OF course_id ON Enrollments
+    BEGIN
+        UPDATE Course_Enrollment_Counts SET enrolled = enrolled - 1
+        WHERE course_id = OLD.course_id;
+
+        INSERT INTO Course_Enrollment_Counts (course_id, enrolled)
+        VALUES (NEW.course_id, 1)
+        ON CONFLICT(course_id) DO UPDATE SET enrolled = enrolled + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_enrollment_count_delete
+    AFTER DELETE ON Enrollments
+    BEGIN
+        UPDATE Course_Enrollment_Counts SET enrolled = enrolled - 1
+        WHERE course_id = OLD.course_id;
+    END
+    ''',
+]
 
-# Commit and close the connection
-conn.commit()
-conn.close()
+ENROLLMENT_COUNT_QUERY = '''
+    SELECT course_id, COUNT(*) AS enrolled
+    FROM Enrollments
+    GROUP BY course_id
+'''
+
+REBUILD_ENROLLMENT_COUNTS = [
+    'DELETE FROM Course_Enrollment_Counts',
+    f'INSERT INTO Course_Enrollment_Counts (course_id, enrolled) {ENROLLMENT_COUNT_QUERY}',
+]
+
+# Milliseconds since the Unix epoch of an SQL time value
+def _epoch_ms(time_value):
+    return f"CAST(ROUND((julianday({time_value}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+# Change id for a request in the inbox of `professor_id` (SQL expressions).
+# Change ids are the time of the change in milliseconds times 1000, bumped
+# past the professor's latest change id if that is larger, so they always
+# grow per professor even when several changes happen within a millisecond
+# or the clock steps back. The MAX() is one seek on the inbox change index.
+def _change_id(professor_id):
+    return f'''MAX({_epoch_ms("'now'")} * 1000, COALESCE(
+        (SELECT MAX(change_id) FROM Course_Requests WHERE professor_id IS {professor_id}), 0) + 1)'''
+
+
+# New pending request, with its inbox columns filled in
+REQUEST_INSERT = f'''
+    INSERT INTO Course_Requests (student_id, course_id, request_date, status, professor_id, change_id)
+    VALUES (?1, ?2, DATE('now'), 'pending', ?3, {_change_id('?3')})
+'''
+
+# Triggers that keep Course_Requests.professor_id (the professor whose
+# inbox a request is in) and change_id (when it last changed) current, so
+# inboxes are read straight from the request indexes without touching
+# Courses. Inserts through REQUEST_INSERT fill both in themselves, which
+# saves rewriting every new row.
+REQUEST_INBOX_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_request_inbox_insert
+    AFTER INSERT ON Course_Requests
+    WHEN NEW.change_id IS NULL
+    BEGIN
+        UPDATE Course_Requests
+        SET professor_id = (SELECT professor_id FROM Courses WHERE course_id = NEW.course_id),
+            change_id = {_change_id('(SELECT professor_id FROM Courses WHERE course_id = NEW.course_id)')}
+        WHERE request_id = NEW.request_id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_request_inbox_update
+    AFTER UPDATE OF course_id, status, priority ON Course_Requests
+    BEGIN
+        UPDATE Course_Requests
+        SET professor_id = (SELECT professor_id FROM Courses WHERE course_id = NEW.course_id),
+            change_id = {_change_id('(SELECT professor_id FROM Courses WHERE course_id = NEW.course_id)')}
+        WHERE request_id = NEW.request_id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_request_inbox_course_professor
+    AFTER UPDATE OF professor_id ON Courses
+    WHEN NEW.professor_id IS NOT OLD.professor_id
+    BEGIN
+        UPDATE Course_Requests
+        SET professor_id = NEW.professor_id, change_id = {_change_id('NEW.professor_id')}
+        WHERE course_id = NEW.course_id;
+    END
+    ''',
+]
+# Term of a grade, as an SQL expression over its date: 'YYYY-Spring'
+# (January to May), 'YYYY-Summer' (June and July) or 'YYYY-Fall' (August to
+# December), and 'Undated' for grades without a date. Grade dates are
+# stored as 'YYYY-MM-DD', so the year and month are sliced out rather than
+# parsed, which keeps the grade triggers cheap.
+def _grade_term(grade_date):
+    return f'''COALESCE(substr({grade_date}, 1, 4) || CASE
+        WHEN substr({grade_date}, 6, 2) <= '05' THEN '-Spring'
+        WHEN substr({grade_date}, 6, 2) <= '07' THEN '-Summer'
+        ELSE '-Fall' END, 'Undated')'''
+
+
+def _count_grade_change(grade_date):
+    return f'''
+        INSERT INTO Grade_Changes (term, changes)
+        VALUES ({_grade_term(grade_date)}, 1)
+        ON CONFLICT(term) DO UPDATE SET changes = changes + 1;
+    '''
+
+
+# Triggers that count the changes to each term's grades in Grade_Changes,
+# so cached analytics can tell whether they are still current. Changing a
+# course's credits or department counts as a change to every term.
+GRADE_CHANGE_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_grade_changes_insert
+    AFTER INSERT ON Grades
+    BEGIN
+        {_count_grade_change('NEW.grade_date')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_grade_changes_update
+    AFTER UPDATE ON Grades
+    BEGIN
+        {_count_grade_change('NEW.grade_date')}
+
+        UPDATE Grade_Changes SET changes = changes + 1
+        WHERE OLD.grade_date IS NOT NEW.grade_date AND term = {_grade_term('OLD.grade_date')};
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_grade_changes_delete
+    AFTER DELETE ON Grades
+    BEGIN
+        {_count_grade_change('OLD.grade_date')}
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_grade_changes_course
+    AFTER UPDATE OF credits, department ON Courses
+    WHEN NEW.credits IS NOT OLD.credits OR NEW.department IS NOT OLD.department
+    BEGIN
+        UPDATE Grade_Changes SET changes = changes + 1;
+    END
+    ''',
+]
+
+# Indexes for the hot lookup paths
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_enrollments_student_course ON Enrollments (student_id, course_id)',
+    'CREATE INDEX IF NOT EXISTS idx_enrollments_course ON Enrollments (course_id, student_id)',
+    'CREATE INDEX IF NOT EXISTS idx_course_requests_student_course ON Course_Requests (student_id, course_id, status)',
+    'CREATE INDEX IF NOT EXISTS idx_course_requests_course ON Course_Requests (course_id, status)',
+    'CREATE INDEX IF NOT EXISTS idx_courses_professor ON Courses (professor_id)',
+    'CREATE INDEX IF NOT EXISTS idx_grades_student ON Grades (student_id)',
+]
+
+# Head of a course's waitlist in one index seek
+WAITLIST_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_course_requests_waitlist
+    ON Course_Requests (course_id, priority DESC, request_id)
+    WHERE status = 'waitlisted'
+'''
+
+# Tables with ON DELETE actions on their foreign keys, as (table, columns,
+# definition). Deleting a student or course deletes everything that belongs
+# to it; deleting a professor leaves their courses and requests unassigned.
+CASCADING_TABLES = [
+    ('Courses', 'course_id, course_name, course_code, credits, department, professor_id, capacity', '''
+    course_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_name TEXT NOT NULL,
+    course_code TEXT UNIQUE NOT NULL,
+    credits INTEGER NOT NULL,
+    department TEXT,
+    professor_id INTEGER,
+    capacity INTEGER,
+    FOREIGN KEY (professor_id) REFERENCES Professors(professor_id) ON DELETE SET NULL
+    '''),
+    ('Enrollments', 'enrollment_id, student_id, course_id, enrollment_date', '''
+    enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER,
+    course_id INTEGER,
+    enrollment_date DATE,
+    FOREIGN KEY (student_id) REFERENCES Students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE CASCADE
+    '''),
+    ('Grades', 'grade_id, course_id, student_id, grade, grade_date', '''
+    grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER,
+    student_id INTEGER,
+    grade TEXT,
+    grade_date DATE,
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES Students(student_id) ON DELETE CASCADE,
+    UNIQUE (course_id, student_id)
+    '''),
+    ('Course_Requests', 'request_id, student_id, course_id, request_date, status, professor_id, priority', '''
+    request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER,
+    course_id INTEGER,
+    request_date DATE,
+    status TEXT,
+    professor_id INTEGER,
+    priority INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES Students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE CASCADE,
+    FOREIGN KEY (professor_id) REFERENCES Professors(professor_id) ON DELETE SET NULL
+    '''),
+    ('Student_Credit_Load', 'student_id, credits', '''
+    student_id INTEGER PRIMARY KEY,
+    credits INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES Students(student_id) ON DELETE CASCADE
+    '''),
+    ('Course_Enrollment_Counts', 'course_id, enrolled', '''
+    course_id INTEGER PRIMARY KEY,
+    enrolled INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE CASCADE
+    '''),
+]
+
+
+# Statements recreating `table` with a new definition, keeping its rows.
+# SQLite cannot change the foreign keys of an existing table, so it is
+# copied into a new one (foreign key enforcement must be off, as it is
+# during migrations).
+def _rebuild_table(table, columns, definition):
+    return [
+        f'CREATE TABLE {table}_new ({definition})',
+        f'INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}',
+        f'DROP TABLE {table}',
+        f'ALTER TABLE {table}_new RENAME TO {table}',
+    ]
+
+
+# Versioned schema migrations. Each entry is (version, description,
+# statements); the version reached so far is stored in PRAGMA user_version
+# so every migration runs exactly once per database.
+MIGRATIONS = [
+    (1, 'Base tables', SCHEMA),
+    (2, 'Indexes for the hot lookup paths', INDEXES),
+    (3, 'Materialized per-student credit load', [
+        '''
+        CREATE TABLE IF NOT EXISTS Student_Credit_Load (
+            student_id INTEGER PRIMARY KEY,
+            credits INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        *CREDIT_LOAD_TRIGGERS,
+        *REBUILD_CREDIT_LOAD,
+    ]),
+    (4, 'Course capacity and waitlist', [
+        'ALTER TABLE Courses ADD COLUMN capacity INTEGER',
+        'ALTER TABLE Course_Requests ADD COLUMN priority INTEGER NOT NULL DEFAULT 0',
+        '''
+        CREATE TABLE IF NOT EXISTS Course_Enrollment_Counts (
+            course_id INTEGER PRIMARY KEY,
+            enrolled INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        *ENROLLMENT_COUNT_TRIGGERS,
+        *REBUILD_ENROLLMENT_COUNTS,
+        WAITLIST_INDEX,
+        # Waitlisted requests count towards the credit load
+        'DROP TRIGGER IF EXISTS trg_credit_load_request_insert',
+        'DROP TRIGGER IF EXISTS trg_credit_load_request_update',
+        'DROP TRIGGER IF EXISTS trg_credit_load_request_delete',
+        'DROP TRIGGER IF EXISTS trg_credit_load_course_credits',
+        'DROP TRIGGER IF EXISTS trg_credit_load_course_delete',
+        *CREDIT_LOAD_TRIGGERS,
+        *REBUILD_CREDIT_LOAD,
+    ]),
+    (5, 'ON DELETE actions for every foreign key', [
+        # Triggers must go first: renaming a table fails while a trigger
+        # refers to a table that is being rebuilt
+        *(f'DROP TRIGGER IF EXISTS {name}' for name in (
+            'trg_credit_load_request_insert', 'trg_credit_load_request_update', 'trg_credit_load_request_delete',
+            'trg_credit_load_course_credits', 'trg_credit_load_course_delete',
+            'trg_enrollment_count_insert', 'trg_enrollment_count_update', 'trg_enrollment_count_delete',
+        )),
+        *(statement for table in CASCADING_TABLES for statement in _rebuild_table(*table)),
+        *INDEXES,
+        WAITLIST_INDEX,
+        # Lets deleting a professor unassign their requests without a scan
+        'CREATE INDEX IF NOT EXISTS idx_course_requests_professor ON Course_Requests (professor_id)',
+        *CREDIT_LOAD_TRIGGERS,
+        *ENROLLMENT_COUNT_TRIGGERS,
+    ]),
+    (6, 'Weekly course meetings', [
+        '''
+        CREATE TABLE IF NOT EXISTS Course_Meetings (
+            meeting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_id INTEGER NOT NULL,
+            day INTEGER NOT NULL CHECK (day BETWEEN 0 AND 6),
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL,
+            CHECK (0 <= start_minute AND start_minute < end_minute AND end_minute <= 1440),
+            FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE CASCADE
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_course_meetings_course ON Course_Meetings (course_id, day, start_minute)',
+    ]),
+    (7, 'Professor request inbox', [
+        'ALTER TABLE Course_Requests ADD COLUMN change_id INTEGER',
+        # Existing requests count as changed on the day they were made
+        f'''
+        UPDATE Course_Requests
+        SET professor_id = (SELECT professor_id FROM Courses WHERE Courses.course_id = Course_Requests.course_id),
+            change_id = {_epoch_ms("COALESCE(request_date, 'now')")} * 1000
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_course_requests_inbox ON Course_Requests (professor_id, status)',
+        'CREATE INDEX IF NOT EXISTS idx_course_requests_changes ON Course_Requests (professor_id, change_id)',
+        *REQUEST_INBOX_TRIGGERS,
+    ]),
+    (8, 'Grade change counters per term', [
+        '''
+        CREATE TABLE IF NOT EXISTS Grade_Changes (
+            term TEXT PRIMARY KEY,
+            changes INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        f'''
+        INSERT INTO Grade_Changes (term, changes)
+        SELECT {_grade_term('grade_date')}, COUNT(*) FROM Grades GROUP BY 1
+        ''',
+        *GRADE_CHANGE_TRIGGERS,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# Bring the database behind `conn` up to SCHEMA_VERSION and return the
+# version it was at before. Foreign keys are not enforced while migrating,
+# so tables can be rebuilt without cascading deletes.
+def migrate(conn):
+    start_version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if start_version >= SCHEMA_VERSION:
+        return start_version
+
+    foreign_keys = conn.execute('PRAGMA foreign_keys').fetchone()[0]
+    conn.execute('PRAGMA foreign_keys = OFF')
+    try:
+        for version, description, statements in MIGRATIONS:
+            if version <= start_version:
+                continue
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Another connection may have migrated while we waited for the lock
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    finally:
+        conn.execute(f'PRAGMA foreign_keys = {foreign_keys}')
+    return start_version
+
+
+# Pool of SQLite connections shared by all functions in this module.
+# Each thread checks out at most one connection at a time (nested
+# get_connection() calls on the same thread share it), idle connections
+# are health-checked before reuse and at most `pool_size` connections are
+# ever open at once.
+class ConnectionPool:
+    def __init__(self, db_path, pool_size=8, timeout=30.0):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self._closed = False
+        self._migrated = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
+        # Apply pending schema migrations the first time the pool connects
+        if not self._migrated:
+            with self._lock:
+                if not self._migrated:
+                    try:
+                        migrate(conn)
+                    except BaseException:
+                        conn.close()
+                        raise
+                    self._migrated = True
+
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    # Check that an idle connection is still usable before handing it out
+    def _healthy(self, conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+
+        # Reuse the connection this thread already holds
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            return PooledConnection(self, held)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Timed out waiting for a pooled connection.")
+
+        conn = None
+        try:
+            while conn is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._connect()
+                    break
+                if self._healthy(candidate):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        # Never hand out a connection with a half-finished transaction
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            conn = None
+
+        if conn is not None:
+            if self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+# Upper bounds (in seconds) of the latency histogram buckets kept per query
+QUERY_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                         0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float('inf'))
+
+_PLANNED_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+
+# Per-query statistics collected while instrumentation is enabled: call
+# counts, latency histograms, rows returned or changed, and the lines of
+# code that ran each query. Queries slower than `slow_threshold` seconds
+# are kept (with their query plan) in `slow_queries` and appended to
+# `slow_log` when a file path is given.
+class QueryStats:
+    def __init__(self, slow_threshold=0.1, slow_log=None, max_slow_queries=1000):
+        self.slow_threshold = slow_threshold
+        self.slow_log = slow_log
+        self.slow_queries = collections.deque(maxlen=max_slow_queries)
+        self._queries = {}
+        self._plans = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    # Statement text with its whitespace collapsed, used to group calls
+    def _key(self, sql):
+        key = self._keys.get(sql)
+        if key is None:
+            key = ' '.join(sql.split())
+            if len(self._keys) < 10000:
+                self._keys[sql] = key
+        return key
+
+    # Record one run of a statement. `plan` is its query plan when already
+    # known; otherwise it is worked out on `conn` (if given) when slow.
+    def record(self, conn, sql, params, site, elapsed, rows, many=False, plan=None):
+        key = self._key(sql)
+        bucket = bisect.bisect_left(QUERY_LATENCY_BUCKETS, elapsed)
+        with self._lock:
+            query = self._queries.get(key)
+            if query is None:
+                query = self._queries[key] = {
+                    'sql': key, 'errors': 0, 'rows': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                    'histogram': [0] * len(QUERY_LATENCY_BUCKETS), 'call_sites': collections.Counter(),
+                }
+            query['rows'] += rows
+            query['total_seconds'] += elapsed
+            if elapsed > query['max_seconds']:
+                query['max_seconds'] = elapsed
+            query['histogram'][bucket] += 1
+            query['call_sites'][site] += 1
+
+        if elapsed >= self.slow_threshold:
+            site = _call_site(site)
+            if plan is None and conn is not None and not many:
+                plan = self.plan(conn, sql, params)
+            entry = {'time': time.time(), 'sql': key, 'seconds': elapsed, 'rows': rows,
+                     'call_site': site, 'plan': plan}
+            with self._lock:
+                self.slow_queries.append(entry)
+                if self.slow_log:
+                    with open(self.slow_log, 'a') as log:
+                        log.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {elapsed * 1000:.1f} ms, "
+                                  f"{rows} rows, {site}: {key}\n")
+                        for line in plan or ():
+                            log.write(f"    {line}\n")
+
+    def record_error(self, sql):
+        key = self._key(sql)
+        with self._lock:
+            if key in self._queries:
+                self._queries[key]['errors'] += 1
+
+    # EXPLAIN QUERY PLAN of a statement, worked out once per statement
+    def plan(self, conn, sql, params):
+        key = self._key(sql)
+        if key not in self._plans:
+            if not key.upper().startswith(_PLANNED_STATEMENTS):
+                return None
+            try:
+                self._plans[key] = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+            except sqlite3.Error:
+                self._plans[key] = None
+        return self._plans[key]
+
+    def snapshot(self):
+        with self._lock:
+            queries = [dict(query, histogram=list(query['histogram']), call_sites=query['call_sites'].most_common())
+                       for query in self._queries.values()]
+        for query in queries:
+            query['calls'] = sum(query['histogram'])
+            query['call_sites'] = [(_call_site(site), calls) for site, calls in query['call_sites']]
+        return queries
+
+
+# "function (file:line)" for a (code object, line number) call site
+def _call_site(site):
+    code, line = site
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{line})"
+
+
+# Cursor that reports each query it runs to a QueryStats. A query's time
+# covers executing it and fetching its rows; it is recorded once all rows
+# have been read (or the cursor is reused or closed). The plan of a query
+# returning rows is worked out when it runs, as the cursor may only be
+# finished on another thread (by the garbage collector).
+class QueryCursor:
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._query = None
+
+    def _execute(self, sql, params, many, frame):
+        self._finish()
+        site = (frame.f_code, frame.f_lineno)
+        start = time.perf_counter()
+        try:
+            if many:
+                self._cursor.executemany(sql, params)
+            else:
+                self._cursor.execute(sql, params)
+        except BaseException:
+            self._stats.record_error(sql)
+            raise
+        elapsed = time.perf_counter() - start
+
+        if self._cursor.description is None:
+            rows = self._cursor.rowcount
+            self._stats.record(self._cursor.connection, sql, params, site, elapsed, rows if rows > 0 else 0,
+                               many=many)
+        else:
+            self._query = [sql, params, site, elapsed, 0, self._stats.plan(self._cursor.connection, sql, params)]
+        return self
+
+    def execute(self, sql, params=()):
+        return self._execute(sql, params, False, sys._getframe(1))
+
+    def executemany(self, sql, params):
+        return self._execute(sql, params, True, sys._getframe(1))
+
+    def _finish(self):
+        if self._query is not None:
+            sql, params, site, elapsed, rows, plan = self._query
+            self._query = None
+            self._stats.record(None, sql, params, site, elapsed, rows, plan=plan)
+
+    def _fetched(self, start, rows, done):
+        if self._query is not None:
+            self._query[3] += time.perf_counter() - start
+            self._query[4] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(self._cursor.arraysize if size is None else size)
+        self._fetched(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __del__(self):
+        # May run on another thread, so leave the connection alone
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+# Connection handed out by the pool. It behaves like a sqlite3 connection,
+# except that close() gives the underlying connection back to the pool.
+class PooledConnection:
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._owner = threading.get_ident()
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    # Cursors are wrapped in a QueryCursor while query instrumentation is on
+    def cursor(self, *args):
+        cursor = self.__getattr__('cursor')(*args)
+        return cursor if query_stats is None else QueryCursor(cursor, query_stats)
+
+    def execute(self, sql, params=()):
+        if query_stats is None:
+            return self.__getattr__('execute')(sql, params)
+        return QueryCursor(self.__getattr__('cursor')(), query_stats)._execute(sql, params, False, sys._getframe(1))
+
+    def executemany(self, sql, params):
+        if query_stats is None:
+            return self.__getattr__('executemany')(sql, params)
+        return QueryCursor(self.__getattr__('cursor')(), query_stats)._execute(sql, params, True, sys._getframe(1))
+
+    # `with conn:` commits or rolls back like a sqlite3 connection but keeps
+    # using this (instrumented) connection
+    def __enter__(self):
+        self.__getattr__('__enter__')()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __del__(self):
+        # Return connections that were never closed explicitly, as long as
+        # this runs on the thread that checked them out
+        if getattr(self, '_conn', None) is not None and self._owner == threading.get_ident():
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+query_stats = None
+
+
+# Start recording every query run through the connection pool, discarding
+# anything recorded before. See QueryStats for the arguments.
+def enable_query_stats(slow_threshold=0.1, slow_log=None):
+    global query_stats
+    query_stats = QueryStats(slow_threshold=slow_threshold, slow_log=slow_log)
+    return query_stats
+
+
+def disable_query_stats():
+    global query_stats
+    query_stats = None
+
+
+# Latency percentile estimated from a histogram (the bucket's upper bound)
+def _histogram_percentile(histogram, fraction):
+    target = sum(histogram) * fraction
+    seen = 0
+    for bound, count in zip(QUERY_LATENCY_BUCKETS, histogram):
+        seen += count
+        if count and seen >= target:
+            return bound
+    return 0.0
+
+
+# Print the `top` queries by total time (or 'calls', 'max_seconds', 'rows')
+# with their latency distribution and main call site, followed by the
+# slowest logged queries. Returns the per-query statistics.
+def query_stats_report(top=20, sort='total_seconds'):
+    if query_stats is None:
+        print("Query instrumentation is not enabled.")
+        return []
+
+    queries = sorted(query_stats.snapshot(), key=lambda query: query[sort], reverse=True)
+    for query in queries:
+        query['mean_seconds'] = query['total_seconds'] / query['calls'] if query['calls'] else 0.0
+        query['p50_seconds'] = _histogram_percentile(query['histogram'], 0.5)
+        query['p95_seconds'] = _histogram_percentile(query['histogram'], 0.95)
+        query['p99_seconds'] = _histogram_percentile(query['histogram'], 0.99)
+
+    print(f"{'calls':>9} {'total ms':>10} {'mean ms':>9} {'p95 <=':>8} {'max ms':>9} {'rows':>10}  query")
+    for query in queries[:top]:
+        site, _ = query['call_sites'][0]
+        print(f"{query['calls']:>9,} {query['total_seconds'] * 1000:>10.1f} {query['mean_seconds'] * 1000:>9.3f} "
+              f"{query['p95_seconds'] * 1000:>8.2f} {query['max_seconds'] * 1000:>9.2f} {query['rows']:>10,}  "
+              f"{query['sql'][:80]}")
+        print(f"{'':>61}from {site}" + (f" and {len(query['call_sites']) - 1} more" if len(query['call_sites']) > 1 else ''))
+
+    slowest = sorted(query_stats.slow_queries, key=lambda entry: entry['seconds'], reverse=True)[:5]
+    if slowest:
+        print(f"\nSlowest queries (over {query_stats.slow_threshold * 1000:.0f} ms):")
+        for entry in slowest:
+            print(f"  {entry['seconds'] * 1000:.1f} ms, {entry['rows']} rows, {entry['call_site']}: {entry['sql'][:100]}")
+            for line in entry['plan'] or ():
+                print(f"      {line}")
+    return queries
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Replace the module's connection pool, e.g. to point it at another
+# database file or change its size. Cached catalog entries are dropped, as
+# they may belong to the previous database.
+def configure_pool(db_path=None, pool_size=8, timeout=30.0):
+    global _pool, DB_PATH
+    with _pool_lock:
+        if db_path is not None:
+            DB_PATH = db_path
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(DB_PATH, pool_size=pool_size, timeout=timeout)
+    catalog_cache.clear()
+    dashboard_cache.clear()
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
 
-print("Database schema with Grades and Course Requests created and sample data inserted successfully.")
 
 # Function to get a connection to the SQLite database
 def get_connection():
-    return sqlite3.connect('university_results1.db')
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool.acquire()
+
+
+# Create the database schema (running any pending migrations), optionally
+# switching the module to another database file first
+def init_schema(db_path=None):
+    if db_path is not None:
+        configure_pool(db_path)
+    conn = get_connection()
+    migrate(conn)
+    conn.close()
+    print("Database schema with Grades and Course Requests created successfully.")
 
-# Functions for Managing Students
-def add_student(name, email, phone, date_of_birth):
+
+# Insert the sample professors, courses and students
+def seed_sample_data():
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute('''
-    INSERT INTO Students (name, email, phone, date_of_birth)
+
+    # Insert sample data into Professors
+    cursor.executemany('''
+    INSERT OR IGNORE INTO Professors (name, email, department, phone)
     VALUES (?, ?, ?, ?)
-    ''', (name, email, phone, date_of_birth))
+    ''', SAMPLE_PROFESSORS)
+
+    # Insert sample data into Courses
+    cursor.executemany('''
+    INSERT OR IGNORE INTO Courses (course_name, course_code, credits, department, professor_id)
+    VALUES (?, ?, ?, ?, ?)
+    ''', SAMPLE_COURSES)
+
+    # Insert sample data into Students
+    cursor.executemany('''
+    INSERT OR IGNORE INTO Students (name, email, phone, date_of_birth)
+    VALUES (?, ?, ?, ?)
+    ''', SAMPLE_STUDENTS)
+
     conn.commit()
     conn.close()
+    print("Sample data inserted successfully.")
+
+# Retries of a write transaction that finds the database locked, and the
+# first and longest delay between them (with random jitter)
+BUSY_RETRIES = 8
+BUSY_BACKOFF = (0.01, 0.5)
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+# Run fn(conn, *args) in a BEGIN IMMEDIATE transaction, committing if it
+# returns and rolling back if it raises. Transactions that find the
+# database locked are retried with exponential backoff. Dashboards of the
+# students the transaction changes are dropped once it has finished.
+def run_in_transaction(conn, fn, *args):
+    delay, max_delay = BUSY_BACKOFF
+    with _dashboard_changes():
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                result = fn(conn, *args)
+                conn.commit()
+                return result
+            except sqlite3.OperationalError as error:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not _is_busy(error) or attempt == BUSY_RETRIES:
+                    raise
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, max_delay)
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+
+
+# Single writer used in registration mode. All writes are queued to one
+# thread, which runs them back to back on its own connection, committing
+# up to `batch_size` of them per transaction; every write gets its own
+# savepoint so a failing one does not affect the others. Reads keep
+# running concurrently on the other pooled connections thanks to WAL.
+class WriteQueue:
+    def __init__(self, batch_size=256):
+        import concurrent.futures
+
+        self._future_class = concurrent.futures.Future
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='student-courses-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        future = self._future_class()
+        self._queue.put((fn, args, future))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        conn = get_connection()
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    stopping = True
+                    batch = [item for item in batch if item is not None]
+                if batch:
+                    self._run_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn, batch):
+        def apply(conn):
+            outcomes = []
+            for fn, args, future in batch:
+                conn.execute('SAVEPOINT queued_write')
+                try:
+                    outcomes.append((future, True, fn(conn, *args)))
+                    conn.execute('RELEASE queued_write')
+                except Exception as error:
+                    conn.execute('ROLLBACK TO queued_write')
+                    conn.execute('RELEASE queued_write')
+                    outcomes.append((future, False, error))
+            return outcomes
+
+        try:
+            outcomes = run_in_transaction(conn, apply)
+        except BaseException as error:
+            for fn, args, future in batch:
+                future.set_exception(error)
+            return
+
+        # Only report results once they are committed
+        for future, succeeded, value in outcomes:
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+# Registration mode serializes all writes through a single writer thread
+def start_registration_mode(batch_size=256):
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue(batch_size)
+
+
+def stop_registration_mode():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.stop()
+            _write_queue = None
+
+
+@contextlib.contextmanager
+def registration_mode(batch_size=256):
+    start_registration_mode(batch_size)
+    try:
+        yield
+    finally:
+        stop_registration_mode()
+
+
+# Run a write, fn(conn, *args), in its own transaction, or through the
+# writer thread when registration mode is on. Returns fn's result.
+def run_write(fn, *args):
+    write_queue = _write_queue
+    if write_queue is not None:
+        return write_queue.submit(fn, *args).result()
 
-def delete_student(student_id):
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    DELETE FROM Students
-    WHERE student_id = ?
-    ''', (student_id,))
-    conn.commit()
-    conn.close()
+    try:
+        return run_in_transaction(conn, fn, *args)
+    finally:
+        conn.close()
+
+
+# In-process LRU cache for catalog lookups (course details, credits and
+# owning professor, professor names). The catalog changes only a few times
+# a term, so credit and authorization checks can skip the database; the
+# functions in this module that change courses or professors invalidate
+# the affected entries. Call catalog_cache_clear() after changing the
+# catalog from another process.
+class CatalogCache:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # Return the cached value for `key`, calling loader() on a miss.
+    # None results (unknown IDs) are not cached, and neither are values
+    # loaded while entries were invalidated, as they may predate the change.
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if generation != self._generation:
+                    return value
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+catalog_cache = CatalogCache()
+
+# Student dashboards (see get_student_dashboard), keyed by student ID. The
+# write functions in this module drop the dashboards of the students they
+# change once their transaction has finished, and all of them when the
+# catalog changes. Call dashboard_cache.clear() after changing registrations
+# or grades from another process.
+dashboard_cache = CatalogCache()
+
+_dashboard_writes = threading.local()
+
+
+def catalog_cache_clear():
+    catalog_cache.clear()
+
+
+def catalog_cache_stats():
+    return catalog_cache.stats()
+
+
+# Note that the running write changes the dashboards of these students
+def _dashboard_changed(*student_ids):
+    changed = getattr(_dashboard_writes, 'students', None)
+    if changed is None:
+        dashboard_cache.invalidate(*student_ids)
+    else:
+        changed.update(student_ids)
+
+
+# Collect the students changed by the writes in the block and drop their
+# dashboards when it exits, after the writes are committed or rolled back
+@contextlib.contextmanager
+def _dashboard_changes():
+    outer = getattr(_dashboard_writes, 'students', None)
+    changed = _dashboard_writes.students = set()
+    try:
+        yield
+    finally:
+        _dashboard_writes.students = outer
+        if outer is not None:
+            outer |= changed
+        elif changed:
+            dashboard_cache.invalidate(*changed)
+
+
+# (course_id, course_name, course_code, credits, department, professor_id,
+# capacity) of a course, or None if it does not exist
+def get_course_info(course_id):
+    def load():
+        conn = get_connection()
+        course = conn.execute('''
+        SELECT course_id, course_name, course_code, credits, department, professor_id, capacity
+        FROM Courses
+        WHERE course_id = ?
+        ''', (course_id,)).fetchone()
+        conn.close()
+        return course
+
+    return catalog_cache.get(('course', course_id), load)
+
+
+# Name of a professor, or None if they do not exist
+def get_professor_name(professor_id):
+    def load():
+        conn = get_connection()
+        professor = conn.execute('''
+        SELECT name FROM Professors
+        WHERE professor_id = ?
+        ''', (professor_id,)).fetchone()
+        conn.close()
+        return professor[0] if professor else None
+
+    return catalog_cache.get(('professor', professor_id), load)
+
+
+# Marks an argument that was not passed where None has a meaning of its own
+_UNSET = object()
+
+# Pass as a value to the update functions to set a nullable column to NULL,
+# e.g. update_student(student_id, phone=CLEAR); None leaves it unchanged
+CLEAR = object()
+
+# Columns the update functions may change in each table, and those of them
+# that cannot be cleared
+UPDATABLE_COLUMNS = {
+    'Students': ('name', 'email', 'phone', 'date_of_birth'),
+    'Courses': ('course_name', 'course_code', 'credits', 'department', 'professor_id', 'capacity'),
+    'Professors': ('name', 'email', 'department', 'phone'),
+}
+REQUIRED_COLUMNS = {
+    'Students': ('name', 'email'),
+    'Courses': ('course_name', 'course_code', 'credits'),
+    'Professors': ('name',),
+}
+
+
+def _update_rows(conn, table, updates):
+    key = TABLE_KEYS[table]
+    # Rows changing the same columns share one statement and one executemany
+    groups = {}
+    for row_id, values in updates:
+        if values:
+            columns = tuple(sorted(values))
+            groups.setdefault(columns, []).append(tuple(values[column] for column in columns) + (row_id,))
+
+    if table == 'Students':
+        _dashboard_changed(*(row_id for row_id, values in updates if values))
+
+    updated = 0
+    for columns, params in groups.items():
+        cursor = conn.executemany(f'''
+        UPDATE {table}
+        SET {', '.join(f'{column} = ?' for column in columns)}
+        WHERE {key} = ?
+        ''', params)
+        updated += cursor.rowcount
+
+        # More seats (or no limit) may let waitlisted students in
+        if table == 'Courses' and 'capacity' in columns:
+            for values in params:
+                _promote_waitlist(conn, values[-1], capacity=values[columns.index('capacity')])
+    return updated
+
+
+# Update many rows of `table` in one transaction. `updates` is an iterable
+# of (id, {column: value}); only the given columns are written, each row
+# with a single UPDATE, and CLEAR (or None) sets a column to NULL. Returns
+# the number of rows updated.
+def update_rows(table, updates):
+    if table not in UPDATABLE_COLUMNS:
+        raise ValueError(f"Cannot update table: {table}")
+    updates = [(row_id, {column: None if value is CLEAR else value for column, value in dict(values).items()})
+               for row_id, values in updates]
+    for row_id, values in updates:
+        unknown = set(values) - set(UPDATABLE_COLUMNS[table])
+        if unknown:
+            raise ValueError(f"Cannot update {table} columns: {', '.join(sorted(unknown))}")
+        cleared = {column for column, value in values.items() if value is None} & set(REQUIRED_COLUMNS[table])
+        if cleared:
+            raise ValueError(f"Cannot clear required {table} columns: {', '.join(sorted(cleared))}")
+
+    updated = run_write(_update_rows, table, updates)
+    if table == 'Courses':
+        catalog_cache.invalidate(*(('course', row_id) for row_id, values in updates if values))
+        dashboard_cache.clear()
+    elif table == 'Professors':
+        catalog_cache.invalidate(*(('professor', row_id) for row_id, values in updates if values))
+        dashboard_cache.clear()
+    return updated
+
+
+def _delete_rows(conn, table, row_ids):
+    key = TABLE_KEYS[table]
+    affected_courses = []
+    freed_courses = []
+    if table in ('Professors', 'Students'):
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS Delete_Ids (id INTEGER PRIMARY KEY)')
+        conn.execute('DELETE FROM temp.Delete_Ids')
+        conn.executemany('INSERT OR IGNORE INTO temp.Delete_Ids VALUES (?)', ((row_id,) for row_id in row_ids))
+        if table == 'Professors':
+            # Courses of deleted professors lose their professor, so their
+            # cached catalog entries go stale too
+            affected_courses = [row[0] for row in conn.execute('''
+            SELECT course_id FROM Courses
+            WHERE professor_id IN (SELECT id FROM temp.Delete_Ids)
+            ''')]
+        else:
+            # Seats of the deleted students' enrollments go to the waitlists
+            freed_courses = conn.execute('''
+            SELECT DISTINCT Courses.course_id, Courses.capacity
+            FROM Enrollments
+            JOIN Courses ON Enrollments.course_id = Courses.course_id
+            WHERE Enrollments.student_id IN (SELECT id FROM temp.Delete_Ids)
+            ''').fetchall()
+            _dashboard_changed(*row_ids)
+        conn.execute('DELETE FROM temp.Delete_Ids')
+
+    # Foreign keys cascade the delete to the rows that belong to each one
+    cursor = conn.executemany(f'''
+    DELETE FROM {table}
+    WHERE {key} = ?
+    ''', ((row_id,) for row_id in row_ids))
+    deleted = cursor.rowcount
+
+    for course_id, capacity in freed_courses:
+        _promote_waitlist(conn, course_id, capacity=capacity)
+    return deleted, affected_courses
+
+
+# Delete many rows of Students, Courses or Professors in one transaction.
+# The ON DELETE actions of the foreign keys remove (or unassign) the rows
+# that refer to them. Returns the number of rows deleted.
+def delete_rows(table, row_ids):
+    if table not in UPDATABLE_COLUMNS:
+        raise ValueError(f"Cannot delete from table: {table}")
+    row_ids = list(row_ids)
+    deleted, affected_courses = run_write(_delete_rows, table, row_ids)
+    if table == 'Courses':
+        catalog_cache.invalidate(*(('course', row_id) for row_id in row_ids))
+        dashboard_cache.clear()
+    elif table == 'Professors':
+        catalog_cache.invalidate(*(('professor', row_id) for row_id in row_ids))
+        catalog_cache.invalidate(*(('course', course_id) for course_id in affected_courses))
+        dashboard_cache.clear()
+    return deleted
+
+
+# The keyword arguments of an update function that are not None, as
+# {column: value}
+def _provided(**fields):
+    return {column: value for column, value in fields.items() if value is not None}
+
+# Functions for Managing Students
+def _add_student(conn, name, email, phone, date_of_birth):
+    conn.execute('''
+    INSERT INTO Students (name, email, phone, date_of_birth)
+    VALUES (?, ?, ?, ?)
+    ''', (name, email, phone, date_of_birth))
+
+def add_student(name, email, phone, date_of_birth):
+    run_write(_add_student, name, email, phone, date_of_birth)
+
+def delete_student(student_id):
+    return delete_students([student_id])
+
+# Delete many students in one transaction, together with their enrollments,
+# grades and course requests. Returns the number of students deleted.
+def delete_students(student_ids):
+    return delete_rows('Students', student_ids)
 
 def update_student(student_id, name=None, email=None, phone=None, date_of_birth=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    if name:
-        cursor.execute('''
-        UPDATE Students
-        SET name = ?
-        WHERE student_id = ?
-        ''', (name, student_id))
-    if email:
-        cursor.execute('''
-        UPDATE Students
-        SET email = ?
-        WHERE student_id = ?
-        ''', (email, student_id))
-    if phone:
-        cursor.execute('''
-        UPDATE Students
-        SET phone = ?
-        WHERE student_id = ?
-        ''', (phone, student_id))
-    if date_of_birth:
-        cursor.execute('''
-        UPDATE Students
-        SET date_of_birth = ?
-        WHERE student_id = ?
-        ''', (date_of_birth, student_id))
-    conn.commit()
-    conn.close()
+    fields = _provided(name=name, email=email, phone=phone, date_of_birth=date_of_birth)
+    return update_rows('Students', [(student_id, fields)])
 
 # Functions for Managing Courses
-def add_course(course_name, course_code, credits, department, professor_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    INSERT INTO Courses (course_name, course_code, credits, department, professor_id)
-    VALUES (?, ?, ?, ?, ?)
-    ''', (course_name, course_code, credits, department, professor_id))
-    conn.commit()
-    conn.close()
+def _add_course(conn, course_name, course_code, credits, department, professor_id, capacity):
+    cursor = conn.execute('''
+    INSERT INTO Courses (course_name, course_code, credits, department, professor_id, capacity)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (course_name, course_code, credits, department, professor_id, capacity))
+    return cursor.lastrowid
+
+def add_course(course_name, course_code, credits, department, professor_id, capacity=None):
+    course_id = run_write(_add_course, course_name, course_code, credits, department, professor_id, capacity)
+    catalog_cache.invalidate(('course', course_id))
 
 def delete_course(course_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    DELETE FROM Courses
-    WHERE course_id = ?
-    ''', (course_id,))
-    conn.commit()
-    conn.close()
+    return delete_courses([course_id])
 
-def update_course(course_id, course_name=None, course_code=None, credits=None, department=None, professor_id=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    if course_name:
-        cursor.execute('''
-        UPDATE Courses
-        SET course_name = ?
-        WHERE course_id = ?
-        ''', (course_name, course_id))
-    if course_code:
-        cursor.execute('''
-        UPDATE Courses
-        SET course_code = ?
-        WHERE course_id = ?
-        ''', (course_code, course_id))
-    if credits:
-        cursor.execute('''
-        UPDATE Courses
-        SET credits = ?
-        WHERE course_id = ?
-        ''', (credits, course_id))
-    if department:
-        cursor.execute('''
-        UPDATE Courses
-        SET department = ?
-        WHERE course_id = ?
-        ''', (department, course_id))
-    if professor_id is not None:
-        cursor.execute('''
-        UPDATE Courses
-        SET professor_id = ?
-        WHERE course_id = ?
-        ''', (professor_id, course_id))
-    conn.commit()
-    conn.close()
+# Delete many courses in one transaction, together with their enrollments,
+# grades and course requests. Returns the number of courses deleted.
+def delete_courses(course_ids):
+    return delete_rows('Courses', course_ids)
+
+def update_course(course_id, course_name=None, course_code=None, credits=None, department=None,
+                  professor_id=None, capacity=None):
+    fields = _provided(course_name=course_name, course_code=course_code, credits=credits,
+                       department=department, professor_id=professor_id, capacity=capacity)
+    return update_rows('Courses', [(course_id, fields)])
 
 # Functions for Managing Professors
-def add_professor(name, email, department, phone):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
+def _add_professor(conn, name, email, department, phone):
+    conn.execute('''
     INSERT INTO Professors (name, email, department, phone)
     VALUES (?, ?, ?, ?)
     ''', (name, email, department, phone))
-    conn.commit()
-    conn.close()
+
+def add_professor(name, email, department, phone):
+    run_write(_add_professor, name, email, department, phone)
 
 def delete_professor(professor_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    DELETE FROM Professors
-    WHERE professor_id = ?
-    ''', (professor_id,))
-    conn.commit()
-    conn.close()
+    return delete_professors([professor_id])
+
+# Delete many professors in one transaction. Their courses stay, without a
+# professor. Returns the number of professors deleted.
+def delete_professors(professor_ids):
+    return delete_rows('Professors', professor_ids)
 
 def update_professor(professor_id, name=None, email=None, department=None, phone=None):
+    fields = _provided(name=name, email=email, department=department, phone=phone)
+    return update_rows('Professors', [(professor_id, fields)])
+
+
+# Foreign keys with ON DELETE actions, as (table, column, parent table,
+# parent column, action), read from the schema
+def _foreign_keys(conn):
+    tables = [row[0] for row in conn.execute('''
+    SELECT name FROM sqlite_master
+    WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+    ''')]
+    keys = []
+    for table in tables:
+        for row in conn.execute(f'PRAGMA foreign_key_list({table})'):
+            parent, column, parent_column, action = row[2], row[3], row[4], row[6]
+            if action in ('CASCADE', 'SET NULL'):
+                keys.append((table, column, parent, parent_column or TABLE_KEYS.get(parent), action))
+    return keys
+
+
+def _orphan_condition(table, column, parent, parent_column):
+    return f'''
+    {table}.{column} IS NOT NULL
+    AND NOT EXISTS (SELECT 1 FROM {parent} WHERE {parent}.{parent_column} = {table}.{column})
+    '''
+
+
+# The foreign keys _foreign_keys() finds once every migration has run,
+# worked out on an empty in-memory database, for the tables and columns
+# that exist behind `conn`. Lets a database be checked before it is
+# migrated.
+def _migrated_foreign_keys(conn):
+    schema = sqlite3.connect(':memory:')
+    try:
+        migrate(schema)
+        keys = _foreign_keys(schema)
+    finally:
+        schema.close()
+
+    def columns(table):
+        return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+    return [key for key in keys if key[1] in columns(key[0]) and key[3] in columns(key[2])]
+
+
+# Count the rows that refer to a student, course or professor that no
+# longer exists (left behind by deletes made without foreign keys).
+# Pass `conn` to check a database outside the pool, such as one opened
+# read-only before it is migrated. Returns (table, column, parent table,
+# orphaned rows) for every key.
+def find_orphans(conn=None):
+    owned = conn is None
+    if owned:
+        conn = get_connection()
+    try:
+        orphans = []
+        for table, column, parent, parent_column, action in _migrated_foreign_keys(conn):
+            count = conn.execute(f'''
+            SELECT COUNT(*) FROM {table}
+            WHERE {_orphan_condition(table, column, parent, parent_column)}
+            ''').fetchone()[0]
+            orphans.append((table, column, parent, count))
+    finally:
+        if owned:
+            conn.close()
+    return orphans
+
+
+# Apply the ON DELETE action of every foreign key to the rows it missed:
+# orphaned enrollments, grades and requests are deleted and courses of
+# deleted professors are unassigned, in one transaction. The credit loads
+# and enrollment counts are then rebuilt and, unless turned off, the
+# database is analyzed and vacuumed. Returns the rows fixed per key and the
+# time each step took.
+def clean_orphans(vacuum=True, analyze=True):
+    stats = {'fixed': {}}
     conn = get_connection()
-    cursor = conn.cursor()
-    if name:
-        cursor.execute('''
-        UPDATE Professors
-        SET name = ?
-        WHERE professor_id = ?
-        ''', (name, professor_id))
-    if email:
-        cursor.execute('''
-        UPDATE Professors
-        SET email = ?
-        WHERE professor_id = ?
-        ''', (email, professor_id))
-    if department:
-        cursor.execute('''
-        UPDATE Professors
-        SET department = ?
-        WHERE professor_id = ?
-        ''', (department, professor_id))
-    if phone:
+    try:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        stats['bytes_before'] = conn.execute('PRAGMA page_count').fetchone()[0] * page_size
+
+        def clean(conn):
+            for table, column, parent, parent_column, action in _foreign_keys(conn):
+                condition = _orphan_condition(table, column, parent, parent_column)
+                if action == 'CASCADE':
+                    cursor = conn.execute(f'DELETE FROM {table} WHERE {condition}')
+                else:
+                    cursor = conn.execute(f'UPDATE {table} SET {column} = NULL WHERE {condition}')
+                stats['fixed'][f"{table}.{column}"] = cursor.rowcount
+            for statement in REBUILD_CREDIT_LOAD + REBUILD_ENROLLMENT_COUNTS:
+                conn.execute(statement)
+
+        start = time.perf_counter()
+        run_in_transaction(conn, clean)
+        stats['clean_seconds'] = time.perf_counter() - start
+        catalog_cache.clear()
+        dashboard_cache.clear()
+
+        if analyze:
+            start = time.perf_counter()
+            conn.execute('ANALYZE')
+            stats['analyze_seconds'] = time.perf_counter() - start
+        if vacuum:
+            start = time.perf_counter()
+            conn.execute('VACUUM')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            stats['vacuum_seconds'] = time.perf_counter() - start
+        stats['bytes_after'] = conn.execute('PRAGMA page_count').fetchone()[0] * page_size
+    finally:
+        conn.close()
+
+    print(f"Fixed {sum(stats['fixed'].values())} orphaned rows in {stats['clean_seconds']:.2f}s; "
+          f"database size {stats['bytes_before'] / 2**20:.1f} MiB -> {stats['bytes_after'] / 2**20:.1f} MiB.")
+    return stats
+
+
+# Columns accepted by import_records() for each table, the ones that must
+# be filled in, and the unique column checked against the file and database
+IMPORT_TABLES = {
+    'Students': {
+        'columns': ['name', 'email', 'phone', 'date_of_birth'],
+        'required': ['name', 'email'],
+        'unique': 'email',
+    },
+    'Professors': {
+        'columns': ['name', 'email', 'department', 'phone'],
+        'required': ['name'],
+        'unique': 'email',
+    },
+    'Courses': {
+        'columns': ['course_name', 'course_code', 'credits', 'department', 'professor_id', 'capacity'],
+        'required': ['course_name', 'course_code', 'credits'],
+        'unique': 'course_code',
+    },
+}
+
+# PRAGMAs used while bulk loading, and the values restored afterwards
+IMPORT_PRAGMAS = ('PRAGMA synchronous = OFF', 'PRAGMA cache_size = -200000')
+IMPORT_RESTORE_PRAGMAS = ('PRAGMA synchronous = NORMAL', 'PRAGMA cache_size = -16000')
+
+
+# Yield the rows of a CSV or XLSX file as dicts keyed by the header,
+# normalized to lower case with underscores ("Date of Birth" -> date_of_birth)
+def iter_file_rows(path):
+    def normalize(header):
+        return str(header or '').strip().lower().replace(' ', '_')
+
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [normalize(cell) for cell in next(rows, ())]
+            for row in rows:
+                if any(cell is not None for cell in row):
+                    yield dict(zip(header, row))
+        finally:
+            workbook.close()
+    else:
+        import csv
+
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            reader = csv.reader(handle)
+            header = [normalize(cell) for cell in next(reader, [])]
+            for row in reader:
+                if any(row):
+                    yield dict(zip(header, row))
+
+
+# Validate one chunk of rows for `table`. Returns the tuples to insert and
+# (row, reason) pairs for the rejected ones, plus the chunk's unique keys.
+# `seen` holds the unique keys of earlier chunks in the file.
+def _validate_import_chunk(cursor, table, rows, seen):
+    spec = IMPORT_TABLES[table]
+    unique = spec['unique']
+
+    def clean(value):
+        if isinstance(value, str):
+            value = value.strip()
+        return None if value == '' else value
+
+    candidates = []
+    rejected = []
+    chunk_seen = set()
+    for row in rows:
+        values = {column: clean(row.get(column)) for column in spec['columns']}
+        missing = [column for column in spec['required'] if values[column] is None]
+        if missing:
+            rejected.append((row, f"missing {', '.join(missing)}"))
+            continue
+        if table == 'Courses':
+            try:
+                values['credits'] = int(values['credits'])
+                for column in ('professor_id', 'capacity'):
+                    if values[column] is not None:
+                        values[column] = int(values[column])
+            except (TypeError, ValueError):
+                rejected.append((row, "credits, professor_id and capacity must be whole numbers"))
+                continue
+            if values['credits'] < 0:
+                rejected.append((row, "credits must not be negative"))
+                continue
+        if values[unique] is not None:
+            if values[unique] in seen or values[unique] in chunk_seen:
+                rejected.append((row, f"duplicate {unique} in file"))
+                continue
+            chunk_seen.add(values[unique])
+        candidates.append((row, values))
+
+    # Check the unique keys (and course professors) against the database in one query each
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS Import_Keys (key PRIMARY KEY)')
+    cursor.execute('DELETE FROM temp.Import_Keys')
+    cursor.executemany('INSERT OR IGNORE INTO temp.Import_Keys VALUES (?)',
+                       ((values[unique],) for row, values in candidates if values[unique] is not None))
+    cursor.execute(f'SELECT {unique} FROM {table} WHERE {unique} IN (SELECT key FROM temp.Import_Keys)')
+    existing = {row[0] for row in cursor.fetchall()}
+
+    professors = set()
+    if table == 'Courses':
+        cursor.execute('DELETE FROM temp.Import_Keys')
+        cursor.executemany('INSERT OR IGNORE INTO temp.Import_Keys VALUES (?)',
+                           ((values['professor_id'],) for row, values in candidates
+                            if values['professor_id'] is not None))
         cursor.execute('''
-        UPDATE Professors
-        SET phone = ?
-        WHERE professor_id = ?
-        ''', (phone, professor_id))
-    conn.commit()
-    conn.close()
+        SELECT professor_id FROM Professors
+        WHERE professor_id IN (SELECT key FROM temp.Import_Keys)
+        ''')
+        professors = {row[0] for row in cursor.fetchall()}
+    cursor.execute('DELETE FROM temp.Import_Keys')
+
+    accepted = []
+    for row, values in candidates:
+        if values[unique] in existing:
+            rejected.append((row, f"{unique} already exists"))
+        elif table == 'Courses' and values['professor_id'] is not None and values['professor_id'] not in professors:
+            rejected.append((row, f"professor {values['professor_id']} does not exist"))
+        else:
+            accepted.append((row, tuple(values[column] for column in spec['columns'])))
+    return accepted, rejected, chunk_seen
+
+
+# Bulk-load Students, Professors or Courses from a CSV or XLSX file. Rows
+# are streamed in chunks of `chunk_size`; each chunk is validated (required
+# fields, unique emails / course codes, existing professors for courses)
+# and loaded with executemany in its own transaction. Rejected rows are
+# written with the reason to `rejects_path` (next to the file by default).
+# The load runs on a connection of its own with IMPORT_PRAGMAS, outside the
+# pool, and is refused in registration mode, whose writes must all go
+# through the write queue.
+# Returns the number of loaded and rejected rows and the load rate.
+def import_records(table, path, chunk_size=5000, rejects_path=None):
+    import csv
+
+    if table not in IMPORT_TABLES:
+        raise ValueError(f"Cannot import into table: {table}")
+    if _write_queue is not None:
+        raise sqlite3.OperationalError("Cannot import records in registration mode.")
+    spec = IMPORT_TABLES[table]
+    rejects_path = rejects_path or f"{os.path.splitext(path)[0]}.rejects.csv"
+    insert = f'''
+    INSERT INTO {table} ({', '.join(spec['columns'])})
+    VALUES ({', '.join('?' * len(spec['columns']))})
+    '''
+
+    start = time.perf_counter()
+    loaded = 0
+    rejected_count = 0
+    seen = set()
+
+    # Set up the pool (migrating the schema) before connecting beside it
+    get_connection().close()
+    conn = sqlite3.connect(_pool.db_path, timeout=_pool.timeout)
+    for pragma in CONNECTION_PRAGMAS + IMPORT_PRAGMAS:
+        conn.execute(pragma)
+
+    rejects_file = None
+    try:
+        rows = iter_file_rows(path)
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+            if not chunk:
+                break
+
+            def load_chunk(conn):
+                accepted, rejected, chunk_seen = _validate_import_chunk(conn.cursor(), table, chunk, seen)
+                try:
+                    conn.execute('SAVEPOINT import_chunk')
+                    conn.executemany(insert, [values for row, values in accepted])
+                    conn.execute('RELEASE import_chunk')
+                except sqlite3.IntegrityError:
+                    # Fall back to row by row to find the offending rows
+                    conn.execute('ROLLBACK TO import_chunk')
+                    conn.execute('RELEASE import_chunk')
+                    inserted = []
+                    for row, values in accepted:
+                        try:
+                            conn.execute(insert, values)
+                            inserted.append((row, values))
+                        except sqlite3.IntegrityError as error:
+                            rejected.append((row, str(error)))
+                    accepted = inserted
+                return len(accepted), rejected, chunk_seen
+
+            chunk_loaded, rejected, chunk_seen = run_in_transaction(conn, load_chunk)
+            loaded += chunk_loaded
+            seen |= chunk_seen
+
+            if rejected:
+                if rejects_file is None:
+                    rejects_file = open(rejects_path, 'w', newline='')
+                    rejects_writer = csv.writer(rejects_file)
+                    rejects_writer.writerow(spec['columns'] + ['reason'])
+                rejects_writer.writerows([row.get(column) for column in spec['columns']] + [reason]
+                                         for row, reason in rejected)
+                rejected_count += len(rejected)
+    finally:
+        conn.close()
+        if rejects_file is not None:
+            rejects_file.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'loaded': loaded,
+        'rejected': rejected_count,
+        'seconds': elapsed,
+        'rows_per_second': (loaded + rejected_count) / elapsed if elapsed else 0.0,
+    }
+    print(f"Imported {loaded} rows into {table} in {elapsed:.2f}s ({stats['rows_per_second']:.0f} rows/sec); "
+          f"{rejected_count} rows rejected" + (f", see '{rejects_path}'." if rejected_count else "."))
+    return stats
     
  
-def display_all_students():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Students
-    ''')
-    
-    # Fetch all the rows
-    students = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
-    # Print the column names
-    print(column_names)
-  
-    for i in students:
-        print(i)
-        
-    conn.close()
-    
-def display_all_courses():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Courses
-    ''')
-    
-    # Fetch all the rows
-    courses = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
-    # Print the column names
-    print(column_names)
-  
-    for i in courses:
-        print(i)
-        
-    conn.close()
-    
-def display_all_professors():
+# Primary key of each table, used for keyset pagination
+TABLE_KEYS = {
+    'Students': 'student_id',
+    'Courses': 'course_id',
+    'Professors': 'professor_id',
+    'Enrollments': 'enrollment_id',
+    'Grades': 'grade_id',
+    'Course_Requests': 'request_id',
+}
+
+
+# Yield the rows of a table one page at a time (lists of tuples), walking
+# the primary key so every page is an indexed range read and memory stays
+# flat however large the table is. `columns` limits the columns returned and
+# `filters` maps column names to a value (None matches NULL, a list or tuple
+# matches any of its values).
+def iter_table_pages(table, columns=None, filters=None, page_size=1000):
+    if table not in TABLE_KEYS:
+        raise ValueError(f"Unknown table: {table}")
+    key = TABLE_KEYS[table]
+
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Professors
-    ''')
-    
-    # Fetch all the rows
-    professors = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
-    # Print the column names
-    print(column_names)
-  
-    for i in professors:
-        print(i)
-        
+    known_columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
     conn.close()
-    
-def display_all_requests():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Course_Requests
-    ''')
-    
-    # Fetch all the rows
-    requests = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
-    # Print the column names
-    print(column_names)
-  
-    for i in requests:
-        print(i)
-        
-    conn.close() 
-    
-def display_all_grades():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Grades
-    ''')
-    
-    # Fetch all the rows
-    grades = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
-    # Print the column names
-    print(column_names)
-  
-    for i in grades:
-        print(i)
-        
-    conn.close() 
-    
-def display_all_enrollments():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    SELECT * FROM Enrollments
-    ''')
-    
-    # Fetch all the rows
-    enrollments = cursor.fetchall()
-    
-    column_names = [description[0] for description in cursor.description]
-    
+
+    columns = list(columns) if columns else known_columns
+    filters = filters or {}
+    for column in list(columns) + list(filters):
+        if column not in known_columns:
+            raise ValueError(f"Unknown column for {table}: {column}")
+
+    conditions = []
+    params = []
+    for column, value in filters.items():
+        if value is None:
+            conditions.append(f'{column} IS NULL')
+        elif isinstance(value, (list, tuple, set)):
+            value = list(value)
+            conditions.append(f"{column} IN ({','.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            conditions.append(f'{column} = ?')
+            params.append(value)
+
+    def page_query(first):
+        where = conditions if first else [f'{key} > ?'] + conditions
+        return f'''
+        SELECT {', '.join(columns + [key])} FROM {table}
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY {key}
+        LIMIT ?
+        '''
+
+    first_page = page_query(True)
+    next_page = page_query(False)
+
+    last_key = None
+    while True:
+        # Hold a connection only while a page is being read
+        conn = get_connection()
+        cursor = conn.cursor()
+        if last_key is None:
+            cursor.execute(first_page, params + [page_size])
+        else:
+            cursor.execute(next_page, [last_key] + params + [page_size])
+        page = cursor.fetchall()
+        conn.close()
+
+        if not page:
+            return
+        last_key = page[-1][-1]
+        yield [row[:-1] for row in page]
+        if len(page) < page_size:
+            return
+
+
+# Yield the rows of a table one by one, see iter_table_pages()
+def iter_table(table, columns=None, filters=None, page_size=1000):
+    for page in iter_table_pages(table, columns, filters, page_size):
+        yield from page
+
+
+# Print the column names and rows of a table, streaming page by page.
+# Returns the number of rows printed.
+def print_table(table, columns=None, filters=None, page_size=1000):
+    if not columns:
+        conn = get_connection()
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        conn.close()
+
     # Print the column names
-    print(column_names)
-  
-    for i in enrollments:
-        print(i)
-        
-    conn.close()                 
+    print(list(columns))
+
+    count = 0
+    for page in iter_table_pages(table, columns, filters, page_size):
+        print('\n'.join(str(row) for row in page))
+        count += len(page)
+    return count
+
+
+def display_all_students(columns=None, filters=None, page_size=1000):
+    return print_table('Students', columns, filters, page_size)
+
+def display_all_courses(columns=None, filters=None, page_size=1000):
+    return print_table('Courses', columns, filters, page_size)
+
+def display_all_professors(columns=None, filters=None, page_size=1000):
+    return print_table('Professors', columns, filters, page_size)
+
+def display_all_requests(columns=None, filters=None, page_size=1000):
+    return print_table('Course_Requests', columns, filters, page_size)
+
+def display_all_grades(columns=None, filters=None, page_size=1000):
+    return print_table('Grades', columns, filters, page_size)
+
+def display_all_enrollments(columns=None, filters=None, page_size=1000):
+    return print_table('Enrollments', columns, filters, page_size)
     
 # def request_course(student_id, course_id):
 #     conn = get_connection()
@@ -548,87 +2164,549 @@ def display_all_enrollments():
 #     conn.close()
 
 
-def request_course(student_id, course_id):
+# Days of the week, in the order stored in Course_Meetings.day
+DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def _minutes(time_of_day):
+    if isinstance(time_of_day, int):
+        return time_of_day
+    hours, _, minutes = str(time_of_day).partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _time_of_day(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# Replace the weekly meetings of a course. `meetings` holds (day, start,
+# end) with the day as 'Mon'..'Sun' (or 0-6) and the times as 'HH:MM' (or
+# minutes since midnight). Returns the number of meetings saved.
+def set_course_meetings(course_id, meetings):
+    rows = []
+    for day, start, end in meetings:
+        day = DAYS.index(day[:3].title()) if isinstance(day, str) else int(day)
+        rows.append((course_id, day, _minutes(start), _minutes(end)))
+
+    def replace(conn):
+        conn.execute('DELETE FROM Course_Meetings WHERE course_id = ?', (course_id,))
+        conn.executemany('''
+        INSERT INTO Course_Meetings (course_id, day, start_minute, end_minute)
+        VALUES (?, ?, ?, ?)
+        ''', rows)
+        return len(rows)
+
+    return run_write(replace)
+
+
+# Weekly meetings of a course as (day, start, end), e.g. ('Mon', '09:00', '10:15')
+def get_course_meetings(course_id):
+    conn = get_connection()
+    meetings = conn.execute('''
+    SELECT day, start_minute, end_minute FROM Course_Meetings
+    WHERE course_id = ?
+    ORDER BY day, start_minute
+    ''', (course_id,)).fetchall()
+    conn.close()
+    return [(DAYS[day], _time_of_day(start), _time_of_day(end)) for day, start, end in meetings]
+
+
+# First meeting of `course_id` that overlaps a meeting of a course the
+# student is enrolled in (or, with `include_requests`, has a pending or
+# waitlisted request for), as (other course_id, day, start, end), or None.
+# Both sides are index range lookups on the student's few courses, so the
+# check costs the same however many students and sections there are.
+def _schedule_conflict(conn, student_id, course_id, include_requests=True):
+    requested = '''
+        UNION
+        SELECT course_id FROM Course_Requests
+        WHERE student_id = :student_id AND status IN ('pending', 'waitlisted')
+    ''' if include_requests else ''
+    return conn.execute(f'''
+    SELECT Other.course_id, Other.day, MAX(New.start_minute, Other.start_minute),
+        MIN(New.end_minute, Other.end_minute)
+    FROM Course_Meetings AS New
+    JOIN Course_Meetings AS Other
+        ON Other.day = New.day
+        AND Other.start_minute < New.end_minute
+        AND Other.end_minute > New.start_minute
+    WHERE New.course_id = :course_id
+    AND Other.course_id != :course_id
+    AND Other.course_id IN (
+        SELECT course_id FROM Enrollments
+        WHERE student_id = :student_id
+        {requested}
+    )
+    LIMIT 1
+    ''', {'student_id': student_id, 'course_id': course_id}).fetchone()
+
+
+def _conflict_message(conflict):
+    other_course_id, day, start, end = conflict
+    return (f"Schedule conflict with course ID {other_course_id} on {DAYS[day]} "
+            f"{_time_of_day(start)}-{_time_of_day(end)}.")
+
+
+# First schedule conflict of every row of a batch with the courses its
+# student is enrolled in (or, with `include_requests`, has a pending or
+# waitlisted request for). `batch` is a query returning (key, student_id,
+# course_id) rows. The whole batch is checked with one set-based join on
+# Course_Meetings; returns {key: (other course_id, day, start, end)}.
+def _batch_schedule_conflicts(conn, batch, include_requests=True):
+    taken = ['SELECT student_id, course_id FROM Enrollments']
+    if include_requests:
+        taken.append("SELECT student_id, course_id FROM Course_Requests WHERE status IN ('pending', 'waitlisted')")
+    conflicts = {}
+    for source in taken:
+        rows = conn.execute(f'''
+        WITH Batch (key, student_id, course_id) AS ({batch})
+        SELECT Batch.key, Other.course_id, Other.day, MAX(New.start_minute, Other.start_minute),
+            MIN(New.end_minute, Other.end_minute)
+        FROM Batch
+        JOIN Course_Meetings AS New ON New.course_id = Batch.course_id
+        JOIN ({source}) AS Taken
+            ON Taken.student_id = Batch.student_id
+            AND Taken.course_id != Batch.course_id
+        JOIN Course_Meetings AS Other
+            ON Other.course_id = Taken.course_id
+            AND Other.day = New.day
+            AND Other.start_minute < New.end_minute
+            AND Other.end_minute > New.start_minute
+        ''')
+        for key, *conflict in rows:
+            conflicts.setdefault(key, tuple(conflict))
+    return conflicts
+
+
+# Meetings of the courses of a batch (a query returning course IDs), as
+# {course_id: [(day, start, end)]}
+def _batch_meetings(conn, course_ids):
+    meetings = {}
+    for course_id, day, start, end in conn.execute(f'''
+    SELECT course_id, day, start_minute, end_minute FROM Course_Meetings
+    WHERE course_id IN ({course_ids})
+    '''):
+        meetings.setdefault(course_id, []).append((day, start, end))
+    return meetings
+
+
+# First meeting of `course_id` that overlaps a meeting of one of
+# `other_course_ids`, from the meetings read by _batch_meetings(), in the
+# same form as _schedule_conflict(); None if there is none. Used for the
+# courses taken earlier in the same batch.
+def _meetings_conflict(meetings, course_id, other_course_ids):
+    for other_course_id in other_course_ids:
+        for day, start, end in meetings.get(course_id, ()):
+            for other_day, other_start, other_end in meetings.get(other_course_id, ()):
+                if day == other_day and other_start < end and other_end > start:
+                    return other_course_id, day, max(start, other_start), min(end, other_end)
+    return None
+
+
+# Find every pair of courses a student is enrolled in whose meetings
+# overlap, in one pass over Enrollments. Returns (student_id, course_id,
+# other course_id, day, start, end) per overlapping meeting pair.
+def validate_all_schedules():
     conn = get_connection()
+    conflicts = conn.execute('''
+    SELECT First.student_id, First.course_id, Second.course_id, FirstMeeting.day,
+        MAX(FirstMeeting.start_minute, SecondMeeting.start_minute),
+        MIN(FirstMeeting.end_minute, SecondMeeting.end_minute)
+    FROM Enrollments AS First
+    JOIN Course_Meetings AS FirstMeeting ON FirstMeeting.course_id = First.course_id
+    JOIN Enrollments AS Second
+        ON Second.student_id = First.student_id
+        AND Second.course_id > First.course_id
+    JOIN Course_Meetings AS SecondMeeting
+        ON SecondMeeting.course_id = Second.course_id
+        AND SecondMeeting.day = FirstMeeting.day
+        AND SecondMeeting.start_minute < FirstMeeting.end_minute
+        AND SecondMeeting.end_minute > FirstMeeting.start_minute
+    ORDER BY First.student_id, First.course_id, Second.course_id
+    ''').fetchall()
+    conn.close()
+
+    conflicts = [(student_id, course_id, other_course_id, DAYS[day], _time_of_day(start), _time_of_day(end))
+                 for student_id, course_id, other_course_id, day, start, end in conflicts]
+    students = len({conflict[0] for conflict in conflicts})
+    print(f"Found {len(conflicts)} schedule conflicts affecting {students} students.")
+    return conflicts
+
+
+# Checks and inserts one course request inside the caller's transaction.
+# Returns (submitted, message).
+def _request_course(conn, student_id, course_id):
     cursor = conn.cursor()
 
     # Check if the course exists
-    cursor.execute('''
-    SELECT credits FROM Courses
-    WHERE course_id = ?
-    ''', (course_id,))
-    course = cursor.fetchone()
+    course = get_course_info(course_id)
     if not course:
-        print("Course does not exist.")
-        conn.close()
-        return
+        return False, "Course does not exist."
+
+    course_credits = course[3]
+
+    # Check if the student is already enrolled in this course
+    cursor.execute('''
+    SELECT * FROM Enrollments
+    WHERE student_id = ? AND course_id = ?
+    ''', (student_id, course_id))
+    enrollment = cursor.fetchone()
+    if enrollment:
+        return False, "Student is already enrolled in this course."
+
+    # Check if the student has a rejected request for this course
+    cursor.execute('''
+    SELECT status FROM Course_Requests
+    WHERE student_id = ? AND course_id = ?
+    ''', (student_id, course_id))
+    existing_request = cursor.fetchone()
+    if existing_request:
+        status = existing_request[0]
+        if status == 'rejected':
+            return False, "Previous request for this course was rejected. Cannot request again."
+
+    # Check if the student has already requested this course and it's pending
+    # or waitlisted
+    cursor.execute('''
+    SELECT status FROM Course_Requests
+    WHERE student_id = ? AND course_id = ? AND status IN ('pending', 'waitlisted')
+    ''', (student_id, course_id))
+    existing_request = cursor.fetchone()
+    if existing_request:
+        if existing_request[0] == 'waitlisted':
+            return False, "Course request already exists and is on the waitlist."
+        return False, "Course request already exists and is pending."
+
+    # Check the course's meetings against the student's other courses
+    conflict = _schedule_conflict(conn, student_id, course_id)
+    if conflict:
+        return False, _conflict_message(conflict)
+
+    # Look up the student and the credits of all their pending and accepted
+    # requests; unknown students are refused rather than left to the
+    # foreign key on Course_Requests
+    cursor.execute('''
+    SELECT Students.student_id, COALESCE(Student_Credit_Load.credits, 0)
+    FROM Students
+    LEFT JOIN Student_Credit_Load ON Students.student_id = Student_Credit_Load.student_id
+    WHERE Students.student_id = ?
+    ''', (student_id,))
+    student = cursor.fetchone()
+    if not student:
+        return False, "Student does not exist."
+    total_credits = student[1]
+
+    # Check if adding this course would exceed the 20 credits limit
+    if total_credits + course_credits > 20:
+        return False, "Adding this course would exceed the 20-credit limit."
+
+    # Request the course
+    cursor.execute(REQUEST_INSERT, (student_id, course_id, course[5]))
+    _dashboard_changed(student_id)
+
+    return True, "Course request submitted successfully."
+
+
+# Request a course for a student. The checks and the insert run in one
+# write transaction, so concurrent requests cannot both pass the pending
+# and credit checks. Returns (submitted, message).
+def submit_course_request(student_id, course_id):
+    return run_write(_request_course, student_id, course_id)
+
+
+# Request a course and print the outcome. Returns True if the request was
+# submitted.
+def request_course(student_id, course_id):
+    submitted, message = submit_course_request(student_id, course_id)
+    print(message)
+    return submitted
+
+
+# Compare Student_Credit_Load with the credit loads recomputed from
+# Course_Requests. Returns (student_id, stored, actual) for every student
+# that differs; with `repair` the table is rebuilt from scratch.
+def check_credit_load(repair=False):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(f'''
+    WITH Actual AS ({CREDIT_LOAD_QUERY})
+    SELECT Student_Credit_Load.student_id, Student_Credit_Load.credits, COALESCE(Actual.credits, 0)
+    FROM Student_Credit_Load
+    LEFT JOIN Actual ON Student_Credit_Load.student_id = Actual.student_id
+    WHERE Student_Credit_Load.credits != COALESCE(Actual.credits, 0)
+    UNION ALL
+    SELECT Actual.student_id, 0, Actual.credits
+    FROM Actual
+    WHERE Actual.credits != 0
+    AND Actual.student_id NOT IN (SELECT student_id FROM Student_Credit_Load)
+    ORDER BY 1
+    ''')
+    mismatches = cursor.fetchall()
+    conn.close()
+
+    if repair:
+        def rebuild(conn):
+            for statement in REBUILD_CREDIT_LOAD:
+                conn.execute(statement)
+
+        run_write(rebuild)
+
+    if mismatches:
+        print(f"Credit load differs for {len(mismatches)} students{' (rebuilt)' if repair else ''}.")
+    else:
+        print("Credit load table is consistent.")
+    return mismatches
+
+
+# Submits many course requests inside the caller's transaction. Returns
+# one (student_id, course_id, submitted, message) tuple per pair.
+def _request_courses_bulk(conn, pairs):
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TEMP TABLE IF NOT EXISTS Bulk_Requests (
+        seq INTEGER PRIMARY KEY,
+        student_id INTEGER,
+        course_id INTEGER
+    )
+    ''')
+    cursor.execute('DELETE FROM temp.Bulk_Requests')
+    cursor.executemany('''
+    INSERT INTO temp.Bulk_Requests (student_id, course_id)
+    VALUES (?, ?)
+    ''', pairs)
+
+    # Look up everything request_course() checks, for all pairs at once
+    cursor.execute('''
+    SELECT Bulk_Requests.seq, Bulk_Requests.student_id, Bulk_Requests.course_id, Students.student_id,
+        Courses.credits,
+        Courses.professor_id,
+        EXISTS (SELECT 1 FROM Enrollments
+                WHERE Enrollments.student_id = Bulk_Requests.student_id
+                AND Enrollments.course_id = Bulk_Requests.course_id),
+        EXISTS (SELECT 1 FROM Course_Requests
+                WHERE Course_Requests.student_id = Bulk_Requests.student_id
+                AND Course_Requests.course_id = Bulk_Requests.course_id
+                AND Course_Requests.status = 'rejected'),
+        (SELECT MAX(Course_Requests.status) FROM Course_Requests
+         WHERE Course_Requests.student_id = Bulk_Requests.student_id
+         AND Course_Requests.course_id = Bulk_Requests.course_id
+         AND Course_Requests.status IN ('pending', 'waitlisted')),
+        COALESCE(Student_Credit_Load.credits, 0)
+    FROM temp.Bulk_Requests
+    LEFT JOIN Students ON Bulk_Requests.student_id = Students.student_id
+    LEFT JOIN Courses ON Bulk_Requests.course_id = Courses.course_id
+    LEFT JOIN Student_Credit_Load ON Bulk_Requests.student_id = Student_Credit_Load.student_id
+    ORDER BY Bulk_Requests.seq
+    ''')
+    rows = cursor.fetchall()
+
+    # Schedule conflicts with the students' courses and open requests,
+    # and the meetings to check requests of the same batch against
+    conflicts = _batch_schedule_conflicts(conn, 'SELECT seq, student_id, course_id FROM temp.Bulk_Requests')
+    meetings = _batch_meetings(conn, 'SELECT course_id FROM temp.Bulk_Requests')
+
+    results = []
+    submitted = []
+    requested = set()
+    credit_load = {}
+    batch_courses = {}
+    for (seq, student_id, course_id, student_found, course_credits, professor_id, enrolled, rejected,
+         open_status, load) in rows:
+        conflict = None
+        if course_credits is not None and student_found is not None:
+            conflict = conflicts.get(seq) or _meetings_conflict(meetings, course_id,
+                                                                batch_courses.get(student_id, ()))
+        if course_credits is None:
+            message = "Course does not exist."
+        elif student_found is None:
+            message = "Student does not exist."
+        elif enrolled:
+            message = "Student is already enrolled in this course."
+        elif rejected:
+            message = "Previous request for this course was rejected. Cannot request again."
+        elif open_status == 'waitlisted':
+            message = "Course request already exists and is on the waitlist."
+        elif open_status or (student_id, course_id) in requested:
+            message = "Course request already exists and is pending."
+        elif conflict:
+            message = _conflict_message(conflict)
+        elif credit_load.get(student_id, load) + course_credits > 20:
+            message = "Adding this course would exceed the 20-credit limit."
+        else:
+            message = None
+
+        if message is None:
+            requested.add((student_id, course_id))
+            batch_courses.setdefault(student_id, []).append(course_id)
+            credit_load[student_id] = credit_load.get(student_id, load) + course_credits
+            submitted.append((student_id, course_id, professor_id))
+            results.append((student_id, course_id, True, "Course request submitted successfully."))
+        else:
+            results.append((student_id, course_id, False, message))
 
-    course_credits = course[0]
+    # Insert every accepted request in the same transaction
+    cursor.executemany(REQUEST_INSERT, submitted)
+    cursor.execute('DELETE FROM temp.Bulk_Requests')
 
-    # Check if the student is already enrolled in this course
-    cursor.execute('''
-    SELECT * FROM Enrollments
-    WHERE student_id = ? AND course_id = ?
-    ''', (student_id, course_id))
-    enrollment = cursor.fetchone()
-    if enrollment:
-        print("Student is already enrolled in this course.")
-        conn.close()
-        return
+    _dashboard_changed(*{student_id for student_id, course_id, professor_id in submitted})
+    return results
 
-    # Check if the student has a rejected request for this course
-    cursor.execute('''
-    SELECT status FROM Course_Requests
+
+# Submit many course requests in one transaction. `pairs` is an iterable of
+# (student_id, course_id); all pairs are validated together with set-based
+# SQL against a temp table, the same rules as request_course() apply (in
+# input order, so earlier pairs count towards a student's 20-credit limit)
+# and one (student_id, course_id, submitted, message) tuple is returned per
+# pair.
+def request_courses_bulk(pairs):
+    return run_write(_request_courses_bulk, list(pairs))
+
+
+# Number of students enrolled in a course
+def _enrolled_count(conn, course_id):
+    row = conn.execute('''
+    SELECT enrolled FROM Course_Enrollment_Counts
+    WHERE course_id = ?
+    ''', (course_id,)).fetchone()
+    return row[0] if row else 0
+
+
+# Move waitlisted students of a course into its free seats, highest
+# priority first and then in request order, enrolling each one and
+# accepting its request in the caller's transaction. Every promotion is a
+# single seek on the waitlist index, however long the waitlist is. A
+# student whose timetable now clashes with the course stays on the
+# waitlist and the seat goes to the next one in line.
+# Returns the promoted (request_id, student_id) pairs.
+def _promote_waitlist(conn, course_id, capacity=_UNSET):
+    if capacity is _UNSET:
+        course = get_course_info(course_id)
+        if not course:
+            return []
+        capacity = course[6]
+
+    promoted = []
+    free = None if capacity is None else capacity - _enrolled_count(conn, course_id)
+    # Position in the waitlist after the last student passed over
+    after = None
+    while free is None or free > 0:
+        params = [course_id]
+        position = ''
+        if after is not None:
+            position = 'AND (priority < ? OR (priority = ? AND request_id > ?))'
+            params += [after[0], after[0], after[1]]
+        head = conn.execute(f'''
+        SELECT request_id, student_id, priority FROM Course_Requests
+        WHERE course_id = ? AND status = 'waitlisted'
+        {position}
+        ORDER BY priority DESC, request_id
+        LIMIT 1
+        ''', params).fetchone()
+        if head is None:
+            break
+        request_id, student_id, priority = head
+        if _schedule_conflict(conn, student_id, course_id, include_requests=False):
+            after = (priority, request_id)
+            continue
+        conn.execute('''
+        INSERT INTO Enrollments (student_id, course_id, enrollment_date)
+        VALUES (?, ?, DATE('now'))
+        ''', (student_id, course_id))
+        conn.execute('''
+        UPDATE Course_Requests
+        SET status = 'accepted'
+        WHERE request_id = ?
+        ''', (request_id,))
+        promoted.append((request_id, student_id))
+        _dashboard_changed(student_id)
+        if free is not None:
+            free -= 1
+    return promoted
+
+
+def _promoted_message(promoted):
+    if not promoted:
+        return ""
+    return f" {len(promoted)} student(s) promoted from the waitlist."
+
+
+def _drop_course(conn, student_id, course_id):
+    cursor = conn.execute('''
+    DELETE FROM Enrollments
     WHERE student_id = ? AND course_id = ?
     ''', (student_id, course_id))
-    existing_request = cursor.fetchone()
-    if existing_request:
-        status = existing_request[0]
-        if status == 'rejected':
-            print("Previous request for this course was rejected. Cannot request again.")
-            conn.close()
-            return
-
-    # Check if the student has already requested this course and it's pending
-    cursor.execute('''
-    SELECT request_id FROM Course_Requests
-    WHERE student_id = ? AND course_id = ? AND status = 'pending'
+    if cursor.rowcount == 0:
+        return False, "Student is not enrolled in this course."
+    _dashboard_changed(student_id)
+
+    conn.execute('''
+    UPDATE Course_Requests
+    SET status = 'dropped'
+    WHERE student_id = ? AND course_id = ? AND status = 'accepted'
     ''', (student_id, course_id))
-    existing_request = cursor.fetchone()
-    if existing_request:
-        print("Course request already exists and is pending.")
-        conn.close()
-        return
 
-    # Calculate total credits of all current requests for this student
-    cursor.execute('''
-    SELECT SUM(Courses.credits) 
-    FROM Course_Requests 
-    JOIN Courses ON Course_Requests.course_id = Courses.course_id
-    WHERE Course_Requests.student_id = ? AND Course_Requests.status IS NULL
-    ''', (student_id,))
-    total_credits = cursor.fetchone()[0] or 0
+    # Give the freed seat to the head of the waitlist
+    promoted = _promote_waitlist(conn, course_id)
+    return True, "Course dropped." + _promoted_message(promoted)
 
-    # Check if adding this course would exceed the 20 credits limit
-    if total_credits + course_credits > 20:
-        print("Adding this course would exceed the 20-credit limit.")
-        conn.close()
-        return
 
-    # Request the course
-    cursor.execute('''
-    INSERT INTO Course_Requests (student_id, course_id, request_date, status)
-    VALUES (?, ?, DATE('now'), 'pending')
-    ''', (student_id, course_id))
-    
-    conn.commit()
-    conn.close()
+# Drop a student from a course. The freed seat goes to the next student on
+# the course's waitlist in the same transaction. Returns True if the
+# student was enrolled.
+def drop_course(student_id, course_id):
+    dropped, message = run_write(_drop_course, student_id, course_id)
+    print(message)
+    return dropped
+
 
-    print("Course request submitted successfully.")
+def _set_request_priority(conn, request_id, professor_id, priority):
+    request = conn.execute('''
+    SELECT course_id, student_id FROM Course_Requests
+    WHERE request_id = ?
+    ''', (request_id,)).fetchone()
+    if not request:
+        return False, "Request does not exist."
 
+    course = get_course_info(request[0])
+    if not course:
+        return False, "Course does not exist."
+    if course[5] != professor_id:
+        return False, "You are not authorized to manage this course request."
 
-def manage_course_request(request_id, professor_id, action):
+    conn.execute('''
+    UPDATE Course_Requests
+    SET priority = ?
+    WHERE request_id = ?
+    ''', (priority, request_id))
+    _dashboard_changed(request[1])
+    return True, f"Priority of request ID {request_id} set to {priority}."
+
+
+# Set the waitlist priority of a request. Higher priorities are promoted
+# first; requests with the same priority are promoted in request order.
+def set_request_priority(request_id, professor_id, priority):
+    changed, message = run_write(_set_request_priority, request_id, professor_id, priority)
+    print(message)
+    return changed
+
+
+# Waitlisted requests of a course in promotion order, as (request_id,
+# student_id, priority)
+def get_waitlist(course_id):
     conn = get_connection()
+    waitlist = conn.execute('''
+    SELECT request_id, student_id, priority FROM Course_Requests
+    WHERE course_id = ? AND status = 'waitlisted'
+    ORDER BY priority DESC, request_id
+    ''', (course_id,)).fetchall()
+    conn.close()
+    return waitlist
+
+
+# Accepts or rejects one course request inside the caller's transaction.
+# Returns (changed, message).
+def _manage_course_request(conn, request_id, professor_id, action):
     cursor = conn.cursor()
 
     # Check if the request exists and get the details
@@ -639,147 +2717,452 @@ def manage_course_request(request_id, professor_id, action):
     request = cursor.fetchone()
 
     if not request:
-        print("Request does not exist.")
-        conn.close()
-        return
+        return False, "Request does not exist."
 
     student_id, course_id, current_status = request
 
     # Check if the professor is assigned to the course
-    cursor.execute('''
-    SELECT professor_id FROM Courses
-    WHERE course_id = ?
-    ''', (course_id,))
-    course = cursor.fetchone()
+    course = get_course_info(course_id)
 
     if not course:
-        print("Course does not exist.")
-        conn.close()
-        return
+        return False, "Course does not exist."
 
-    assigned_professor_id = course[0]
+    assigned_professor_id = course[5]
 
     if assigned_professor_id != professor_id:
-        print("You are not authorized to manage this course request.")
-        conn.close()
-        return
-
-    # if current_status:
-    #     print(f"Request already has status '{current_status}'. Cannot change.")
-    #     conn.close()
-    #     return
+        return False, "You are not authorized to manage this course request."
+    if action in ('accept', 'reject'):
+        _dashboard_changed(student_id)
 
     if action == 'accept':
         # Check if the request has already been accepted or rejected
         if current_status == 'accepted':
-            print("Course request has already been accepted.")
-        else:
-            # Add the request to the Enrollments table
-            cursor.execute('''
-            INSERT INTO Enrollments (student_id, course_id)
-            VALUES (?, ?)
-            ''', (student_id, course_id))
-
-            # Update the status of the request in Course_Requests
+            return False, "Course request has already been accepted."
+        if current_status == 'waitlisted':
+            return False, "Course request is already on the waitlist."
+
+        # Check the course's meetings against the student's enrolled courses
+        conflict = _schedule_conflict(conn, student_id, course_id, include_requests=False)
+        if conflict:
+            return False, _conflict_message(conflict)
+
+        # Put the request on the waitlist if the course is full
+        capacity = course[6]
+        if capacity is not None and _enrolled_count(conn, course_id) >= capacity:
             cursor.execute('''
             UPDATE Course_Requests
-            SET status = 'accepted'
+            SET status = 'waitlisted'
             WHERE request_id = ?
             ''', (request_id,))
+            return True, "Course is full. Course request added to the waitlist."
 
-            conn.commit()
-            print("Course request accepted and enrollment completed.")
+        # Add the request to the Enrollments table
+        cursor.execute('''
+        INSERT INTO Enrollments (student_id, course_id)
+        VALUES (?, ?)
+        ''', (student_id, course_id))
+
+        # Update the status of the request in Course_Requests
+        cursor.execute('''
+        UPDATE Course_Requests
+        SET status = 'accepted'
+        WHERE request_id = ?
+        ''', (request_id,))
+
+        return True, "Course request accepted and enrollment completed."
 
     elif action == 'reject':
         # Check if the request has already been accepted or rejected
         if current_status == 'rejected':
-            print("Course request has already been rejected.")
-        else:
-            # Update the status of the request in Course_Requests
+            return False, "Course request has already been rejected."
+
+        # Update the status of the request in Course_Requests
+        cursor.execute('''
+        UPDATE Course_Requests
+        SET status = 'rejected'
+        WHERE request_id = ?
+        ''', (request_id,))
+
+        # Rejecting an accepted request frees its seat for the waitlist
+        promoted = []
+        if current_status == 'accepted':
             cursor.execute('''
-            UPDATE Course_Requests
-            SET status = 'rejected'
-            WHERE request_id = ?
-            ''', (request_id,))
+            DELETE FROM Enrollments
+            WHERE student_id = ? AND course_id = ?
+            ''', (student_id, course_id))
+            promoted = _promote_waitlist(conn, course_id, capacity=course[6])
 
-            conn.commit()
-            print("Course request rejected.")
+        return True, "Course request rejected." + _promoted_message(promoted)
 
-    else:
-        print("Invalid action. Please use 'accept' or 'reject'.")
+    return False, "Invalid action. Please use 'accept' or 'reject'."
 
-    conn.close()
 
+# Accept or reject a course request in its own write transaction.
+# Returns (changed, message).
+def decide_course_request(request_id, professor_id, action):
+    return run_write(_manage_course_request, request_id, professor_id, action)
 
-def show_all_requests_for_professor(professor_id):
-    conn = get_connection()
+
+def manage_course_request(request_id, professor_id, action):
+    changed, message = decide_course_request(request_id, professor_id, action)
+    print(message)
+    return changed
+
+
+# Accepts or rejects many course requests inside the caller's transaction.
+# Returns one (request_id, decided, message) tuple per request.
+def _manage_course_requests_bulk(conn, professor_id, action, request_ids, capacity):
     cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TEMP TABLE IF NOT EXISTS Bulk_Decisions (
+        request_id INTEGER PRIMARY KEY,
+        decided INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('DELETE FROM temp.Bulk_Decisions')
+
+    if request_ids is None:
+        cursor.execute('''
+        INSERT INTO temp.Bulk_Decisions (request_id)
+        SELECT request_id FROM Course_Requests
+        WHERE professor_id = ? AND status = 'pending'
+        ''', (professor_id,))
+    else:
+        cursor.executemany('''
+        INSERT OR IGNORE INTO temp.Bulk_Decisions (request_id)
+        VALUES (?)
+        ''', ((request_id,) for request_id in request_ids))
 
-    # Retrieve all course IDs managed by the professor
+    # Fetch every request with its course owner in one query
     cursor.execute('''
-    SELECT course_id FROM Courses
-    WHERE professor_id = ?
-    ''', (professor_id,))
-    courses = cursor.fetchall()
+    SELECT Bulk_Decisions.request_id, Course_Requests.request_id, Course_Requests.course_id,
+        Course_Requests.status, Courses.course_id, Courses.professor_id, Courses.capacity,
+        Course_Requests.student_id
+    FROM temp.Bulk_Decisions
+    LEFT JOIN Course_Requests ON Bulk_Decisions.request_id = Course_Requests.request_id
+    LEFT JOIN Courses ON Course_Requests.course_id = Courses.course_id
+    ORDER BY Course_Requests.request_date, Bulk_Decisions.request_id
+    ''')
+    requests = cursor.fetchall()
 
-    if not courses:
-        print("No courses found for this professor.")
-        conn.close()
-        return
+    # Enrollments per course, read once for all affected courses
+    enrolled = {}
+    if action == 'accept':
+        cursor.execute('''
+        SELECT course_id, enrolled
+        FROM Course_Enrollment_Counts
+        WHERE course_id IN (
+            SELECT Course_Requests.course_id
+            FROM temp.Bulk_Decisions
+            JOIN Course_Requests ON Bulk_Decisions.request_id = Course_Requests.request_id
+        )
+        ''')
+        enrolled = dict(cursor.fetchall())
+
+        # Schedule conflicts with the students' enrolled courses, and the
+        # meetings to check requests accepted in this batch against
+        batch = '''
+        SELECT Bulk_Decisions.request_id, Course_Requests.student_id, Course_Requests.course_id
+        FROM temp.Bulk_Decisions
+        JOIN Course_Requests ON Bulk_Decisions.request_id = Course_Requests.request_id
+        '''
+        conflicts = _batch_schedule_conflicts(conn, batch, include_requests=False)
+        meetings = _batch_meetings(conn, f'SELECT course_id FROM ({batch})')
+
+    new_status = 'accepted' if action == 'accept' else 'rejected'
+    results = []
+    decided = []
+    freed_courses = {}
+    changed_students = set()
+    batch_courses = {}
+    for (request_id, found, course_id, current_status, course_found, assigned_professor_id,
+         course_capacity, student_id) in requests:
+        seats = capacity if capacity is not None else course_capacity
+        conflict = None
+        if action == 'accept' and course_found is not None:
+            conflict = conflicts.get(request_id) or _meetings_conflict(meetings, course_id,
+                                                                       batch_courses.get(student_id, ()))
+        if found is None:
+            message = "Request does not exist."
+        elif course_found is None:
+            message = "Course does not exist."
+        elif assigned_professor_id != professor_id:
+            message = "You are not authorized to manage this course request."
+        elif current_status == new_status:
+            message = f"Course request has already been {new_status}."
+        elif action == 'accept' and current_status == 'waitlisted':
+            message = "Course request is already on the waitlist."
+        elif conflict:
+            message = _conflict_message(conflict)
+        else:
+            message = None
+
+        if message is not None:
+            results.append((request_id, False, message))
+            continue
+        changed_students.add(student_id)
+        if action == 'reject':
+            if current_status == 'accepted':
+                freed_courses[course_id] = course_capacity
+            decided.append((1, request_id))
+            results.append((request_id, True, "Course request rejected."))
+        elif seats is not None and enrolled.get(course_id, 0) >= seats:
+            decided.append((2, request_id))
+            results.append((request_id, True, "Course is full. Course request added to the waitlist."))
+        else:
+            enrolled[course_id] = enrolled.get(course_id, 0) + 1
+            batch_courses.setdefault(student_id, []).append(course_id)
+            decided.append((1, request_id))
+            results.append((request_id, True, "Course request accepted and enrollment completed."))
+
+    # decided is 1 for requests taking the new status, 2 for waitlisted ones
+    cursor.executemany('''
+    UPDATE temp.Bulk_Decisions
+    SET decided = ?
+    WHERE request_id = ?
+    ''', decided)
 
-    course_ids = [course[0] for course in courses]
+    if action == 'accept':
+        # Enroll all accepted students at once
+        cursor.execute('''
+        INSERT INTO Enrollments (student_id, course_id, enrollment_date)
+        SELECT Course_Requests.student_id, Course_Requests.course_id, DATE('now')
+        FROM Course_Requests
+        WHERE Course_Requests.request_id IN (
+            SELECT request_id FROM temp.Bulk_Decisions WHERE decided = 1
+        )
+        ORDER BY Course_Requests.request_date, Course_Requests.request_id
+        ''')
 
-    # Retrieve all requests for these courses
+    else:
+        # Unenroll the students whose accepted requests are rejected
+        cursor.execute('''
+        DELETE FROM Enrollments
+        WHERE enrollment_id IN (
+            SELECT Enrollments.enrollment_id
+            FROM temp.Bulk_Decisions
+            JOIN Course_Requests ON Bulk_Decisions.request_id = Course_Requests.request_id
+            JOIN Enrollments ON Enrollments.student_id = Course_Requests.student_id
+                AND Enrollments.course_id = Course_Requests.course_id
+            WHERE Bulk_Decisions.decided = 1 AND Course_Requests.status = 'accepted'
+        )
+        ''')
+
+    # Update the status of all decided requests with one statement
     cursor.execute('''
-    SELECT Course_Requests.request_id, Course_Requests.student_id, Course_Requests.course_id, Students.name AS student_name, Courses.course_name
+    UPDATE Course_Requests
+    SET status = (
+        SELECT CASE decided WHEN 2 THEN 'waitlisted' ELSE ? END
+        FROM temp.Bulk_Decisions
+        WHERE Bulk_Decisions.request_id = Course_Requests.request_id
+    )
+    WHERE request_id IN (
+        SELECT request_id FROM temp.Bulk_Decisions WHERE decided > 0
+    )
+    ''', (new_status,))
+    cursor.execute('DELETE FROM temp.Bulk_Decisions')
+
+    for course_id, course_capacity in freed_courses.items():
+        promoted = _promote_waitlist(conn, course_id,
+                                     capacity=capacity if capacity is not None else course_capacity)
+        changed_students.update(student_id for request_id, student_id in promoted)
+
+    _dashboard_changed(*changed_students)
+    return results
+
+
+# Accept or reject many course requests for one professor in a single
+# transaction. Pass the request IDs to decide on, or leave `request_ids` out
+# with action 'accept' to accept every pending request for the professor's
+# courses, oldest first. No course is filled beyond its capacity (or
+# `capacity` when given); accepted requests that do not fit go on the
+# waitlist, and rejecting accepted requests promotes waitlisted students
+# into the freed seats. Returns one (request_id, decided, message) tuple
+# per request, in request_date order.
+def manage_course_requests_bulk(professor_id, action, request_ids=None, capacity=None):
+    if action not in ('accept', 'reject'):
+        print("Invalid action. Please use 'accept' or 'reject'.")
+        return []
+    if request_ids is None and action != 'accept':
+        print("Request IDs are required to reject course requests.")
+        return []
+
+    if request_ids is not None:
+        request_ids = list(request_ids)
+    return run_write(_manage_course_requests_bulk, professor_id, action, request_ids, capacity)
+
+
+# Fields of a professor's inbox entries
+INBOX_COLUMNS = ['request_id', 'student_id', 'student_name', 'course_id', 'course_name', 'status', 'priority',
+                 'request_date', 'updated_at', 'change_id']
+
+INBOX_QUERY = '''
+    SELECT Course_Requests.request_id, Course_Requests.student_id, Students.name, Course_Requests.course_id,
+        Courses.course_name, Course_Requests.status, Course_Requests.priority, Course_Requests.request_date,
+        strftime('%Y-%m-%d %H:%M:%f', Course_Requests.change_id / 1000 / 1000.0, 'unixepoch'),
+        Course_Requests.change_id
     FROM Course_Requests
-    JOIN Courses ON Course_Requests.course_id = Courses.course_id
     JOIN Students ON Course_Requests.student_id = Students.student_id
-    WHERE Course_Requests.course_id IN ({})
-    '''.format(','.join('?' * len(course_ids))), course_ids)
+    JOIN Courses ON Course_Requests.course_id = Courses.course_id
+    WHERE Course_Requests.professor_id = ? AND {condition}
+    ORDER BY {order}
+    LIMIT ?
+'''
+
+
+# One page of the requests for the professor's courses, oldest first, as a
+# list of dicts. `status` is a status, a list of statuses or None for every
+# request; pass the last request_id of a page as `after` to get the next.
+def get_professor_inbox(professor_id, status='pending', after=None, limit=50):
+    conditions = ['Course_Requests.request_id > ?']
+    params = [professor_id, after if after is not None else 0]
+    if isinstance(status, str):
+        conditions.append('Course_Requests.status = ?')
+        params.append(status)
+    elif status is not None:
+        status = list(status)
+        conditions.append(f"Course_Requests.status IN ({','.join('?' * len(status))})")
+        params.extend(status)
 
-    requests = cursor.fetchall()
+    conn = get_connection()
+    rows = conn.execute(INBOX_QUERY.format(condition=' AND '.join(conditions), order='Course_Requests.request_id'),
+                        params + [limit]).fetchall()
     conn.close()
+    return [dict(zip(INBOX_COLUMNS, row)) for row in rows]
+
+
+# Requests for the professor's courses that were made or changed after
+# `since`, in the order they changed, and the cursor to pass as `since` on
+# the next poll. `since` is a timestamp ('YYYY-MM-DD HH:MM:SS'), a cursor
+# from an earlier call or None for every request. Deleted requests are not
+# reported.
+def get_professor_inbox_changes(professor_id, since=None, limit=1000):
+    if since is None:
+        condition, params = '1', []
+    elif isinstance(since, str):
+        condition, params = f'Course_Requests.change_id >= ({_epoch_ms("?")} + 1) * 1000', [since]
+    else:
+        condition, params = '(Course_Requests.change_id, Course_Requests.request_id) > (?, ?)', list(since)
 
-    if not requests:
-        print("No course requests found for the professor's courses.")
-        return
+    conn = get_connection()
+    rows = conn.execute(INBOX_QUERY.format(condition=condition,
+                                           order='Course_Requests.change_id, Course_Requests.request_id'),
+                        [professor_id] + params + [limit]).fetchall()
+    conn.close()
 
-    print("Course Requests for Courses Managed by Professor ID", professor_id)
-    print("Request ID | Student ID | Student Name | Course ID | Course Name")
-    for request in requests:
-        print(f"{request[0]} | {request[1]} | {request[3]} | {request[2]} | {request[4]}")
+    changes = [dict(zip(INBOX_COLUMNS, row)) for row in rows]
+    if changes:
+        since = (changes[-1]['change_id'], changes[-1]['request_id'])
+    return changes, since
 
 
-def student_dashboard(student_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+def show_all_requests_for_professor(professor_id, status=None, page_size=1000):
+    # Walk the inbox a page at a time
+    requests = get_professor_inbox(professor_id, status, limit=page_size)
 
-    # Retrieve the student's course requests with course details and professor names
-    cursor.execute('''
-    SELECT Course_Requests.request_id, Courses.course_id, Courses.course_name, Professors.name AS professor_name, Course_Requests.status
+    if not requests:
+        conn = get_connection()
+        has_courses = conn.execute('SELECT 1 FROM Courses WHERE professor_id = ? LIMIT 1',
+                                   (professor_id,)).fetchone()
+        conn.close()
+        if has_courses:
+            print("No course requests found for the professor's courses.")
+        else:
+            print("No courses found for this professor.")
+        return
+
+    print("Course Requests for Courses Managed by Professor ID", professor_id)
+    print("Request ID | Student ID | Student Name | Course ID | Course Name | Status")
+    while requests:
+        for request in requests:
+            print(f"{request['request_id']} | {request['student_id']} | {request['student_name']} | "
+                  f"{request['course_id']} | {request['course_name']} | {request['status']}")
+        if len(requests) < page_size:
+            break
+        requests = get_professor_inbox(professor_id, status, after=requests[-1]['request_id'], limit=page_size)
+
+
+# Fields of the requests and enrollments on a student's dashboard
+DASHBOARD_REQUEST_COLUMNS = ['request_id', 'course_id', 'course_code', 'course_name', 'credits', 'professor_name',
+                             'status', 'priority']
+DASHBOARD_ENROLLMENT_COLUMNS = ['enrollment_id', 'course_id', 'course_code', 'course_name', 'credits',
+                                'professor_name', 'grade', 'grade_date']
+
+# Everything on a student's dashboard in one query, as rows of one kind
+# after the other: the student, their course requests, their enrollments
+# with grades and their credit load. Courses without a professor are kept.
+DASHBOARD_QUERY = '''
+    SELECT 'student', student_id, name, email, NULL, NULL, NULL, NULL, NULL
+    FROM Students
+    WHERE student_id = :student_id
+    UNION ALL
+    SELECT 'request', Course_Requests.request_id, Courses.course_id, Courses.course_code, Courses.course_name,
+        Courses.credits, Professors.name, Course_Requests.status, Course_Requests.priority
     FROM Course_Requests
     JOIN Courses ON Course_Requests.course_id = Courses.course_id
-    JOIN Professors ON Courses.professor_id = Professors.professor_id
-    WHERE Course_Requests.student_id = ?
-    ''', (student_id,))
+    LEFT JOIN Professors ON Courses.professor_id = Professors.professor_id
+    WHERE Course_Requests.student_id = :student_id
+    UNION ALL
+    SELECT 'enrollment', Enrollments.enrollment_id, Courses.course_id, Courses.course_code, Courses.course_name,
+        Courses.credits, Professors.name, Grades.grade, Grades.grade_date
+    FROM Enrollments
+    JOIN Courses ON Enrollments.course_id = Courses.course_id
+    LEFT JOIN Professors ON Courses.professor_id = Professors.professor_id
+    LEFT JOIN Grades ON Grades.course_id = Enrollments.course_id AND Grades.student_id = Enrollments.student_id
+    WHERE Enrollments.student_id = :student_id
+    UNION ALL
+    SELECT 'credit_load', student_id, credits, NULL, NULL, NULL, NULL, NULL, NULL
+    FROM Student_Credit_Load
+    WHERE student_id = :student_id
+'''
+
+
+# A student's dashboard as a dict: their name and email, course requests
+# and enrollments (with grades) as lists of dicts, credit load and GPA; None
+# if the student does not exist. The rows come from DASHBOARD_QUERY and are
+# cached per student until one of the write functions changes them.
+def get_student_dashboard(student_id):
+    def load():
+        conn = get_connection()
+        rows = conn.execute(DASHBOARD_QUERY, {'student_id': student_id}).fetchall()
+        conn.close()
+        # Sorting the few rows here is cheaper than an ORDER BY on the union
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return rows if any(row[0] == 'student' for row in rows) else None
+
+    rows = dashboard_cache.get(student_id, load)
+    if rows is None:
+        return None
+
+    dashboard = {'student_id': student_id, 'requests': [], 'enrollments': [], 'credit_load': 0}
+    for kind, *row in rows:
+        if kind == 'student':
+            dashboard['name'], dashboard['email'] = row[1:3]
+        elif kind == 'request':
+            dashboard['requests'].append(dict(zip(DASHBOARD_REQUEST_COLUMNS, row)))
+        elif kind == 'enrollment':
+            dashboard['enrollments'].append(dict(zip(DASHBOARD_ENROLLMENT_COLUMNS, row)))
+        else:
+            dashboard['credit_load'] = row[1]
+    dashboard['gpa'] = results_gpa([(enrollment['course_id'], enrollment['course_code'], enrollment['course_name'],
+                                     enrollment['credits'], enrollment['grade'])
+                                    for enrollment in dashboard['enrollments']])
+    return dashboard
 
-    requests = cursor.fetchall()
-    conn.close()
+
+def student_dashboard(student_id):
+    dashboard = get_student_dashboard(student_id)
+    requests = dashboard['requests'] if dashboard else []
 
     if not requests:
         print("No pending course requests found.")
         return
 
-
-    
-    column_names = [description[0] for description in cursor.description]
-    
     # Print the column names
-    print(column_names)
-  
-    for i in requests:
-        print(i)
+    print(list(requests[0]))
+
+    for request in requests:
+        print(tuple(request.values()))
 
 def students_in_course(course_id):
     conn = get_connection()
@@ -810,56 +3193,210 @@ def students_in_course(course_id):
 
 
 def export_students_in_course(course_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Retrieve the students enrolled in the specified course
-    cursor.execute('''
-    SELECT Enrollments.student_id, Students.name
-    FROM Enrollments
-    JOIN Students ON Enrollments.student_id = Students.student_id
-    WHERE Enrollments.course_id = ?
-    ''', (course_id,))
-
-    enrollments = cursor.fetchall()
-    conn.close()
+    exported = export_rosters([course_id], output_dir='.', file_format='xlsx', quiet=True)
 
-    if not enrollments:
+    if not exported:
         print(f"No students enrolled in course with ID {course_id}.")
         return
 
-    # Convert data to a DataFrame
-    df = pd.DataFrame(enrollments, columns=['Student ID', 'Student Name'])
-
-    # Save DataFrame to Excel file
     file_name = f"{course_id}.xlsx"
-    df.to_excel(file_name, index=False, engine='openpyxl')
-
     print(f"Students enrolled in Course ID {course_id} have been exported to '{file_name}'.")
 
 
-def add_grade(professor_id, course_id, student_id, grade):
+ROSTER_COLUMNS = ['Student ID', 'Student Name']
+
+
+# Writes course rosters in one of the supported formats. Each course gets
+# its own file named after the course ID, except for xlsx with a
+# `single_file` name, where every course becomes a sheet of one workbook.
+class RosterWriter:
+    formats = ('xlsx', 'csv', 'parquet')
+
+    def __init__(self, output_dir, file_format, single_file=None):
+        if file_format not in self.formats:
+            raise ValueError(f"Unsupported roster format: {file_format}")
+        if single_file and file_format != 'xlsx':
+            raise ValueError("Only xlsx rosters can be written to a single file.")
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.single_file = single_file
+        self._open = {}
+        self._workbook = None
+
+    def path(self, course_id):
+        return os.path.join(self.output_dir, f"{course_id}.{self.file_format}")
+
+    def open(self, course_id):
+        if self.file_format == 'csv':
+            import csv
+
+            handle = open(self.path(course_id), 'w', newline='')
+            writer = csv.writer(handle)
+            writer.writerow(ROSTER_COLUMNS)
+            self._open[course_id] = (handle, writer)
+        elif self.file_format == 'xlsx':
+            from openpyxl import Workbook
+
+            if self.single_file:
+                if self._workbook is None:
+                    self._workbook = Workbook(write_only=True)
+                workbook = self._workbook
+                sheet = workbook.create_sheet(f"Course {course_id}")
+            else:
+                workbook = Workbook(write_only=True)
+                sheet = workbook.create_sheet('Sheet1')
+            sheet.append(ROSTER_COLUMNS)
+            self._open[course_id] = (workbook, sheet)
+        else:
+            self._open[course_id] = None
+
+    def write(self, course_id, rows):
+        if self.file_format == 'csv':
+            self._open[course_id][1].writerows(rows)
+        elif self.file_format == 'xlsx':
+            sheet = self._open[course_id][1]
+            for row in rows:
+                sheet.append(row)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table({
+                ROSTER_COLUMNS[0]: pa.array([row[0] for row in rows], pa.int64()),
+                ROSTER_COLUMNS[1]: pa.array([row[1] for row in rows], pa.string()),
+            })
+            if self._open[course_id] is None:
+                self._open[course_id] = pq.ParquetWriter(self.path(course_id), table.schema)
+            self._open[course_id].write_table(table)
+
+    def close(self, course_id):
+        handle = self._open.pop(course_id)
+        if self.file_format == 'csv':
+            handle[0].close()
+        elif self.file_format == 'xlsx':
+            if not self.single_file:
+                handle[0].save(self.path(course_id))
+        elif handle is not None:
+            handle.close()
+
+    def finish(self):
+        if self._workbook is not None:
+            self._workbook.save(os.path.join(self.output_dir, self.single_file))
+            self._workbook = None
+
+
+# Export the rosters of many courses (all courses with enrollments when
+# `course_ids` is None) as xlsx, csv or parquet files in `output_dir`.
+# The rosters come from one query ordered by course, read `chunk_size` rows
+# at a time; chunks are written on a pool of `workers` threads while the
+# next ones are read, with at most two chunks per worker held in memory.
+# Returns {course_id: number of students exported}.
+def export_rosters(course_ids=None, output_dir='rosters', file_format='xlsx', single_file=None,
+                   chunk_size=5000, workers=4, quiet=False):
+    import concurrent.futures
+
+    os.makedirs(output_dir, exist_ok=True)
+    roster_writer = RosterWriter(output_dir, file_format, single_file)
+    start = time.perf_counter()
+
     conn = get_connection()
     cursor = conn.cursor()
 
+    course_filter = ''
+    if course_ids is not None:
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS Export_Courses (course_id INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM temp.Export_Courses')
+        cursor.executemany('INSERT OR IGNORE INTO temp.Export_Courses VALUES (?)',
+                           ((course_id,) for course_id in course_ids))
+        conn.commit()
+        course_filter = 'WHERE Enrollments.course_id IN (SELECT course_id FROM temp.Export_Courses)'
+
+    # Retrieve the students enrolled in every requested course, course by course
+    cursor.execute(f'''
+    SELECT Enrollments.course_id, Enrollments.student_id, Students.name
+    FROM Enrollments
+    JOIN Students ON Enrollments.student_id = Students.student_id
+    {course_filter}
+    ORDER BY Enrollments.course_id, Enrollments.student_id
+    ''')
+
+    exported = {}
+    in_flight = threading.BoundedSemaphore(2 * workers)
+    executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='roster-writer')
+    last_task = {}
+
+    # Writes to one file must happen in order, so every task for a course
+    # (or for the shared workbook) waits for the previous one first
+    def submit(course_id, fn, *args):
+        lane = None if single_file else course_id
+        previous = last_task.get(lane)
+
+        def task():
+            try:
+                if previous is not None:
+                    previous.result()
+                fn(*args)
+            finally:
+                in_flight.release()
+
+        in_flight.acquire()
+        last_task[lane] = executor.submit(task)
+
+    try:
+        current_course = None
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            # Split the chunk into runs of rows for the same course
+            run_start = 0
+            for index in range(len(rows) + 1):
+                if index < len(rows) and rows[index][0] == rows[run_start][0]:
+                    continue
+                course_id = rows[run_start][0]
+                if course_id != current_course:
+                    if current_course is not None:
+                        submit(current_course, roster_writer.close, current_course)
+                    submit(course_id, roster_writer.open, course_id)
+                    current_course = course_id
+                    exported[course_id] = 0
+                run = [row[1:] for row in rows[run_start:index]]
+                submit(course_id, roster_writer.write, course_id, run)
+                exported[course_id] += len(run)
+                run_start = index
+
+        if current_course is not None:
+            submit(current_course, roster_writer.close, current_course)
+        for task in list(last_task.values()):
+            task.result()
+        roster_writer.finish()
+    finally:
+        executor.shutdown()
+        conn.close()
+
+    if not quiet:
+        elapsed = time.perf_counter() - start
+        print(f"Exported {len(exported)} course rosters ({sum(exported.values())} students) "
+              f"to '{output_dir}' in {elapsed:.2f}s.")
+    return exported
+
+
+# Adds or updates one grade inside the caller's transaction.
+# Returns (saved, message).
+def _add_grade(conn, professor_id, course_id, student_id, grade):
+    cursor = conn.cursor()
+
     # Check if the professor is assigned to the course
-    cursor.execute('''
-    SELECT professor_id FROM Courses
-    WHERE course_id = ?
-    ''', (course_id,))
-    course = cursor.fetchone()
+    course = get_course_info(course_id)
 
     if not course:
-        print("Course does not exist.")
-        conn.close()
-        return
+        return False, "Course does not exist."
 
-    assigned_professor_id = course[0]
+    assigned_professor_id = course[5]
 
     if assigned_professor_id != professor_id:
-        print("You are not authorized to add grades for this course.")
-        conn.close()
-        return
+        return False, "You are not authorized to add grades for this course."
 
     # Check if the student is enrolled in the course
     cursor.execute('''
@@ -869,11 +3406,7 @@ def add_grade(professor_id, course_id, student_id, grade):
     enrollment = cursor.fetchone()
 
     if not enrollment:
-        print("Student is not enrolled in this course.")
-        conn.close()
-        return
-
-    enrollment_id = enrollment[0]
+        return False, "Student is not enrolled in this course."
 
     # Add or update the grade
     cursor.execute('''
@@ -882,14 +3415,202 @@ def add_grade(professor_id, course_id, student_id, grade):
     ON CONFLICT(course_id, student_id)
     DO UPDATE SET grade = excluded.grade, grade_date = excluded.grade_date
     ''', (course_id, student_id, grade))
+    _dashboard_changed(student_id)
 
-    conn.commit()
+    return True, f"Grade for student ID {student_id} in course ID {course_id} has been added/updated."
+
+
+# Add or update a grade in its own write transaction. Returns (saved, message).
+def save_grade(professor_id, course_id, student_id, grade):
+    return run_write(_add_grade, professor_id, course_id, student_id, grade)
+
+
+def add_grade(professor_id, course_id, student_id, grade):
+    saved, message = save_grade(professor_id, course_id, student_id, grade)
+    print(message)
+    return saved
+
+
+# Read (student_id, grade) pairs from a CSV/XLSX file with student_id and
+# grade columns, or from an iterable of pairs or dicts
+def _iter_grade_rows(file_or_rows):
+    rows = iter_file_rows(file_or_rows) if isinstance(file_or_rows, str) else file_or_rows
+    for row in rows:
+        if isinstance(row, dict):
+            yield row.get('student_id'), row.get('grade')
+        else:
+            yield tuple(row[:2])
+
+
+def _upload_grades(conn, professor_id, course_id, rows, allowed_grades):
+    course = get_course_info(course_id)
+    if not course:
+        return 0, [], "Course does not exist."
+    if course[5] != professor_id:
+        return 0, [], "You are not authorized to add grades for this course."
+
+    rejected = []
+    grades = {}
+    for student_id, grade in rows:
+        grade = str(grade).strip().upper() if grade is not None else ''
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            rejected.append((student_id, grade, "Invalid student ID."))
+            continue
+        if grade not in allowed_grades:
+            rejected.append((student_id, grade, "Invalid grade."))
+        elif student_id in grades:
+            rejected.append((student_id, grade, "Student appears more than once in the upload."))
+        else:
+            grades[student_id] = grade
+
+    # Check every student against the section's enrollments in one query
+    cursor = conn.cursor()
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS Upload_Grades (student_id INTEGER PRIMARY KEY)')
+    cursor.execute('DELETE FROM temp.Upload_Grades')
+    cursor.executemany('INSERT INTO temp.Upload_Grades VALUES (?)', ((student_id,) for student_id in grades))
+    cursor.execute('''
+    SELECT student_id FROM temp.Upload_Grades
+    WHERE student_id NOT IN (SELECT student_id FROM Enrollments WHERE course_id = ?)
+    ''', (course_id,))
+    for student_id, in cursor.fetchall():
+        rejected.append((student_id, grades.pop(student_id), "Student is not enrolled in this course."))
+    cursor.execute('DELETE FROM temp.Upload_Grades')
+
+    cursor.executemany('''
+    INSERT INTO Grades (course_id, student_id, grade, grade_date)
+    VALUES (?, ?, ?, DATE('now'))
+    ON CONFLICT(course_id, student_id)
+    DO UPDATE SET grade = excluded.grade, grade_date = excluded.grade_date
+    ''', ((course_id, student_id, grade) for student_id, grade in grades.items()))
+    _dashboard_changed(*grades)
+
+    return len(grades), rejected, f"{len(grades)} grades saved for course ID {course_id}, {len(rejected)} rejected."
+
+
+# Save a whole section's grades at once. `file_or_rows` is a CSV/XLSX file
+# with student_id and grade columns, or an iterable of (student_id, grade)
+# pairs. The professor is authorized once, all students are checked against
+# Enrollments in one query and the valid grades are saved in a single
+# transaction. Grades outside `allowed_grades` (the GRADE_POINTS letters by
+# default) are rejected. Returns the number saved and the rejected rows as
+# (student_id, grade, reason).
+def upload_grades(professor_id, course_id, file_or_rows, allowed_grades=None):
+    allowed_grades = set(GRADE_POINTS if allowed_grades is None else allowed_grades)
+    rows = list(_iter_grade_rows(file_or_rows))
+    saved, rejected, message = run_write(_upload_grades, professor_id, course_id, rows, allowed_grades)
+    print(message)
+    for student_id, grade, reason in rejected:
+        print(f"  Student ID {student_id} ({grade or 'no grade'}): {reason}")
+    return {'saved': saved, 'rejected': rejected, 'message': message}
+
+
+# Grade points for each letter grade, used by every GPA calculation.
+# Grades missing from the mapping (e.g. incompletes) are left out of GPAs.
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0,
+    'F': 0.0,
+}
+
+
+# Replace the grade point mapping used for GPA calculations
+def set_grade_points(mapping):
+    GRADE_POINTS.clear()
+    GRADE_POINTS.update(mapping)
+
+
+# Credit-weighted GPA over a DataFrame with 'grade' and 'credits' columns.
+# Without `by` a single GPA is returned (None when nothing is graded);
+# with `by` (a column name or list of them) a DataFrame with the graded
+# credits and GPA of every group is returned.
+def weighted_gpa(frame, by=None):
+    import pandas as pd
+
+    points = frame['grade'].map(GRADE_POINTS)
+    credits = frame['credits'].where(points.notna(), 0)
+    weighted = points.fillna(0) * credits
+
+    if by is None:
+        total_credits = credits.sum()
+        return float(weighted.sum() / total_credits) if total_credits else None
+
+    by = [by] if isinstance(by, str) else list(by)
+    sums = pd.DataFrame({'graded_credits': credits, 'weighted_points': weighted})
+    sums = sums.groupby([frame[column] for column in by]).sum()
+    sums['gpa'] = sums['weighted_points'] / sums['graded_credits'].where(sums['graded_credits'] > 0)
+    return sums[['graded_credits', 'gpa']]
+
+
+# Credit-weighted GPA per 'student', 'course', 'department' or for the whole
+# 'university', computed in one pass over the Grades table. `ids` limits the
+# result to some students, courses or departments. Returns a DataFrame
+# indexed by the level's key (a one-row frame for 'university').
+def compute_gpa(level='student', ids=None, chunk_size=100000):
+    keys = {
+        'student': 'Grades.student_id',
+        'course': 'Grades.course_id',
+        'department': 'Courses.department',
+        'university': None,
+    }
+    if level not in keys:
+        raise ValueError(f"Unknown GPA level: {level}")
+
+    query = '''
+    SELECT Grades.student_id, Grades.course_id, Courses.department, Courses.credits, Grades.grade
+    FROM Grades
+    JOIN Courses ON Grades.course_id = Courses.course_id
+    '''
+    params = []
+    if ids is not None and keys[level] is not None:
+        ids = list(ids)
+        query += f"WHERE {keys[level]} IN ({','.join('?' * len(ids))})"
+        params = ids
+
+    import pandas as pd
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    columns = ['student_id', 'course_id', 'department', 'credits', 'grade']
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunks.append(pd.DataFrame.from_records(rows, columns=columns))
     conn.close()
 
-    print(f"Grade for student ID {student_id} in course ID {course_id} has been added/updated.")
-    
-    
-def student_results(student_id):
+    frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    if level == 'university':
+        frame = frame.assign(university='all')
+        return weighted_gpa(frame, 'university')
+    return weighted_gpa(frame, keys[level].split('.')[1])
+
+
+# GPA of one student's (course_id, course_code, course_name, credits, grade)
+# rows. A student has only a handful of rows, so this stays in plain Python
+# rather than paying for the pandas import on every dashboard or report card.
+def results_gpa(results):
+    total_points = 0.0
+    total_credits = 0
+    for result in results:
+        points = GRADE_POINTS.get(result[4])
+        if points is not None:
+            total_points += points * result[3]
+            total_credits += result[3]
+    return total_points / total_credits if total_credits else None
+
+
+def format_gpa(gpa):
+    return 'N/A' if gpa is None else f"{gpa:.2f}"
+
+
+# The student's courses with grades (None when not graded yet) and GPA
+def get_student_results(student_id):
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -905,16 +3626,26 @@ def student_results(student_id):
     results = cursor.fetchall()
     conn.close()
 
-    if not results:
+    column_names = ['course_id', 'course_code', 'course_name', 'credits', 'grade']
+    return {
+        'student_id': student_id,
+        'courses': [dict(zip(column_names, result)) for result in results],
+        'gpa': results_gpa(results),
+    }
+
+
+def student_results(student_id):
+    results = get_student_results(student_id)
+
+    if not results['courses']:
         print(f"No results found for student ID {student_id}.")
         return
 
     print(f"Results for Student ID {student_id}:")
     print("Course ID | Course Code | Course Name | Credits | Grade")
-    for result in results:
-        print(f"{result[0]} | {result[1]} | {result[2]} | {result[3]} | {result[4] if result[4] else 'Not Graded'}")
-    
-
+    for result in results['courses']:
+        print(f"{result['course_id']} | {result['course_code']} | {result['course_name']} | {result['credits']} | {result['grade'] if result['grade'] else 'Not Graded'}")
+    print(f"GPA: {format_gpa(results['gpa'])}")
 
 
 def generate_report_card(student_id):
@@ -947,43 +3678,476 @@ def generate_report_card(student_id):
     results = cursor.fetchall()
     conn.close()
 
-    # Create a PDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Add Student Personal Information
-    pdf.cell(0, 10, f"Student Report Card - ID: {student_id}", ln=True, align="C")
-    pdf.cell(0, 10, f"Name: {name}", ln=True)
-    pdf.cell(0, 10, f"Email: {email}", ln=True)
-    pdf.cell(0, 10, f"Phone: {phone}", ln=True)
-    pdf.ln(10)
-
-    # Add Course Grades Table
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(40, 10, "Course ID", 1)
-    pdf.cell(40, 10, "Course Code", 1)
-    pdf.cell(60, 10, "Course Name", 1)
-    pdf.cell(20, 10, "Credits", 1)
-    pdf.cell(30, 10, "Grade", 1)
-    pdf.ln()
-
-    pdf.set_font("Arial", size=12)
-    for result in results:
-        pdf.cell(40, 10, str(result[0]), 1)
-        pdf.cell(40, 10, result[1], 1)
-        pdf.cell(60, 10, result[2], 1)
-        pdf.cell(20, 10, str(result[3]), 1)
-        pdf.cell(30, 10, result[4] if result[4] else 'Not Graded', 1)
-        pdf.ln()
-
     # Save the PDF
     file_name = f"Student_{student_id}_Report_Card.pdf"
-    pdf.output(file_name)
+    render_report_card(student_info, results, file_name)
 
     print(f"Report card for student ID {student_id} has been generated and saved as '{file_name}'.")
 
 
+# Columns of the report card's course table as (heading, width in mm)
+REPORT_CARD_COLUMNS = (('Course ID', 40), ('Course Code', 40), ('Course Name', 60), ('Credits', 20), ('Grade', 30))
+
+
+# Everything about the report card layout that is the same for every
+# student, worked out once: the A4 page with 1 cm margins (in mm, as FPDF
+# measures them), the font switches, the table header with its borders and
+# the position of every cell of every line of the page. Rendering a student only formats
+# their own text into these pieces, in the drawing operators FPDF would
+# write for the same layout. Cards longer than a page continue on new
+# pages, with the table header repeated.
+class ReportCardTemplate:
+    scale = 72 / 25.4
+    page_size = (595.28, 841.89)
+    line_height = 10
+    font_size = 12
+    # Lines of the page above the table: title, name, email, phone and a blank line
+    table_line = 5
+
+    def __init__(self):
+        from fpdf import FPDF
+
+        # Width (in mm) of every byte of the font's WinAnsi (cp1252) encoding
+        pdf = FPDF(unit='mm')
+        pdf.set_font('Helvetica', size=self.font_size)
+        self.char_widths = [pdf.get_string_width(chr(byte)) for byte in range(256)]
+        self.width = self.page_size[0] / self.scale
+        self.height = self.page_size[1] / self.scale
+        self.margin = 28.35 / self.scale
+        self.cell_margin = self.margin / 10
+        # Room for the text of a cell of each column
+        self.cell_widths = [width - 2 * self.cell_margin for _, width in REPORT_CARD_COLUMNS]
+        self.lines = int((self.height - 3 * self.margin) // self.line_height)
+        self.regular_font = f"BT /F1 {self.font_size:.2f} Tf ET\n"
+        self.page_start = f"2 J\n{0.567:.2f} w\n{self.regular_font}"
+        self.text_end = ") Tj ET\n"
+        self.escapes = str.maketrans({'\\': '\\\\', '(': '\\(', ')': '\\)', '\r': '\\r'})
+
+        # Personal information lines, with their fixed labels
+        self.title_label = "Student Report Card - ID: "
+        self.title_label_width = self.string_width(self.title_label)
+        self.info_lines = [self.text(self.margin + self.cell_margin, self.y(line)) + label
+                           for line, label in ((1, 'Name: '), (2, 'Email: '), (3, 'Phone: '))]
+
+        # Table cells for every line of the page, and the table header on the
+        # first page and on the pages it continues on
+        self.rows = []
+        for line in range(self.lines):
+            x = self.margin
+            cells = []
+            for heading, width in REPORT_CARD_COLUMNS:
+                border = (f"{x * self.scale:.2f} {(self.height - self.y(line)) * self.scale:.2f} "
+                          f"{width * self.scale:.2f} {-self.line_height * self.scale:.2f} re S ")
+                cells.append((border + self.text(x + self.cell_margin, self.y(line)), border + "\n"))
+                x += width
+            self.rows.append(cells)
+        self.headers = {
+            line: "BT /F2 {:.2f} Tf ET\n".format(self.font_size)
+                  + ''.join(cell + heading + self.text_end
+                            for (cell, _), (heading, _) in zip(self.rows[line], REPORT_CARD_COLUMNS))
+                  + self.regular_font
+            for line in (self.table_line, 0)
+        }
+
+    # Top of the line'th line of the page, in mm
+    def y(self, line, offset=0):
+        return self.margin + line * self.line_height + offset
+
+    # Start of a text operator for a line of text in the cell at x, y (mm)
+    def text(self, x, y):
+        baseline = self.height - (y + 0.5 * self.line_height + 0.3 * self.font_size / self.scale)
+        return f"BT {x * self.scale:.2f} {baseline * self.scale:.2f} Td ("
+
+    def string_width(self, text):
+        return sum(self.char_widths[byte] for byte in text.encode('cp1252', 'replace'))
+
+    # `text` cut short with an ellipsis where it is wider than `width` (mm)
+    def fit(self, text, width):
+        if self.string_width(text) <= width:
+            return text
+        width -= self.char_widths[0x85]
+        fitted = 0.0
+        for end, byte in enumerate(text.encode('cp1252', 'replace')):
+            fitted += self.char_widths[byte]
+            if fitted > width:
+                return text[:end] + '\u2026'
+        return text
+
+    # The content of every page of one student's report card, as bytes in
+    # the cp1252 (WinAnsi) encoding the fonts declare. Characters the
+    # encoding lacks are printed as '?', and table cells too long for their
+    # column are cut short.
+    def render(self, student_info, results, gpa=None):
+        student_id, name, email, phone = student_info
+        if gpa is None:
+            gpa = results_gpa(results)
+        escapes = self.escapes
+        text_end = self.text_end
+
+        title = f"{student_id}"
+        title_x = self.margin + (self.width - 2 * self.margin - self.title_label_width - self.string_width(title)) / 2
+        parts = [self.page_start, self.text(title_x, self.margin), self.title_label, title.translate(escapes),
+                 text_end]
+        for line, value in zip(self.info_lines, (name, email, phone)):
+            parts += (line, f"{value}".translate(escapes), text_end)
+
+        pages = []
+        line = self.table_line
+        parts.append(self.headers[line])
+        for result in results:
+            line += 1
+            if line == self.lines:
+                pages.append(''.join(parts).encode('cp1252', 'replace'))
+                line = 0
+                parts = [self.page_start, self.headers[line]]
+                line += 1
+            values = (str(result[0]), result[1], result[2], str(result[3]), result[4] if result[4] else 'Not Graded')
+            for (cell, empty_cell), value, width in zip(self.rows[line], values, self.cell_widths):
+                if value:
+                    parts += (cell, self.fit(value, width).translate(escapes), text_end)
+                else:
+                    parts.append(empty_cell)
+
+        # The GPA half a line below the table
+        line += 1
+        if line == self.lines:
+            pages.append(''.join(parts).encode('cp1252', 'replace'))
+            y = self.margin
+            parts = [self.page_start]
+        else:
+            y = self.y(line, 0.5 * self.line_height)
+        parts += (self.text(self.margin + self.cell_margin, y), f"GPA: {format_gpa(gpa)}", text_end)
+        pages.append(''.join(parts).encode('cp1252', 'replace'))
+        return pages
+
+
+_report_card_template = None
+
+
+# The report card template, built the first time it is needed
+def report_card_template():
+    global _report_card_template
+    if _report_card_template is None:
+        _report_card_template = ReportCardTemplate()
+    return _report_card_template
+
+
+# Writes report cards into one PDF, streaming each page to the file as soon
+# as it is rendered, so a document with many students (a whole section,
+# every student on their own pages) never sits in memory. Only the
+# object offsets are kept until close() writes the page tree, fonts and
+# cross-reference table. `file` is a file name or a binary file object,
+# which is left open.
+class ReportCardWriter:
+    fonts = ('Helvetica', 'Helvetica-Bold')
+
+    def __init__(self, file, template=None):
+        self.template = template or report_card_template()
+        self.pages = 0
+        self._owned = isinstance(file, (str, os.PathLike))
+        self._file = open(file, 'wb') if self._owned else file
+        self._offsets = {}
+        self._position = 0
+        self._write(b"%PDF-1.3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+
+    def _object(self, number, body):
+        self._offsets[number] = self._position
+        self._write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def add(self, student_info, results, gpa=None):
+        import zlib
+
+        for content in self.template.render(student_info, results, gpa):
+            page = 3 + 2 * self.pages
+            content = zlib.compress(content)
+            self._object(page, b"<</Type /Page\n/Parent 1 0 R\n/Resources 2 0 R\n/Contents %d 0 R>>" % (page + 1))
+            self._object(page + 1, b"<</Filter /FlateDecode /Length %d>>\nstream\n%s\nendstream"
+                         % (len(content), content))
+            self.pages += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            number = 2 + 2 * self.pages
+            kids = ''.join(f"{3 + 2 * page} 0 R " for page in range(self.pages))
+            self._object(1, (f"<</Type /Pages\n/Kids [{kids}]\n/Count {self.pages}\n"
+                             f"/MediaBox [0 0 {self.template.page_size[0]:.2f} {self.template.page_size[1]:.2f}]\n>>"
+                             ).encode())
+            fonts = []
+            for index, font in enumerate(self.fonts, 1):
+                number += 1
+                self._object(number, (f"<</Type /Font\n/BaseFont /{font}\n/Subtype /Type1\n"
+                                      f"/Encoding /WinAnsiEncoding\n>>").encode())
+                fonts.append(f"/F{index} {number} 0 R\n")
+            self._object(2, (f"<<\n/ProcSet [/PDF /Text]\n/Font <<\n{''.join(fonts)}>>\n>>").encode())
+            self._object(number + 1, time.strftime("<<\n/CreationDate (D:%Y%m%d%H%M%S)\n>>").encode())
+            self._object(number + 2, b"<<\n/Type /Catalog\n/Pages 1 0 R\n/OpenAction [3 0 R /FitH null]\n"
+                                     b"/PageLayout /OneColumn\n>>")
+            number += 2
+
+            xref = self._position
+            self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (number + 1)
+                        + b''.join(b"%010d 00000 n \n" % self._offsets[i] for i in range(1, number + 1))
+                        + b"trailer\n<<\n/Size %d\n/Root %d 0 R\n/Info %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n"
+                        % (number + 1, number, number - 1, xref))
+        finally:
+            if self._owned:
+                self._file.close()
+            self._file = None
+
+
+# Build the report card PDF for one student and write it to `file_name`.
+# `student_info` is (student_id, name, email, phone) and `results` holds
+# (course_id, course_code, course_name, credits, grade) rows. The GPA is
+# computed from `results` unless it is passed in.
+def render_report_card(student_info, results, file_name, gpa=None):
+    with ReportCardWriter(file_name) as writer:
+        writer.add(student_info, results, gpa)
+
+
+# Render a batch of report cards in a worker process. A student whose card
+# cannot be rendered (say, one with malformed result rows) is skipped
+# rather than failing the batch. Returns the written file names, the
+# (student_id, error) failures and the time spent rendering.
+def _render_report_card_batch(batch, output_dir):
+    start = time.perf_counter()
+    file_names = []
+    failures = []
+    for student_info, results in batch:
+        file_name = os.path.join(output_dir, f"Student_{student_info[0]}_Report_Card.pdf")
+        try:
+            render_report_card(student_info, results, file_name)
+        except Exception as error:
+            failures.append((student_info[0], f"{type(error).__name__}: {error}"))
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        else:
+            file_names.append(file_name)
+    return file_names, failures, time.perf_counter() - start
+
+
+# Stream (student_info, results) pairs for the given students (all students
+# when `student_ids` is None) from one query ordered by student, reading
+# `chunk_size` rows at a time
+def _iter_report_card_data(student_ids=None, chunk_size=5000):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        student_filter = ''
+        if student_ids is not None:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS Report_Students (student_id INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM temp.Report_Students')
+            cursor.executemany('INSERT OR IGNORE INTO temp.Report_Students VALUES (?)',
+                               ((student_id,) for student_id in student_ids))
+            conn.commit()
+            student_filter = 'WHERE Students.student_id IN (SELECT student_id FROM temp.Report_Students)'
+
+        cursor.execute(f'''
+        SELECT Students.student_id, Students.name, Students.email, Students.phone,
+            Courses.course_id, Courses.course_code, Courses.course_name, Courses.credits, Grades.grade
+        FROM Students
+        LEFT JOIN Enrollments ON Enrollments.student_id = Students.student_id
+        LEFT JOIN Courses ON Enrollments.course_id = Courses.course_id
+        LEFT JOIN Grades ON Grades.course_id = Enrollments.course_id AND Grades.student_id = Students.student_id
+        {student_filter}
+        ORDER BY Students.student_id, Enrollments.enrollment_id
+        ''')
+
+        student_info = None
+        results = []
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                if student_info is None or row[0] != student_info[0]:
+                    if student_info is not None:
+                        yield student_info, results
+                    student_info = row[:4]
+                    results = []
+                if row[4] is not None:
+                    results.append(row[4:])
+        if student_info is not None:
+            yield student_info, results
+    finally:
+        conn.close()
+
+
+# Generate report cards for many students (all of them when `student_ids`
+# is None). Student data is streamed from a single query, PDFs are rendered
+# on a pool of `workers` processes (0 renders in this process) and written
+# to `output_dir`, optionally collected into one zip file named `zip_name`.
+# Returns the number of report cards, the (student_id, error) of every card
+# that could not be rendered and the time spent in each stage.
+def generate_report_cards(student_ids=None, output_dir='report_cards', zip_name=None,
+                          workers=None, batch_size=200, chunk_size=5000):
+    import concurrent.futures
+    import zipfile
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = os.cpu_count() if workers is None else workers
+    stats = {'report_cards': 0, 'failures': [], 'fetch_seconds': 0.0, 'render_seconds': 0.0, 'zip_seconds': 0.0}
+    file_names = []
+
+    def collect(names, failures, render_seconds):
+        file_names.extend(names)
+        stats['failures'].extend(failures)
+        stats['render_seconds'] += render_seconds
+
+    start = time.perf_counter()
+    executor = concurrent.futures.ProcessPoolExecutor(workers) if workers else None
+    try:
+        pending = set()
+        batch = []
+        data = _iter_report_card_data(student_ids, chunk_size)
+        while True:
+            fetch_start = time.perf_counter()
+            item = next(data, None)
+            stats['fetch_seconds'] += time.perf_counter() - fetch_start
+
+            if item is not None:
+                batch.append(item)
+            if batch and (item is None or len(batch) >= batch_size):
+                if executor is None:
+                    collect(*_render_report_card_batch(batch, output_dir))
+                else:
+                    # Keep a bounded number of batches in flight so memory stays flat
+                    if len(pending) >= 2 * workers:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            collect(*future.result())
+                    pending.add(executor.submit(_render_report_card_batch, batch, output_dir))
+                batch = []
+            if item is None:
+                break
+
+        for future in concurrent.futures.as_completed(pending):
+            collect(*future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Optionally move all report cards into a single zip
+    if zip_name:
+        zip_start = time.perf_counter()
+        zip_path = os.path.join(output_dir, zip_name)
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file_name in file_names:
+                archive.write(file_name, os.path.basename(file_name))
+                os.remove(file_name)
+        stats['zip_seconds'] = time.perf_counter() - zip_start
+
+    stats['report_cards'] = len(file_names)
+    stats['total_seconds'] = time.perf_counter() - start
+    stats['report_cards_per_second'] = len(file_names) / stats['total_seconds'] if stats['total_seconds'] else 0.0
+
+    print(f"Generated {stats['report_cards']} report cards in {stats['total_seconds']:.2f}s "
+          f"({stats['report_cards_per_second']:.0f}/s; fetch {stats['fetch_seconds']:.2f}s, "
+          f"render {stats['render_seconds']:.2f}s across workers, zip {stats['zip_seconds']:.2f}s).")
+    for student_id, error in stats['failures']:
+        print(f"Could not generate the report card for student ID {student_id}: {error}")
+    return stats
+
+
+# Write one PDF per section (course) with the report cards of every
+# student enrolled in it, each student starting on a new page, for the
+# given courses (all courses with enrollments when `course_ids` is None).
+# The cards come from one query ordered by course and student, read
+# `chunk_size` rows at a time, and every document is streamed to
+# `output_dir` as it is rendered. A student whose card cannot be rendered
+# is left out of the section and reported. Returns {course_id: number of
+# students}.
+def generate_section_report_cards(course_ids=None, output_dir='report_cards', chunk_size=5000):
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    conn = get_connection()
+    cursor = conn.cursor()
+    sections = {}
+    failures = []
+    writer = None
+
+    # Pages are only written once a whole card has rendered, so a failing
+    # card leaves the section document intact
+    def add(course_id, student_info, results):
+        try:
+            writer.add(student_info, results)
+        except Exception as error:
+            sections[course_id] -= 1
+            failures.append((course_id, student_info[0], f"{type(error).__name__}: {error}"))
+
+    try:
+        course_filter = ''
+        if course_ids is not None:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS Report_Courses (course_id INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM temp.Report_Courses')
+            cursor.executemany('INSERT OR IGNORE INTO temp.Report_Courses VALUES (?)',
+                               ((course_id,) for course_id in course_ids))
+            conn.commit()
+            course_filter = 'WHERE Sections.course_id IN (SELECT course_id FROM temp.Report_Courses)'
+
+        cursor.execute(f'''
+        SELECT Sections.course_id, Students.student_id, Students.name, Students.email, Students.phone,
+            Courses.course_id, Courses.course_code, Courses.course_name, Courses.credits, Grades.grade
+        FROM Enrollments AS Sections
+        JOIN Students ON Students.student_id = Sections.student_id
+        JOIN Enrollments ON Enrollments.student_id = Sections.student_id
+        JOIN Courses ON Enrollments.course_id = Courses.course_id
+        LEFT JOIN Grades ON Grades.course_id = Enrollments.course_id AND Grades.student_id = Sections.student_id
+        {course_filter}
+        ORDER BY Sections.course_id, Sections.student_id, Enrollments.enrollment_id
+        ''')
+
+        key = None
+        student_info = None
+        results = []
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            for row in rows:
+                if row[:2] == key:
+                    results.append(row[5:])
+                    continue
+                if student_info is not None:
+                    add(key[0], student_info, results)
+                if key is None or row[0] != key[0]:
+                    if writer is not None:
+                        writer.close()
+                    writer = ReportCardWriter(os.path.join(output_dir, f"Course_{row[0]}_Report_Cards.pdf"))
+                    sections[row[0]] = 0
+                key = row[:2]
+                student_info = row[1:5]
+                results = [row[5:]]
+                sections[row[0]] += 1
+            if not rows:
+                break
+        if student_info is not None:
+            add(key[0], student_info, results)
+    finally:
+        if writer is not None:
+            writer.close()
+        conn.close()
+
+    students = sum(sections.values())
+    seconds = time.perf_counter() - start
+    print(f"Generated report cards for {len(sections)} sections ({students} students) in {seconds:.2f}s "
+          f"({students / seconds if seconds else 0.0:.0f} cards/s).")
+    for course_id, student_id, error in failures:
+        print(f"Could not generate the report card for student ID {student_id} in course ID {course_id}: {error}")
+    return sections
+
+
 
 # request_course(1,1)
 # request_course(1,2)
@@ -1007,4 +4171,7 @@ def generate_report_card(student_id):
 
 # student_results(1)
 
-generate_report_card(1)
+if __name__ == '__main__':
+    init_schema()
+    seed_sample_data()
+    generate_report_card(1)
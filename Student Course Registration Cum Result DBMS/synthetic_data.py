@@ -0,0 +1,151 @@
+import argparse
+import itertools
+import os
+import random
+
+import student_courses as sc
+
+# Letter grades given out by default, all equally likely
+DEFAULT_GRADE_WEIGHTS = {'A': 1, 'B': 1, 'C': 1, 'D': 1, 'F': 1}
+
+# Statuses of generated course requests and how likely each one is
+DEFAULT_REQUEST_STATUSES = {'pending': 1}
+
+
+# Create a database at `path` with the module's schema and `students`
+# students, `courses` courses and `professors` professors (one per ten
+# courses by default). Every student is enrolled and graded in
+# `enrollments` courses, with grades drawn from `grade_weights`, and makes
+# `requests` further course requests whose statuses are drawn from
+# `request_statuses` (pending and accepted requests stop at the 20 credit
+# cap). Every course meets `meetings` times a week at random weekday
+# times. Grades are dated in one of the last `grade_terms` terms, four
+# months apart. Rows are generated and inserted in batches of `batch_size`, so
+# millions of rows can be created without holding them in memory. The
+# module is pointed at the new database.
+def create_database(path, students, courses, enrollments=0, seed=None, professors=None, requests=0,
+                    grade_weights=None, request_statuses=None, departments=('General',), meetings=0,
+                    grade_terms=1, batch_size=100000):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    sc.configure_pool(path)
+    rng = random.Random(students if seed is None else seed)
+    professors = professors or max(1, courses // 10)
+    grade_weights = grade_weights or DEFAULT_GRADE_WEIGHTS
+    request_statuses = request_statuses or DEFAULT_REQUEST_STATUSES
+    if enrollments + requests > courses:
+        raise ValueError("Each student needs a different course for every enrollment and request.")
+
+    def batches(rows):
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    conn = sc.get_connection()
+    for pragma in sc.IMPORT_PRAGMAS:
+        conn.execute(pragma)
+    try:
+        for batch in batches((f"Professor {i}", f"prof{i}@university.edu", departments[i % len(departments)])
+                             for i in range(1, professors + 1)):
+            conn.executemany('INSERT INTO Professors (name, email, department) VALUES (?, ?, ?)', batch)
+        credits = {i: 3 + i % 2 for i in range(1, courses + 1)}
+        for batch in batches((f"Course {i}", f"C{i}", credits[i], departments[i % len(departments)],
+                              1 + i % professors) for i in range(1, courses + 1)):
+            conn.executemany('''
+            INSERT INTO Courses (course_name, course_code, credits, department, professor_id)
+            VALUES (?, ?, ?, ?, ?)
+            ''', batch)
+        for batch in batches((course_id, rng.randrange(5), start, start + rng.choice((50, 75, 110)))
+                             for course_id in range(1, courses + 1) for _ in range(meetings)
+                             for start in (8 * 60 + 30 * rng.randrange(20),)):
+            conn.executemany('''
+            INSERT INTO Course_Meetings (course_id, day, start_minute, end_minute)
+            VALUES (?, ?, ?, ?)
+            ''', batch)
+        for batch in batches((f"Student {i}", f"student{i}@student.edu") for i in range(1, students + 1)):
+            conn.executemany('INSERT INTO Students (name, email) VALUES (?, ?)', batch)
+        conn.commit()
+
+        grades = list(grade_weights)
+        grade_cum_weights = list(itertools.accumulate(grade_weights.values()))
+        statuses = list(request_statuses)
+        status_cum_weights = list(itertools.accumulate(request_statuses.values()))
+
+        # Enrollments, grades and requests, one student at a time
+        def student_rows():
+            course_ids = range(1, courses + 1)
+            for student_id in range(1, students + 1):
+                picked = rng.sample(course_ids, enrollments + requests)
+                for course_id, grade in zip(picked[:enrollments],
+                                            rng.choices(grades, cum_weights=grade_cum_weights, k=enrollments)):
+                    yield 'enrollment', (student_id, course_id, grade, f'-{4 * rng.randrange(grade_terms)} months')
+                load = 0
+                for course_id, status in zip(picked[enrollments:],
+                                             rng.choices(statuses, cum_weights=status_cum_weights, k=requests)):
+                    if status in ('pending', 'accepted'):
+                        if load + credits[course_id] > 20:
+                            continue
+                        load += credits[course_id]
+                    yield 'request', (student_id, course_id, status)
+
+        for batch in batches(student_rows()):
+            enrolled = [row for kind, row in batch if kind == 'enrollment']
+            requested = [row for kind, row in batch if kind == 'request']
+            conn.executemany('INSERT INTO Enrollments (student_id, course_id) VALUES (?, ?)',
+                             ((student_id, course_id) for student_id, course_id, grade, age in enrolled))
+            conn.executemany('''
+            INSERT INTO Grades (student_id, course_id, grade, grade_date)
+            VALUES (?, ?, ?, DATE('now', ?))
+            ''', enrolled)
+            conn.executemany('''
+            INSERT INTO Course_Requests (student_id, course_id, request_date, status)
+            VALUES (?, ?, DATE('now'), ?)
+            ''', requested)
+            conn.commit()
+        conn.execute('ANALYZE')
+    finally:
+        for pragma in sc.IMPORT_RESTORE_PRAGMAS:
+            conn.execute(pragma)
+        conn.close()
+    return path
+
+
+# "A=3,B=4,C=2" -> {'A': 3.0, 'B': 4.0, 'C': 2.0}
+def _weights(text):
+    weights = {}
+    for item in text.split(','):
+        key, _, weight = item.partition('=')
+        weights[key.strip()] = float(weight or 1)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a synthetic university database.")
+    parser.add_argument('path')
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--courses', type=int, default=500)
+    parser.add_argument('--professors', type=int, help="default: one per ten courses")
+    parser.add_argument('--enrollments', type=int, default=4, help="graded enrollments per student")
+    parser.add_argument('--requests', type=int, default=2, help="course requests per student")
+    parser.add_argument('--grades', type=_weights, help="grade distribution, e.g. A=3,B=4,C=2,D=1,F=1")
+    parser.add_argument('--request-statuses', type=_weights, help="e.g. pending=6,accepted=3,rejected=1")
+    parser.add_argument('--departments', default='General', help="comma-separated department names")
+    parser.add_argument('--meetings', type=int, default=2, help="weekly meetings per course")
+    parser.add_argument('--grade-terms', type=int, default=1, help="terms the grades are spread over")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    create_database(args.path, args.students, args.courses, enrollments=args.enrollments, seed=args.seed,
+                    professors=args.professors, requests=args.requests, grade_weights=args.grades,
+                    request_statuses=args.request_statuses, departments=tuple(args.departments.split(',')),
+                    meetings=args.meetings, grade_terms=args.grade_terms)
+    sc.close_pool()
+    print(f"Created '{args.path}'.")
+
+
+if __name__ == '__main__':
+    main()
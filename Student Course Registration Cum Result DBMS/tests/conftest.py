@@ -0,0 +1,21 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import student_courses as sc  # noqa: E402
+
+
+# A scratch copy of the sample database, which the module uses for the test
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'university_results1.db')
+    shutil.copy(os.path.join(PACKAGE_DIR, 'university_results1.db'), path)
+    sc.configure_pool(path)
+    yield path
+    sc.stop_registration_mode()
+    sc.close_pool()
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+import analytics
+import student_courses as sc
+
+# Grades of the sample database, all dated 2024-08-27: student 1 has an A
+# in courses 1 and 2; students 2 and 3 have a C and a B in course 1.
+TERM = '2024-Fall'
+
+
+def test_terms_and_class_rank(db):
+    assert [term for term, changes in analytics.list_terms()] == [TERM]
+    ranks = analytics.class_rank(TERM)
+    assert list(ranks['student_id']) == [1, 3, 2]
+    assert list(ranks['class_rank']) == [1, 2, 3]
+    assert list(ranks['percentile']) == [100.0, 50.0, 0.0]
+
+
+def test_histograms_and_rates(db):
+    histogram = analytics.grade_histograms(TERM).set_index('course_id')
+    assert histogram.loc[1, ['A', 'B', 'C', 'F', 'total']].tolist() == [1, 1, 1, 0, 3]
+    assert histogram.loc[2, ['A', 'total']].tolist() == [1, 1]
+    rates = analytics.pass_fail_rates(TERM).set_index('course_id')
+    assert rates.loc[1, ['graded', 'passed', 'failed']].tolist() == [3, 3, 0]
+    departments = analytics.department_averages(TERM).set_index('department')
+    assert departments.loc['Computer Science', 'average_gpa'] == pytest.approx((12 + 16 + 6 + 9) / 13)
+
+
+def test_cached_reports_are_recomputed_after_grade_changes(db):
+    first = analytics.term_report(TERM)
+    assert analytics.term_report(TERM) is first
+
+    conn = sc.get_connection()
+    conn.execute("UPDATE Grades SET grade = 'F' WHERE student_id = 2 AND course_id = 1")
+    conn.commit()
+    conn.close()
+    report = analytics.term_report(TERM)
+    assert report is not first
+    assert report['pass_fail_rates'].set_index('course_id').loc[1, 'failed'] == 1
+
+
+def test_grades_of_missing_courses_are_left_out(db):
+    sc.get_connection().close()
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO Grades (student_id, course_id, grade, grade_date) VALUES (2, 99, 'A', '2024-09-01')")
+    conn.commit()
+    conn.close()
+    ranks = analytics.class_rank(TERM).set_index('student_id')
+    assert ranks.loc[2, 'gpa'] == 2.0
@@ -0,0 +1,49 @@
+import asyncio
+
+import async_api
+import student_courses as sc
+
+
+def run(scenario):
+    async def main():
+        service = async_api.RegistrationService(max_workers=2)
+        try:
+            return service, await scenario(service)
+        finally:
+            service.close()
+
+    return asyncio.run(main())
+
+
+def request_id(student_id, course_id):
+    conn = sc.get_connection()
+    row = conn.execute('SELECT request_id FROM Course_Requests WHERE student_id = ? AND course_id = ?',
+                       (student_id, course_id)).fetchone()
+    conn.close()
+    return row[0]
+
+
+def test_registration_and_grading_return_structured_results(db):
+    async def scenario(service):
+        requested = await service.request_course(13, 5)
+        managed = await service.manage_course_request(request_id(13, 5), 3, 'accept')
+        graded = await service.add_grade(3, 5, 13, 'B')
+        return requested, managed, graded, await service.student_results(13)
+
+    _, (requested, managed, graded, results) = run(scenario)
+    assert requested == {'submitted': True, 'message': "Course request submitted successfully."}
+    assert managed == {'changed': True, 'message': "Course request accepted and enrollment completed."}
+    assert graded['saved']
+    assert [(course['course_id'], course['grade']) for course in results['courses']] == [(5, 'B')]
+    assert results['gpa'] == 3.0
+
+
+def test_concurrent_reads_share_a_query_but_not_the_result(db):
+    async def scenario(service):
+        return await asyncio.gather(service.student_results(1), service.student_results(1))
+
+    service, (first, second) = run(scenario)
+    assert service.coalesced_reads == 1
+    assert first == second and first is not second
+    first['courses'].clear()
+    assert len(second['courses']) == 2
@@ -0,0 +1,38 @@
+import student_courses as sc
+
+ACCEPTED = "Course request accepted and enrollment completed."
+
+
+def query(sql, *params):
+    conn = sc.get_connection()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def test_accepting_without_ids_accepts_every_pending_request(db):
+    # Requests 3 and 4 of the sample database are student 1's pending
+    # requests for courses 3 and 4, both taught by professor 2
+    assert sc.manage_course_requests_bulk(2, 'accept') == [(3, True, ACCEPTED), (4, True, ACCEPTED)]
+    assert query('SELECT course_id FROM Enrollments WHERE student_id = 1 ORDER BY course_id') == [
+        (1,), (2,), (3,), (4,)]
+    assert query('SELECT status FROM Course_Requests WHERE request_id IN (3, 4)') == [
+        ('accepted',), ('accepted',)]
+
+
+def test_every_request_is_checked_on_its_own(db):
+    results = sc.manage_course_requests_bulk(1, 'accept', [99, 1, 3])
+    assert sorted(results) == [
+        (1, False, "Course request has already been accepted."),
+        (3, False, "You are not authorized to manage this course request."),
+        (99, False, "Request does not exist."),
+    ]
+    assert query('SELECT COUNT(*) FROM Enrollments') == [(4,)]
+
+
+def test_rejecting_needs_request_ids(db, capsys):
+    assert sc.manage_course_requests_bulk(2, 'reject') == []
+    assert capsys.readouterr().out == "Request IDs are required to reject course requests.\n"
+    assert sc.manage_course_requests_bulk(2, 'reject', [3, 4]) == [
+        (3, True, "Course request rejected."), (4, True, "Course request rejected.")]
+    assert query('SELECT COUNT(*) FROM Enrollments WHERE student_id = 1') == [(2,)]
@@ -0,0 +1,41 @@
+import student_courses as sc
+
+SUBMITTED = "Course request submitted successfully."
+
+
+# {course_id: status} of a student's requests
+def requests_of(student_id):
+    conn = sc.get_connection()
+    rows = conn.execute('SELECT course_id, status FROM Course_Requests WHERE student_id = ?',
+                        (student_id,)).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def test_bulk_requests_follow_the_single_request_rules(db):
+    # Student 1 of the sample database is enrolled in course 1 and has a
+    # pending request for course 3; student 13 has no requests
+    results = sc.request_courses_bulk([(13, 1), (1, 1), (1, 3), (13, 99), (13, 2), (13, 2)])
+    assert results == [
+        (13, 1, True, SUBMITTED),
+        (1, 1, False, "Student is already enrolled in this course."),
+        (1, 3, False, "Course request already exists and is pending."),
+        (13, 99, False, "Course does not exist."),
+        (13, 2, True, SUBMITTED),
+        (13, 2, False, "Course request already exists and is pending."),
+    ]
+    assert requests_of(13) == {1: 'pending', 2: 'pending'}
+
+
+def test_rejected_requests_cannot_be_repeated_in_bulk(db):
+    sc.manage_course_request(3, 2, 'reject')
+    assert sc.request_courses_bulk([(1, 3), (1, 5)]) == [
+        (1, 3, False, "Previous request for this course was rejected. Cannot request again."),
+        (1, 5, True, SUBMITTED),
+    ]
+    assert requests_of(1)[3] == 'rejected'
+
+
+def test_empty_batch_submits_nothing(db):
+    assert sc.request_courses_bulk([]) == []
+    assert len(requests_of(1)) == 4
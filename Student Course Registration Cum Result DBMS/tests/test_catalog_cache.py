@@ -0,0 +1,30 @@
+import student_courses as sc
+
+
+def test_course_lookups_are_cached_until_the_course_changes(db):
+    assert sc.get_course_info(1)[:4] == (1, 'Introduction to Programming', 'CS101', 3)
+    hits = sc.catalog_cache_stats()['hits']
+    sc.get_course_info(1)
+    assert sc.catalog_cache_stats()['hits'] == hits + 1
+
+    sc.update_course(1, credits=4)
+    assert sc.get_course_info(1)[3] == 4
+    sc.delete_course(1)
+    assert sc.get_course_info(1) is None
+
+
+def test_professor_names_are_cached_until_the_professor_changes(db):
+    assert sc.get_professor_name(1) == 'Dr. John Smith'
+    sc.update_professor(1, name='Dr. J. Smith')
+    assert sc.get_professor_name(1) == 'Dr. J. Smith'
+    sc.delete_professor(1)
+    assert sc.get_professor_name(1) is None
+
+
+def test_cache_evicts_the_least_recently_used_entries():
+    cache = sc.CatalogCache(max_size=2)
+    for key in ('a', 'b', 'a', 'c'):
+        cache.get(key, lambda: key.upper())
+    assert cache.stats()['size'] == 2
+    assert cache.get('a', lambda: 'reloaded') == 'A'
+    assert cache.get('b', lambda: 'reloaded') == 'reloaded'
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+
+import pytest
+
+import student_courses as sc
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = sc.ConnectionPool(str(tmp_path / 'pool.db'), pool_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_first_connection_migrates(pool):
+    conn = pool.acquire()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == sc.SCHEMA_VERSION
+    assert conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    conn.close()
+
+
+def test_nested_acquire_shares_the_thread_connection(pool):
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner._conn is outer._conn
+    inner.close()
+    # The outer checkout still holds the connection
+    assert outer.execute('SELECT 1').fetchone() == (1,)
+    outer.close()
+
+
+def test_released_connection_is_reused(pool):
+    first = pool.acquire()
+    raw = first._conn
+    first.close()
+    second = pool.acquire()
+    assert second._conn is raw
+    second.close()
+
+
+def test_closed_connection_cannot_be_used(pool):
+    conn = pool.acquire()
+    conn.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+
+
+def test_release_rolls_back_unfinished_transaction(pool):
+    conn = pool.acquire()
+    conn.execute("INSERT INTO Students (name, email) VALUES ('Ada', 'ada@example.com')")
+    assert conn.in_transaction
+    conn.close()
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM Students WHERE email = 'ada@example.com'").fetchone()[0] == 0
+    conn.close()
+
+
+def test_pool_size_bounds_open_connections(pool):
+    acquired = threading.Semaphore(0)
+    release = threading.Event()
+
+    def hold():
+        conn = pool.acquire()
+        acquired.release()
+        release.wait()
+        conn.close()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        acquired.acquire()
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='Timed out'):
+            pool.acquire()
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    conn = pool.acquire()
+    conn.close()
+
+
+def test_unhealthy_idle_connection_is_replaced(pool):
+    conn = pool.acquire()
+    raw = conn._conn
+    conn.close()
+    raw.close()
+
+    conn = pool.acquire()
+    assert conn._conn is not raw
+    assert conn.execute('SELECT 1').fetchone() == (1,)
+    conn.close()
+
+
+def test_closed_pool_refuses_connections(pool):
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+
+
+def test_with_block_commits_through_the_wrapper(pool):
+    conn = pool.acquire()
+    with conn as wrapped:
+        assert wrapped is conn
+        wrapped.execute("INSERT INTO Students (name, email) VALUES ('Ada', 'ada@example.com')")
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM Students WHERE email = 'ada@example.com'").fetchone()[0] == 1
+    conn.close()
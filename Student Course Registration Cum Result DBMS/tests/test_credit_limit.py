@@ -0,0 +1,77 @@
+import threading
+
+import student_courses as sc
+
+# Student 13 of the sample database has no requests yet. Courses 1-6 add up
+# to exactly 20 credits; course 7 has 4 and courses 8-10 have 3.
+STUDENT = 13
+LIMIT_MESSAGE = "Adding this course would exceed the 20-credit limit."
+
+
+def request_id(student_id, course_id):
+    conn = sc.get_connection()
+    row = conn.execute('''
+    SELECT request_id FROM Course_Requests WHERE student_id = ? AND course_id = ?
+    ''', (student_id, course_id)).fetchone()
+    conn.close()
+    return row[0]
+
+
+def credit_load(student_id):
+    conn = sc.get_connection()
+    row = conn.execute('SELECT credits FROM Student_Credit_Load WHERE student_id = ?', (student_id,)).fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+
+def test_single_requests_stop_at_the_credit_limit(db):
+    for course_id in range(1, 7):
+        assert sc.submit_course_request(STUDENT, course_id)[0]
+    assert sc.submit_course_request(STUDENT, 7) == (False, LIMIT_MESSAGE)
+    assert credit_load(STUDENT) == 20
+    assert sc.check_credit_load() == []
+
+
+def test_bulk_requests_count_earlier_pairs_towards_the_limit(db):
+    assert sc.submit_course_request(STUDENT, 1)[0]
+    results = sc.request_courses_bulk([(STUDENT, course_id) for course_id in range(2, 11)])
+    assert [submitted for student_id, course_id, submitted, message in results] == [True] * 5 + [False] * 4
+    assert {message for *_, submitted, message in results if not submitted} == {LIMIT_MESSAGE}
+    assert credit_load(STUDENT) == 20
+    assert sc.check_credit_load() == []
+
+
+def test_bulk_and_single_paths_agree(db):
+    pairs = [(STUDENT, course_id) for course_id in (7, 5, 2, 1, 9, 10, 3)]
+    bulk = sc.request_courses_bulk(pairs)
+    conn = sc.get_connection()
+    conn.execute('DELETE FROM Course_Requests WHERE student_id = ?', (STUDENT,))
+    conn.commit()
+    conn.close()
+
+    single = [(student_id, course_id, *sc.submit_course_request(student_id, course_id))
+              for student_id, course_id in pairs]
+    assert single == bulk
+
+
+def test_rejecting_a_request_frees_its_credits(db):
+    sc.request_courses_bulk([(STUDENT, course_id) for course_id in range(1, 7)])
+    assert sc.decide_course_request(request_id(STUDENT, 2), 1, 'reject')[0]
+    assert credit_load(STUDENT) == 16
+    assert sc.submit_course_request(STUDENT, 7)[0]
+    assert credit_load(STUDENT) == 20
+
+
+def test_concurrent_requests_never_exceed_the_limit(db):
+    def request(course_id):
+        sc.submit_course_request(STUDENT, course_id)
+
+    with sc.registration_mode():
+        threads = [threading.Thread(target=request, args=(course_id,)) for course_id in range(1, 11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert 18 <= credit_load(STUDENT) <= 20
+    assert sc.check_credit_load() == []
@@ -0,0 +1,52 @@
+import pytest
+
+import student_courses as sc
+
+
+def request_id(student_id, course_id):
+    conn = sc.get_connection()
+    row = conn.execute('SELECT request_id FROM Course_Requests WHERE student_id = ? AND course_id = ?',
+                       (student_id, course_id)).fetchone()
+    conn.close()
+    return row[0]
+
+
+def test_dashboard_of_a_sample_student(db):
+    dashboard = sc.get_student_dashboard(1)
+    assert (dashboard['name'], dashboard['email']) == ('Emily Davis', 'emily.davis@student.edu')
+    assert [(request['course_id'], request['status']) for request in dashboard['requests']] == [
+        (1, 'accepted'), (2, 'accepted'), (3, 'pending'), (4, 'pending')]
+    assert {request['professor_name'] for request in dashboard['requests']} == {
+        'Dr. John Smith', 'Dr. Alice Johnson'}
+    assert [(enrollment['course_id'], enrollment['grade']) for enrollment in dashboard['enrollments']] == [
+        (1, 'A'), (2, 'A')]
+    assert dashboard['credit_load'] == 13
+    assert dashboard['gpa'] == 4.0
+    assert sc.get_student_dashboard(99) is None
+
+
+@pytest.mark.parametrize('registration', [False, True])
+def test_cached_dashboard_follows_every_change(db, registration):
+    if registration:
+        sc.start_registration_mode()
+    assert sc.get_student_dashboard(13)['requests'] == []
+
+    assert sc.submit_course_request(13, 5)[0]
+    assert [request['status'] for request in sc.get_student_dashboard(13)['requests']] == ['pending']
+    assert sc.decide_course_request(request_id(13, 5), 3, 'accept')[0]
+    assert [enrollment['course_id'] for enrollment in sc.get_student_dashboard(13)['enrollments']] == [5]
+    assert sc.save_grade(3, 5, 13, 'B')[0]
+    assert sc.get_student_dashboard(13)['gpa'] == 3.0
+
+    sc.update_course(5, course_name='Physics I')
+    sc.update_professor(3, name='Dr. R. Brown')
+    enrollment, = sc.get_student_dashboard(13)['enrollments']
+    assert (enrollment['course_name'], enrollment['professor_name']) == ('Physics I', 'Dr. R. Brown')
+    sc.update_student(13, name='Renamed')
+    assert sc.get_student_dashboard(13)['name'] == 'Renamed'
+
+
+def test_callers_get_their_own_dashboard(db):
+    first = sc.get_student_dashboard(1)
+    first['requests'].clear()
+    assert len(sc.get_student_dashboard(1)['requests']) == 4
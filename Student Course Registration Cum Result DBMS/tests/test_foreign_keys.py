@@ -0,0 +1,67 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import student_courses as sc
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def count(sql, *params):
+    conn = sc.get_connection()
+    value = conn.execute(sql, params).fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_deleting_a_student_removes_their_rows(db):
+    assert sc.delete_student(1) == 1
+    for table in ('Enrollments', 'Grades', 'Course_Requests'):
+        assert count(f'SELECT COUNT(*) FROM {table} WHERE student_id = 1') == 0
+    assert sc.check_credit_load() == []
+
+
+def test_deleting_a_professor_unassigns_their_courses(db):
+    assert sc.get_course_info(1)[5] == 1
+    assert sc.delete_professor(1) == 1
+    assert count('SELECT COUNT(*) FROM Courses WHERE professor_id IS NULL') == 2
+    assert sc.get_course_info(1)[5] is None
+
+
+def test_batch_deletes(db):
+    assert sc.delete_students([2, 3, 99]) == 2
+    assert sc.delete_courses([1]) == 1
+    assert count('SELECT COUNT(*) FROM Enrollments') == 1
+    assert count('SELECT COUNT(*) FROM Course_Requests') == 3
+
+
+def test_orphaned_rows_are_found_and_cleaned(db):
+    # Rows left behind by deletes made without foreign keys
+    sc.get_connection().close()
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO Enrollments (student_id, course_id) VALUES (99, 1)")
+    conn.execute("INSERT INTO Grades (student_id, course_id, grade) VALUES (1, 99, 'A')")
+    conn.commit()
+    conn.close()
+
+    orphans = {(table, column): rows for table, column, parent, rows in sc.find_orphans()}
+    assert orphans[('Enrollments', 'student_id')] == 1
+    assert orphans[('Grades', 'course_id')] == 1
+    assert sum(orphans.values()) == 2
+
+    sc.clean_orphans(vacuum=False, analyze=False)
+    assert not any(rows for *_, rows in sc.find_orphans())
+    assert count('SELECT COUNT(*) FROM Enrollments') == 4
+
+
+def test_clean_database_dry_run_changes_nothing(tmp_path):
+    path = tmp_path / 'legacy.db'
+    shutil.copy(os.path.join(PACKAGE_DIR, 'university_results1.db'), path)
+    before = path.read_bytes()
+    result = subprocess.run([sys.executable, os.path.join(PACKAGE_DIR, 'clean_database.py'), str(path), '--dry-run'],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.startswith('Schema version 0 (dry run')
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ['legacy.db']
@@ -0,0 +1,45 @@
+import pytest
+
+import student_courses as sc
+
+# Grades of the sample database, all in Computer Science: student 1 has an
+# A in course 1 (3 credits) and in course 2 (4 credits); students 2 and 3
+# have a C and a B in course 1.
+
+
+def test_student_and_course_gpas(db):
+    students = sc.compute_gpa('student')
+    assert list(students['gpa']) == [4.0, 2.0, 3.0]
+    assert list(students['graded_credits']) == [7, 3, 3]
+    assert list(sc.compute_gpa('student', ids=[3]).index) == [3]
+    assert list(sc.compute_gpa('course')['gpa']) == [3.0, 4.0]
+
+
+def test_department_and_university_gpas(db):
+    expected = (3 * 4.0 + 4 * 4.0 + 3 * 2.0 + 3 * 3.0) / 13
+    assert sc.compute_gpa('department').loc['Computer Science', 'gpa'] == pytest.approx(expected)
+    assert sc.compute_gpa('university')['gpa'].iloc[0] == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        sc.compute_gpa('faculty')
+
+
+def test_ungraded_and_unknown_grades_are_left_out():
+    results = [(1, 'CS101', 'Programming', 3, 'B'), (2, 'CS102', 'Data Structures', 4, None),
+               (3, 'MATH101', 'Calculus', 3, 'I'), (4, 'MATH102', 'Calculus II', 3, 'A')]
+    assert sc.results_gpa(results) == 3.5
+    assert sc.results_gpa(results[1:3]) is None
+    assert sc.format_gpa(None) == 'N/A'
+    assert sc.format_gpa(10 / 3) == '3.33'
+
+
+def test_grade_points_can_be_replaced(db):
+    original = dict(sc.GRADE_POINTS)
+    try:
+        sc.set_grade_points({'A': 5.0, 'B': 3.5})
+        students = sc.compute_gpa('student')
+        assert students.loc[1, 'gpa'] == 5.0
+        assert students.loc[3, 'gpa'] == 3.5
+        # Student 2's only grade (a C) no longer has grade points
+        assert students.loc[2, 'graded_credits'] == 0
+    finally:
+        sc.set_grade_points(original)
@@ -0,0 +1,77 @@
+import csv
+import sqlite3
+
+import pytest
+
+import student_courses as sc
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as handle:
+        csv.writer(handle).writerows(rows)
+    return str(path)
+
+
+def read_rejects(path):
+    with open(path, newline='') as handle:
+        return list(csv.reader(handle))
+
+
+def emails():
+    conn = sc.get_connection()
+    rows = conn.execute('SELECT email FROM Students WHERE student_id > 15 ORDER BY student_id').fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def test_import_loads_valid_rows_and_writes_the_rejects(db, tmp_path):
+    path = write_csv(tmp_path / 'students.csv', [
+        ['Name', 'Email', 'Phone', 'Date of Birth'],
+        ['Ada Lovelace', 'ada@student.edu', '555-0001', '2001-12-10'],
+        ['No Email', '', '555-0002', ''],
+        ['Ada Again', 'ada@student.edu', '', ''],
+        ['Emily Again', 'emily.davis@student.edu', '', ''],
+        ['Alan Turing', ' alan@student.edu ', '', '2002-06-23'],
+    ])
+    stats = sc.import_records('Students', path, chunk_size=2)
+    assert (stats['loaded'], stats['rejected']) == (2, 3)
+    assert emails() == ['ada@student.edu', 'alan@student.edu']
+    assert [row[-1] for row in read_rejects(tmp_path / 'students.rejects.csv')] == [
+        'reason', 'missing email', 'duplicate email in file', 'email already exists']
+
+
+def test_failed_chunk_is_rolled_back(db, tmp_path, monkeypatch):
+    path = write_csv(tmp_path / 'students.csv', [['name', 'email']] + [
+        [f'Student {i}', f'new{i}@student.edu'] for i in range(4)])
+    validate = sc._validate_import_chunk
+    calls = []
+
+    def fail_second_chunk(cursor, table, rows, seen):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            cursor.execute("INSERT INTO Students (name, email) VALUES ('Partial', 'partial@student.edu')")
+            raise sqlite3.OperationalError('disk I/O error')
+        return validate(cursor, table, rows, seen)
+
+    monkeypatch.setattr(sc, '_validate_import_chunk', fail_second_chunk)
+    with pytest.raises(sqlite3.OperationalError):
+        sc.import_records('Students', path, chunk_size=2)
+    assert emails() == ['new0@student.edu', 'new1@student.edu']
+
+
+def test_import_leaves_pooled_connections_alone(db, tmp_path):
+    path = write_csv(tmp_path / 'students.csv', [['name', 'email'], ['Ada', 'ada@student.edu']])
+    sc.import_records('Students', path)
+    conn = sc.get_connection()
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+    conn.close()
+
+
+def test_import_is_refused_in_registration_mode(db, tmp_path):
+    path = write_csv(tmp_path / 'students.csv', [['name', 'email'], ['Ada', 'ada@student.edu']])
+    with sc.registration_mode():
+        with pytest.raises(sqlite3.OperationalError):
+            sc.import_records('Students', path)
+    assert emails() == []
+    with pytest.raises(ValueError):
+        sc.import_records('Grades', path)
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import student_courses as sc
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = (f"import sys; sys.path.insert(0, {PACKAGE_DIR!r}); import student_courses; "
+            "print(sorted(name for name in ('pandas', 'fpdf', 'numpy') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert result.stdout == "[]\n"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_init_schema_and_seed_sample_data(tmp_path):
+    sc.init_schema(str(tmp_path / 'new.db'))
+    try:
+        sc.seed_sample_data()
+        sc.seed_sample_data()
+        conn = sc.get_connection()
+        counts = [conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                  for table in ('Professors', 'Courses', 'Students')]
+        conn.close()
+        assert counts == [len(sc.SAMPLE_PROFESSORS), len(sc.SAMPLE_COURSES), len(sc.SAMPLE_STUDENTS)]
+    finally:
+        sc.close_pool()
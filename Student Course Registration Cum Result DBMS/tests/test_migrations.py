@@ -0,0 +1,82 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import student_courses as sc
+
+SAMPLE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'university_results1.db')
+TABLES = ('Students', 'Courses', 'Professors', 'Enrollments', 'Grades', 'Course_Requests')
+
+
+# A copy of the sample database, which predates the migrations
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    shutil.copy(SAMPLE_DB, path)
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    yield conn
+    conn.close()
+
+
+def counts(conn):
+    return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in TABLES}
+
+
+def test_legacy_database_migrates_to_latest_version(legacy_db):
+    before = counts(legacy_db)
+    assert sc.migrate(legacy_db) == 0
+    assert legacy_db.execute('PRAGMA user_version').fetchone()[0] == sc.SCHEMA_VERSION
+    assert counts(legacy_db) == before
+    assert legacy_db.execute('PRAGMA foreign_key_check').fetchall() == []
+    assert legacy_db.execute('PRAGMA integrity_check').fetchone() == ('ok',)
+
+
+def test_migrating_again_does_nothing(legacy_db):
+    sc.migrate(legacy_db)
+    schema = legacy_db.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall()
+    assert sc.migrate(legacy_db) == sc.SCHEMA_VERSION
+    assert legacy_db.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall() == schema
+
+
+def test_migrations_add_indexes_and_derived_tables(legacy_db):
+    sc.migrate(legacy_db)
+    indexes = {row[0] for row in legacy_db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_enrollments_student_course', 'idx_course_requests_waitlist',
+            'idx_course_meetings_course'} <= indexes
+
+    credit_load = dict(legacy_db.execute(sc.CREDIT_LOAD_QUERY).fetchall())
+    stored = dict(legacy_db.execute('SELECT student_id, credits FROM Student_Credit_Load WHERE credits != 0'))
+    assert stored == {student_id: credits for student_id, credits in credit_load.items() if credits}
+
+    enrolled = dict(legacy_db.execute(
+        'SELECT course_id, COUNT(*) FROM Enrollments GROUP BY course_id').fetchall())
+    stored = dict(legacy_db.execute('SELECT course_id, enrolled FROM Course_Enrollment_Counts WHERE enrolled != 0'))
+    assert stored == enrolled
+
+
+def test_migrated_foreign_keys_cascade(legacy_db):
+    sc.migrate(legacy_db)
+    actions = {(row[2], row[3]): row[6] for row in legacy_db.execute('PRAGMA foreign_key_list(Enrollments)')}
+    assert actions == {('Students', 'student_id'): 'CASCADE', ('Courses', 'course_id'): 'CASCADE'}
+
+    student_id = legacy_db.execute('SELECT student_id FROM Enrollments LIMIT 1').fetchone()[0]
+    legacy_db.execute('PRAGMA foreign_keys = ON')
+    legacy_db.execute('DELETE FROM Students WHERE student_id = ?', (student_id,))
+    for table in ('Enrollments', 'Grades', 'Course_Requests', 'Student_Credit_Load'):
+        assert legacy_db.execute(f'SELECT COUNT(*) FROM {table} WHERE student_id = ?',
+                                 (student_id,)).fetchone()[0] == 0
+
+
+def test_orphans_are_found_before_migrating(legacy_db):
+    student_id = legacy_db.execute('SELECT student_id FROM Enrollments LIMIT 1').fetchone()[0]
+    enrollments = legacy_db.execute('SELECT COUNT(*) FROM Enrollments WHERE student_id = ?',
+                                    (student_id,)).fetchone()[0]
+    legacy_db.execute('DELETE FROM Students WHERE student_id = ?', (student_id,))
+    legacy_db.commit()
+
+    orphans = {(table, column): count for table, column, parent, count in sc.find_orphans(legacy_db)}
+    assert orphans[('Enrollments', 'student_id')] == enrollments
+    assert legacy_db.execute('PRAGMA user_version').fetchone()[0] == 0
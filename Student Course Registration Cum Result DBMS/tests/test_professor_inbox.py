@@ -0,0 +1,72 @@
+import pytest
+
+import student_courses as sc
+
+# Professor 1 of the sample database teaches courses 1 and 2; professor 2
+# teaches courses 3 and 4
+PROFESSOR = 1
+
+
+# Pending requests for courses 1-4 from students 4-15, on top of the
+# sample requests
+@pytest.fixture
+def inbox(db):
+    results = sc.request_courses_bulk([(student_id, course_id)
+                                       for student_id in range(4, 16) for course_id in (1, 2, 3, 4)])
+    assert all(submitted for *_, submitted, message in results)
+
+
+def walk(professor_id, status='pending', limit=5):
+    entries = []
+    after = None
+    while True:
+        page = sc.get_professor_inbox(professor_id, status, after=after, limit=limit)
+        assert len(page) <= limit
+        entries += page
+        if len(page) < limit:
+            return entries
+        after = page[-1]['request_id']
+
+
+def test_pages_cover_the_inbox_once_in_order(inbox):
+    entries = walk(PROFESSOR)
+    ids = [entry['request_id'] for entry in entries]
+    assert ids == sorted(set(ids))
+    assert ids == [entry['request_id'] for entry in sc.get_professor_inbox(PROFESSOR, limit=1000)]
+    assert len(entries) == 24
+    assert {entry['course_id'] for entry in entries} == {1, 2}
+    assert {entry['status'] for entry in entries} == {'pending'}
+    assert set(entries[0]) == set(sc.INBOX_COLUMNS)
+
+
+def test_status_filters(inbox):
+    every = walk(PROFESSOR, status=None)
+    accepted = walk(PROFESSOR, status='accepted')
+    pending = walk(PROFESSOR, status='pending')
+    assert len(accepted) == 4
+    assert len(walk(PROFESSOR, status=['pending', 'accepted'])) == len(pending) + len(accepted) == len(every)
+    assert walk(99) == []
+
+
+def test_changes_are_polled_from_a_cursor(inbox):
+    changes, cursor = sc.get_professor_inbox_changes(PROFESSOR)
+    assert len(changes) == 28
+    assert sc.get_professor_inbox_changes(PROFESSOR, cursor) == ([], cursor)
+
+    request_id = walk(PROFESSOR)[3]['request_id']
+    assert sc.decide_course_request(request_id, PROFESSOR, 'accept')[0]
+    changes, next_cursor = sc.get_professor_inbox_changes(PROFESSOR, cursor)
+    assert [(change['request_id'], change['status']) for change in changes] == [(request_id, 'accepted')]
+    assert next_cursor > cursor
+    assert sc.get_professor_inbox_changes(PROFESSOR, next_cursor) == ([], next_cursor)
+
+
+def test_changes_page_with_the_returned_cursor(inbox):
+    seen = []
+    cursor = None
+    while True:
+        changes, cursor = sc.get_professor_inbox_changes(PROFESSOR, cursor, limit=4)
+        if not changes:
+            break
+        seen += [change['request_id'] for change in changes]
+    assert sorted(seen) == sorted(entry['request_id'] for entry in walk(PROFESSOR, status=None))
@@ -0,0 +1,48 @@
+import pytest
+
+import student_courses as sc
+
+
+@pytest.fixture
+def stats(db, tmp_path):
+    stats = sc.enable_query_stats(slow_threshold=0, slow_log=str(tmp_path / 'slow.log'))
+    yield stats
+    sc.disable_query_stats()
+
+
+def results_query(stats):
+    return next(query for query in stats.snapshot() if 'LEFT JOIN Grades' in query['sql'])
+
+
+def test_queries_are_counted_per_statement(stats):
+    for _ in range(3):
+        sc.get_student_results(1)
+    query = results_query(stats)
+    assert query['calls'] == 3
+    # Student 1 of the sample database is enrolled in two courses
+    assert query['rows'] == 6
+    site, calls = query['call_sites'][0]
+    assert calls == 3
+    assert site.startswith('get_student_results (student_courses.py:')
+
+
+def test_slow_queries_are_logged_with_their_plan(stats, tmp_path):
+    sc.get_student_results(1)
+    entry = next(entry for entry in stats.slow_queries if 'LEFT JOIN Grades' in entry['sql'])
+    assert entry['plan'] and entry['rows'] == 2
+    log = (tmp_path / 'slow.log').read_text()
+    assert 'get_student_results (student_courses.py:' in log
+
+
+def test_with_blocks_are_instrumented(stats):
+    conn = sc.get_connection()
+    with conn:
+        conn.execute("UPDATE Students SET phone = '555-0000' WHERE student_id = 1")
+    conn.close()
+    assert any(query['sql'].startswith('UPDATE Students SET phone') and query['rows'] == 1
+               for query in stats.snapshot())
+
+
+def test_report_needs_instrumentation(db, capsys):
+    assert sc.query_stats_report() == []
+    assert capsys.readouterr().out == "Query instrumentation is not enabled.\n"
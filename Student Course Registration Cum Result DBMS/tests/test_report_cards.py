@@ -0,0 +1,82 @@
+import io
+import re
+import zlib
+
+import student_courses as sc
+
+
+# Objects of a PDF as {number: body}, checking every cross-reference table
+# offset points at the object it lists
+def parse_pdf(data):
+    assert data.startswith(b'%PDF-1.3\n')
+    assert data.endswith(b'%%EOF\n')
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[xref:].startswith(b'xref\n')
+
+    lines = data[xref:].split(b'\n')
+    first, count = map(int, lines[1].split())
+    assert first == 0
+    objects = {}
+    for number, entry in enumerate(lines[3:2 + count], 1):
+        offset = int(entry[:10])
+        header = b'%d 0 obj\n' % number
+        assert data[offset:offset + len(header)] == header
+        end = data.index(b'\nendobj\n', offset)
+        objects[number] = data[offset + len(header):end]
+    assert re.search(rb'/Size %d\b' % count, data[xref:])
+    return objects
+
+
+def page_contents(objects):
+    contents = []
+    for body in objects.values():
+        if body.startswith(b'<</Type /Page\n'):
+            stream = objects[int(re.search(rb'/Contents (\d+) 0 R', body).group(1))]
+            contents.append(zlib.decompress(stream[stream.index(b'stream\n') + 7:-len(b'\nendstream')]))
+    return contents
+
+
+def test_report_card_pdf_structure():
+    results = [(course_id, f'CS{course_id}', f'Course {course_id}', 3, 'A') for course_id in range(1, 31)]
+    document = io.BytesIO()
+    with sc.ReportCardWriter(document) as writer:
+        writer.add((1, 'Emily Davis', 'emily@example.com', '555-0101'), results[:2])
+        writer.add((2, 'Sean O’Neil', 'sean@example.com', None), results)
+    objects = parse_pdf(document.getvalue())
+
+    pages = page_contents(objects)
+    assert len(pages) == writer.pages == 3
+    assert b'/Count 3\n' in objects[1]
+    assert b'(Name: Sean O\x92Neil) Tj' in pages[1]
+    assert b'(GPA: 4.00) Tj' in pages[2]
+    assert b'/Encoding /WinAnsiEncoding' in b''.join(objects.values())
+
+
+def test_report_card_text_width_matches_fpdf():
+    from fpdf import FPDF
+
+    pdf = FPDF(unit='mm')
+    pdf.set_font('Helvetica', size=sc.ReportCardTemplate.font_size)
+    text = 'Student Report Card - ID: 12345'
+    assert abs(sc.report_card_template().string_width(text) - pdf.get_string_width(text)) < 1e-9
+
+
+def test_generate_report_card_writes_pdf(db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sc.generate_report_card(1)
+    objects = parse_pdf((tmp_path / 'Student_1_Report_Card.pdf').read_bytes())
+    assert len(page_contents(objects)) == 1
+
+
+def test_report_card_replaces_unencodable_text_and_cuts_long_cells():
+    course_name = 'Advanced Topics in Distributed Database Systems'
+    document = io.BytesIO()
+    with sc.ReportCardWriter(document) as writer:
+        writer.add((1, 'Zoë 李雷', 'zoe@example.com', '555-0101'), [(1, 'CS101', course_name, 3, 'A')])
+    page, = page_contents(parse_pdf(document.getvalue()))
+    assert b'(Name: Zo\xeb ??) Tj' in page
+
+    cell = re.search(rb'\((Advanced[^)]*)\) Tj', page).group(1).decode('cp1252')
+    template = sc.report_card_template()
+    assert cell.endswith('…') and course_name.startswith(cell[:-1])
+    assert template.string_width(cell) <= template.cell_widths[2]
@@ -0,0 +1,40 @@
+import csv
+
+import pytest
+
+import student_courses as sc
+
+
+def read_csv(path):
+    with open(path, newline='') as handle:
+        return list(csv.reader(handle))
+
+
+def test_csv_rosters_one_file_per_course(db, tmp_path):
+    # Course 1 of the sample database has students 1-3, course 2 student 1
+    exported = sc.export_rosters(output_dir=str(tmp_path), file_format='csv', chunk_size=1, quiet=True)
+    assert exported == {1: 3, 2: 1}
+    assert read_csv(tmp_path / '1.csv') == [
+        ['Student ID', 'Student Name'], ['1', 'Emily Davis'], ['2', 'Michael Brown'], ['3', 'Sarah Johnson']]
+    assert read_csv(tmp_path / '2.csv') == [['Student ID', 'Student Name'], ['1', 'Emily Davis']]
+
+
+def test_xlsx_rosters_in_a_single_workbook(db, tmp_path):
+    from openpyxl import load_workbook
+
+    exported = sc.export_rosters([2, 1, 7], output_dir=str(tmp_path), single_file='rosters.xlsx', quiet=True)
+    assert exported == {1: 3, 2: 1}
+    workbook = load_workbook(tmp_path / 'rosters.xlsx', read_only=True)
+    try:
+        assert workbook.sheetnames == ['Course 1', 'Course 2']
+        assert list(workbook['Course 2'].iter_rows(values_only=True)) == [
+            ('Student ID', 'Student Name'), (1, 'Emily Davis')]
+    finally:
+        workbook.close()
+
+
+def test_unsupported_formats_are_refused(db, tmp_path):
+    with pytest.raises(ValueError):
+        sc.export_rosters(output_dir=str(tmp_path), file_format='json')
+    with pytest.raises(ValueError):
+        sc.export_rosters(output_dir=str(tmp_path), file_format='csv', single_file='rosters.csv')
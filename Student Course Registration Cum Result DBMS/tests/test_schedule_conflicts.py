@@ -0,0 +1,85 @@
+import pytest
+
+import student_courses as sc
+
+# Student 1 of the sample database is enrolled in courses 1 and 2 (both
+# taught by professor 1), student 2 only in course 1; student 13 has no
+# courses or requests.
+MEETINGS = {
+    1: [('Mon', '09:00', '10:00')],
+    2: [('Wed', '09:00', '10:00')],
+    3: [('Mon', '09:30', '10:30'), ('Thu', '14:00', '15:00')],
+    4: [('Mon', '10:00', '11:00')],
+    5: [('Thu', '14:30', '15:30')],
+    6: [('Tue', '09:00', '10:00')],
+}
+
+
+# {course_id: request_id} of a student's requests
+def requests_of(student_id):
+    conn = sc.get_connection()
+    rows = conn.execute('SELECT course_id, request_id FROM Course_Requests WHERE student_id = ?',
+                        (student_id,)).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+@pytest.fixture
+def scheduled(db):
+    for course_id, meetings in MEETINGS.items():
+        assert sc.set_course_meetings(course_id, meetings) == len(meetings)
+
+
+def test_meetings_round_trip(scheduled):
+    assert sc.get_course_meetings(3) == [('Mon', '09:30', '10:30'), ('Thu', '14:00', '15:00')]
+    assert sc.set_course_meetings(3, [(3, 840, 900)]) == 1
+    assert sc.get_course_meetings(3) == [('Thu', '14:00', '15:00')]
+
+
+def test_request_overlapping_an_enrolled_course_is_refused(scheduled):
+    assert sc.submit_course_request(2, 3) == (False, "Schedule conflict with course ID 1 on Mon 09:30-10:00.")
+    # Back-to-back meetings do not overlap
+    assert sc.submit_course_request(2, 4)[0]
+
+
+def test_request_overlapping_an_open_request_is_refused(scheduled):
+    assert sc.submit_course_request(13, 3)[0]
+    assert sc.submit_course_request(13, 5) == (False, "Schedule conflict with course ID 3 on Thu 14:30-15:00.")
+    assert sc.submit_course_request(13, 6)[0]
+
+
+def test_bulk_requests_check_existing_courses_and_the_batch(scheduled):
+    results = sc.request_courses_bulk([(2, 3), (13, 3), (13, 5), (13, 6), (2, 6)])
+    assert results == [
+        (2, 3, False, "Schedule conflict with course ID 1 on Mon 09:30-10:00."),
+        (13, 3, True, "Course request submitted successfully."),
+        (13, 5, False, "Schedule conflict with course ID 3 on Thu 14:30-15:00."),
+        (13, 6, True, "Course request submitted successfully."),
+        (2, 6, True, "Course request submitted successfully."),
+    ]
+
+
+def test_accepting_checks_enrolled_courses(scheduled):
+    # Both requests were submitted before the meetings were known
+    sc.set_course_meetings(3, [])
+    assert all(result[2] for result in sc.request_courses_bulk([(13, 1), (13, 3)]))
+    sc.set_course_meetings(3, MEETINGS[3])
+
+    requests = requests_of(13)
+    assert sc.decide_course_request(requests[1], 1, 'accept')[0]
+    professor_id = sc.get_course_info(3)[5]
+    assert sc.decide_course_request(requests[3], professor_id, 'accept') == (
+        False, "Schedule conflict with course ID 1 on Mon 09:30-10:00.")
+
+
+def test_bulk_accept_checks_enrolled_courses_and_the_batch(scheduled):
+    sc.set_course_meetings(2, MEETINGS[1])
+    sc.set_course_meetings(1, [])
+    assert all(result[2] for result in sc.request_courses_bulk([(13, 1), (13, 2)]))
+    sc.set_course_meetings(1, MEETINGS[1])
+
+    results = sc.manage_course_requests_bulk(1, 'accept')
+    messages = [message for request_id, decided, message in results if request_id in requests_of(13).values()]
+    assert messages == ["Course request accepted and enrollment completed.",
+                        "Schedule conflict with course ID 1 on Mon 09:00-10:00."]
+    assert sc.validate_all_schedules() == [(1, 1, 2, 'Mon', '09:00', '10:00')]
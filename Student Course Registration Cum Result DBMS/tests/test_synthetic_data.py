@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+import student_courses as sc
+import synthetic_data
+
+# Generated columns of each table
+TABLES = {
+    'Students': 'student_id, name, email',
+    'Courses': 'course_id, credits, department, professor_id',
+    'Professors': 'professor_id, name, department',
+    'Enrollments': 'student_id, course_id',
+    'Grades': 'student_id, course_id, grade, grade_date',
+    'Course_Requests': 'student_id, course_id, status',
+}
+
+
+def dump(path):
+    conn = sqlite3.connect(path)
+    rows = {table: conn.execute(f'SELECT {columns} FROM {table} ORDER BY rowid').fetchall()
+            for table, columns in TABLES.items()}
+    conn.close()
+    return rows
+
+
+def test_generated_database_has_the_requested_shape(db, tmp_path):
+    path = synthetic_data.create_database(
+        str(tmp_path / 'synthetic.db'), 200, 30, enrollments=3, professors=5, requests=4,
+        request_statuses={'pending': 1, 'accepted': 1, 'rejected': 1}, departments=('Math', 'Physics'),
+        batch_size=64)
+    rows = dump(path)
+    assert [len(table_rows) for table_rows in rows.values()][:5] == [200, 30, 5, 600, 600]
+    assert 0 < len(rows['Course_Requests']) <= 800
+    assert {course[2] for course in rows['Courses']} == {'Math', 'Physics'}
+    assert {request[2] for request in rows['Course_Requests']} == {'pending', 'accepted', 'rejected'}
+
+    # The module now uses the new database, whose credit loads respect the cap
+    assert sc.check_credit_load() == []
+    conn = sc.get_connection()
+    assert conn.execute('SELECT MAX(credits) FROM Student_Credit_Load').fetchone()[0] <= 20
+    conn.close()
+
+
+def test_the_same_seed_gives_the_same_data(db, tmp_path):
+    first = synthetic_data.create_database(str(tmp_path / 'first.db'), 50, 10, enrollments=2, requests=2, seed=7)
+    second = synthetic_data.create_database(str(tmp_path / 'second.db'), 50, 10, enrollments=2, requests=2, seed=7)
+    assert dump(first) == dump(second)
+
+
+def test_every_enrollment_and_request_needs_its_own_course(db, tmp_path):
+    with pytest.raises(ValueError):
+        synthetic_data.create_database(str(tmp_path / 'synthetic.db'), 10, 3, enrollments=2, requests=2)
@@ -0,0 +1,31 @@
+import pytest
+
+import student_courses as sc
+
+
+def test_pages_walk_the_whole_table_in_key_order(db):
+    pages = list(sc.iter_table_pages('Students', ['student_id'], page_size=4))
+    assert [len(page) for page in pages] == [4, 4, 4, 3]
+    assert [row[0] for page in pages for row in page] == list(range(1, 16))
+
+
+def test_columns_and_filters(db):
+    assert list(sc.iter_table('Course_Requests', ['request_id', 'status'], {'status': 'pending'})) == [
+        (3, 'pending'), (4, 'pending')]
+    assert list(sc.iter_table('Enrollments', ['student_id'], {'student_id': [2, 3]}, page_size=1)) == [
+        (2,), (3,)]
+
+
+def test_unknown_tables_and_columns_are_refused(db):
+    with pytest.raises(ValueError):
+        list(sc.iter_table('Secrets'))
+    with pytest.raises(ValueError):
+        list(sc.iter_table('Students', ['password']))
+    with pytest.raises(ValueError):
+        list(sc.iter_table('Students', filters={'password': 'x'}))
+
+
+def test_display_prints_header_and_rows(db, capsys):
+    assert sc.display_all_professors(['professor_id', 'name'], {'professor_id': [1, 2]}) == 2
+    assert capsys.readouterr().out == (
+        "['professor_id', 'name']\n(1, 'Dr. John Smith')\n(2, 'Dr. Alice Johnson')\n")
@@ -0,0 +1,42 @@
+import pytest
+
+import student_courses as sc
+
+
+def student(student_id):
+    conn = sc.get_connection()
+    row = conn.execute('SELECT name, email, phone, date_of_birth FROM Students WHERE student_id = ?',
+                       (student_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def test_only_the_given_columns_are_written(db):
+    assert sc.update_student(1, phone='555-0000') == 1
+    assert student(1) == ('Emily Davis', 'emily.davis@student.edu', '555-0000', '2001-05-12')
+    assert sc.update_student(1, name=None, phone=None) == 0
+    assert student(1)[2] == '555-0000'
+
+
+def test_clear_sets_nullable_columns_to_null(db):
+    sc.update_student(1, phone=sc.CLEAR, date_of_birth=sc.CLEAR)
+    assert student(1) == ('Emily Davis', 'emily.davis@student.edu', None, None)
+    with pytest.raises(ValueError, match='Cannot clear required Students columns: name'):
+        sc.update_student(1, name=sc.CLEAR)
+
+
+def test_batch_updates(db):
+    assert sc.update_rows('Students', [(1, {'phone': '555-0001'}), (2, {'phone': '555-0002'}),
+                                       (3, {'name': 'Sarah J.', 'phone': '555-0003'}), (99, {'phone': 'x'})]) == 3
+    assert [student(student_id)[:3:2] for student_id in (1, 2, 3)] == [
+        ('Emily Davis', '555-0001'), ('Michael Brown', '555-0002'), ('Sarah J.', '555-0003')]
+    with pytest.raises(ValueError):
+        sc.update_rows('Students', [(1, {'password': 'x'})])
+    with pytest.raises(ValueError):
+        sc.update_rows('Grades', [(1, {'grade': 'A'})])
+
+
+def test_changing_course_credits_keeps_credit_loads_right(db):
+    sc.update_course(1, credits=5)
+    assert sc.get_course_info(1)[3] == 5
+    assert sc.check_credit_load() == []
@@ -0,0 +1,36 @@
+import student_courses as sc
+
+
+def grades(course_id):
+    conn = sc.get_connection()
+    rows = conn.execute('SELECT student_id, grade FROM Grades WHERE course_id = ?', (course_id,)).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def test_valid_grades_are_saved_and_the_rest_rejected(db):
+    # Course 1 of the sample database (professor 1) has students 1-3
+    result = sc.upload_grades(1, 1, [(1, 'b+'), (2, 'Z'), ('3', 'A'), (3, 'B'), (4, 'A'), ('x', 'A')])
+    assert result['saved'] == 2
+    assert result['rejected'] == [
+        (2, 'Z', "Invalid grade."),
+        (3, 'B', "Student appears more than once in the upload."),
+        ('x', 'A', "Invalid student ID."),
+        (4, 'A', "Student is not enrolled in this course."),
+    ]
+    assert grades(1) == {1: 'B+', 2: 'C', 3: 'A'}
+
+
+def test_grades_from_a_csv_file(db, tmp_path):
+    path = tmp_path / 'grades.csv'
+    path.write_text('Student ID,Grade\n1,A\n2,P\n', encoding='utf-8')
+    result = sc.upload_grades(1, 1, str(path), allowed_grades={'A', 'P'})
+    assert (result['saved'], result['rejected']) == (2, [])
+    assert grades(1) == {1: 'A', 2: 'P', 3: 'B'}
+
+
+def test_only_the_course_professor_can_upload(db):
+    result = sc.upload_grades(2, 1, [(1, 'F')])
+    assert result == {'saved': 0, 'rejected': [],
+                      'message': "You are not authorized to add grades for this course."}
+    assert grades(1)[1] == 'A'
@@ -0,0 +1,114 @@
+import pytest
+
+import student_courses as sc
+
+# Course 5 of the sample database belongs to professor 3 and has no
+# enrollments or requests; students 11-14 have no requests yet
+COURSE = 5
+PROFESSOR = 3
+STUDENTS = (11, 12, 13, 14)
+FULL_MESSAGE = "Course is full. Course request added to the waitlist."
+
+
+def query(sql, *params):
+    conn = sc.get_connection()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def statuses():
+    return dict(query('SELECT student_id, status FROM Course_Requests WHERE course_id = ?', COURSE))
+
+
+def enrolled():
+    return {row[0] for row in query('SELECT student_id FROM Enrollments WHERE course_id = ?', COURSE)}
+
+
+def request_ids():
+    return dict(query('SELECT student_id, request_id FROM Course_Requests WHERE course_id = ?', COURSE))
+
+
+def request_ids_of(student_id):
+    return dict(query('SELECT course_id, request_id FROM Course_Requests WHERE student_id = ?', student_id))
+
+
+# Course 5 limited to one seat, with a pending request from every student
+# in STUDENTS; returns {student_id: request_id}
+@pytest.fixture
+def full_course(db):
+    sc.update_course(COURSE, capacity=1)
+    results = sc.request_courses_bulk([(student_id, COURSE) for student_id in STUDENTS])
+    assert all(submitted for *_, submitted, message in results)
+    return request_ids()
+
+
+def test_accepting_beyond_capacity_waitlists(full_course):
+    assert sc.decide_course_request(full_course[11], PROFESSOR, 'accept') == (
+        True, "Course request accepted and enrollment completed.")
+    assert sc.decide_course_request(full_course[12], PROFESSOR, 'accept') == (True, FULL_MESSAGE)
+    assert enrolled() == {11}
+    assert statuses()[12] == 'waitlisted'
+    assert sc.submit_course_request(12, COURSE) == (False, "Course request already exists and is on the waitlist.")
+    assert sc.request_courses_bulk([(12, COURSE)]) == [
+        (12, COURSE, False, "Course request already exists and is on the waitlist.")]
+
+
+def test_dropping_promotes_the_waitlist_by_priority(full_course):
+    for student_id in STUDENTS:
+        sc.decide_course_request(full_course[student_id], PROFESSOR, 'accept')
+    assert [row[1] for row in sc.get_waitlist(COURSE)] == [12, 13, 14]
+
+    assert sc.set_request_priority(full_course[14], PROFESSOR, 5)
+    assert sc.drop_course(11, COURSE)
+    assert enrolled() == {14}
+    assert statuses()[14] == 'accepted'
+    assert [row[1] for row in sc.get_waitlist(COURSE)] == [12, 13]
+
+
+def test_raising_capacity_promotes_the_waitlist(full_course):
+    for student_id in STUDENTS:
+        sc.decide_course_request(full_course[student_id], PROFESSOR, 'accept')
+    sc.update_course(COURSE, capacity=3)
+    assert enrolled() == {11, 12, 13}
+    sc.update_course(COURSE, capacity=sc.CLEAR)
+    assert enrolled() == set(STUDENTS)
+
+
+def test_bulk_accept_fills_seats_and_waitlists_the_rest(full_course):
+    sc.update_course(COURSE, capacity=2)
+    results = sc.manage_course_requests_bulk(PROFESSOR, 'accept')
+    assert [message for request_id, decided, message in results].count(FULL_MESSAGE) == 2
+    assert enrolled() == {11, 12}
+    assert sorted(status for status in statuses().values()) == ['accepted', 'accepted', 'waitlisted', 'waitlisted']
+
+
+def test_bulk_reject_of_accepted_requests_promotes(full_course):
+    sc.manage_course_requests_bulk(PROFESSOR, 'accept')
+    assert enrolled() == {11}
+    results = sc.manage_course_requests_bulk(PROFESSOR, 'reject', [full_course[11]])
+    assert results == [(full_course[11], True, "Course request rejected.")]
+    assert enrolled() == {12}
+    assert statuses()[11] == 'rejected'
+
+
+def test_deleting_a_student_promotes_the_waitlist(full_course):
+    sc.manage_course_requests_bulk(PROFESSOR, 'accept')
+    assert sc.delete_student(11) == 1
+    assert enrolled() == {12}
+    assert statuses()[12] == 'accepted'
+    assert sc.check_credit_load() == []
+
+
+def test_promotion_passes_over_schedule_conflicts(full_course):
+    sc.manage_course_requests_bulk(PROFESSOR, 'accept')
+    # Student 12 takes course 7 (professor 5), which then turns out to
+    # clash with course 5
+    assert sc.submit_course_request(12, 7)[0]
+    assert sc.decide_course_request(request_ids_of(12)[7], 5, 'accept')[0]
+    sc.set_course_meetings(COURSE, [('Thu', '14:30', '15:30')])
+    sc.set_course_meetings(7, [('Thu', '14:00', '15:00')])
+
+    assert sc.drop_course(11, COURSE)
+    assert enrolled() == {13}
+    assert [row[1] for row in sc.get_waitlist(COURSE)] == [12, 14]